@@ -0,0 +1,102 @@
+import hashlib
+import json
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import translation
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag, urlencode
+from rest_framework.response import Response
+
+from ephios.core.models import Event
+from ephios.extra.permissions import get_permission_version
+
+RESPONSE_DATA_VERSION_CACHE_KEY = "ephios.api.caching.data_version"
+RESPONSE_CACHE_KEY = "ephios.api.caching.response.{view}.{hash}"
+
+
+def _bump_response_data_version():
+    cache.set(RESPONSE_DATA_VERSION_CACHE_KEY, uuid.uuid4().hex)
+
+
+def invalidate_cached_responses():
+    """
+    Invalidate all API responses cached by ``CachedResponseMixin``.
+    Model signals take care of this for events, shifts and participations,
+    so only call this after changing them with bulk operations.
+    """
+    _bump_response_data_version()
+    # another request might have repopulated the cache from data not yet committed
+    transaction.on_commit(_bump_response_data_version)
+
+
+def get_response_data_version():
+    version = cache.get(RESPONSE_DATA_VERSION_CACHE_KEY)
+    if version is None:
+        version = uuid.uuid4().hex
+        cache.add(RESPONSE_DATA_VERSION_CACHE_KEY, version)
+        version = cache.get(RESPONSE_DATA_VERSION_CACHE_KEY, version)
+    return version
+
+
+def get_data_etag(data):
+    content = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True)
+    return quote_etag(hashlib.sha256(content.encode()).hexdigest()[:32])
+
+
+class CachedResponseMixin:
+    """
+    Cache the serialized data of list and detail responses for a short time and answer
+    requests with a matching ``If-None-Match`` header with ``304 Not Modified``.
+    Data is only cached if the cache is shared by all processes (see the ``SHARED_CACHE`` setting).
+    Cached data is keyed by the normalized query parameters, the user and token scope and
+    the object permission version of the user, and is invalidated on writes to events,
+    shifts and participations.
+    """
+
+    response_cache_timeout = 30
+    response_cache_permission_model = Event
+
+    def get_response_cache_key(self, request):
+        query = sorted(
+            (key, value)
+            for key in request.query_params
+            for value in request.query_params.getlist(key)
+        )
+        parts = [
+            request.build_absolute_uri(request.path),
+            urlencode(query),
+            translation.get_language(),
+            request.user.pk,
+            " ".join(sorted(getattr(request.auth, "scope", "").split())),
+            get_permission_version(request.user, self.response_cache_permission_model),
+            get_response_data_version(),
+        ]
+        return RESPONSE_CACHE_KEY.format(
+            view=self.basename,
+            hash=hashlib.sha256("|".join(map(str, parts)).encode()).hexdigest(),
+        )
+
+    def get_cached_response(self, get_response, request, *args, **kwargs):
+        key = self.get_response_cache_key(request) if settings.SHARED_CACHE else None
+        if key is None or (cached := cache.get(key)) is None:
+            response = get_response(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            cached = (get_data_etag(response.data), response.data)
+            if key is not None:
+                cache.set(key, cached, self.response_cache_timeout)
+        etag, data = cached
+        if not_modified := get_conditional_response(request, etag=etag):
+            not_modified["ETag"] = etag
+            return not_modified
+        return Response(data, headers={"ETag": etag})
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(super().retrieve, request, *args, **kwargs)
@@ -2,10 +2,11 @@ import django_filters
 from django.db.models import Q
 from django.utils.translation import gettext_lazy as _
 from django_filters import FilterSet, IsoDateTimeFilter, ModelMultipleChoiceFilter
-from guardian.shortcuts import get_objects_for_user
 from rest_framework.filters import BaseFilterBackend
 
-from ephios.core.models import AbstractParticipation, Event, EventType, Shift
+from ephios.api.models import ParticipationTombstone
+from ephios.core.models import AbstractParticipation, Event, EventType, Shift, UserProfile
+from ephios.extra.permissions import get_permission_resolver
 
 
 class ParticipationPermissionFilter(BaseFilterBackend):
@@ -25,19 +26,23 @@ class UserinfoParticipationPermissionFilter(ParticipationPermissionFilter):
         #   * can view user object
         #   * refers to request.user
         qs = super().filter_queryset(request, queryset, view)
-        if not request.user.has_perm("core.view_userprofile"):
-            viewable_users = get_objects_for_user(request.user, "core.view_userprofile")
+        user_permissions = get_permission_resolver(request.user, UserProfile)
+        if not user_permissions.has_global_perm("core.view_userprofile"):
+            user_lookup = (
+                "user" if queryset.model is ParticipationTombstone else "LocalParticipation___user"
+            )
             qs = qs.filter(
-                Q(LocalParticipation___user=request.user)
-                | Q(LocalParticipation___user__in=viewable_users)
+                Q(**{user_lookup: request.user})
+                | user_permissions.object_pks_filter("core.view_userprofile", field=user_lookup)
             )
         return qs
 
 
 class ShiftPermissionFilter(BaseFilterBackend):
     def filter_queryset(self, request, queryset, view):
-        events = get_objects_for_user(request.user, "core.view_event")
-        return queryset.filter(event__in=events)
+        return get_permission_resolver(request.user, Event).filter_queryset(
+            queryset.filter(event__active=True), "core.view_event", field="event_id"
+        )
 
 
 class StartEndTimeFilterSet(FilterSet):
@@ -66,6 +71,14 @@ class ParticipationFilterSet(StartEndTimeFilterSet):
     shift = ModelMultipleChoiceFilter(
         field_name="shift_id", label="shift id", queryset=Shift.objects.all()
     )
+    modified_since = IsoDateTimeFilter(
+        field_name="updated_at",
+        lookup_expr="gt",
+        label=_(
+            "only participations that were created or changed after this time, "
+            "ordered by modification time"
+        ),
+    )
 
     class Meta:
         model = AbstractParticipation
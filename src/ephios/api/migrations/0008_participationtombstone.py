@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api", "0007_alter_application_client_secret"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ParticipationTombstone",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("participation_id", models.BigIntegerField(verbose_name="participation id")),
+                ("deleted_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                "verbose_name": "deleted participation",
+                "verbose_name_plural": "deleted participations",
+            },
+        ),
+    ]
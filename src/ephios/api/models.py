@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.db import models
 from django.urls import reverse
 from django.utils import timezone
@@ -11,6 +12,7 @@ from oauth2_provider.models import (
     ApplicationManager,
 )
 
+from ephios.core.models.events import ParticipationVisibility
 from ephios.modellogging.log import ModelFieldsLogConfig, dont_log, log
 
 
@@ -106,3 +108,50 @@ class IDToken(AbstractIDToken):
 class Grant(AbstractGrant):
     class Meta(AbstractGrant.Meta):
         swappable = "OAUTH2_PROVIDER_GRANT_MODEL"
+
+
+class ParticipationTombstoneQuerySet(models.QuerySet):
+    def viewable_by(self, participant):
+        return self.filter(
+            ParticipationVisibility(
+                participant, event_lookup="event", user_lookup="user", id_lookup="participation_id"
+            ).condition
+        )
+
+
+@dont_log
+class ParticipationTombstone(models.Model):
+    """
+    Records the deletion of a participation, so API clients can sync deletions
+    incrementally instead of downloading all participations again.
+    Event and user of the participation are kept to filter tombstones like participations.
+    Both are not constrained, as they might be deleted together with the participation.
+    """
+
+    participation_id = models.BigIntegerField(verbose_name=_("participation id"))
+    event = models.ForeignKey(
+        "core.Event",
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        related_name="+",
+        verbose_name=_("event"),
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        related_name="+",
+        verbose_name=_("user"),
+    )
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    objects = ParticipationTombstoneQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = _("deleted participation")
+        verbose_name_plural = _("deleted participations")
+
+    def __str__(self):
+        return f"Participation {self.participation_id} deleted at {self.deleted_at}"
@@ -0,0 +1,82 @@
+from rest_framework.pagination import BasePagination, CursorPagination, LimitOffsetPagination
+
+
+class ViewOrderingCursorPagination(CursorPagination):
+    ordering = "id"
+    page_size_query_param = "limit"
+    max_page_size = 1000
+
+    def get_ordering(self, request, queryset, view):
+        if hasattr(view, "get_cursor_ordering"):
+            return view.get_cursor_ordering()
+        return super().get_ordering(request, queryset, view)
+
+
+class CursorOrLimitOffsetPagination(BasePagination):
+    """
+    Paginate with limit and offset by default. Clients can opt in to keyset pagination by passing
+    ``pagination=cursor``, which stays fast for deep pages and is stable while rows are added.
+    The links to the following pages then contain a ``cursor`` parameter.
+    Views can set ``force_cursor_pagination`` to always use keyset pagination for a request.
+    """
+
+    pagination_query_param = "pagination"
+    cursor_query_param = ViewOrderingCursorPagination.cursor_query_param
+
+    def __init__(self):
+        self.cursor_pagination = ViewOrderingCursorPagination()
+        self.limit_offset_pagination = LimitOffsetPagination()
+        self.pagination = self.limit_offset_pagination
+
+    def use_cursor(self, request, view):
+        return (
+            request.query_params.get(self.pagination_query_param) == "cursor"
+            or self.cursor_query_param in request.query_params
+            or getattr(view, "force_cursor_pagination", False)
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.pagination = (
+            self.cursor_pagination
+            if self.use_cursor(request, view)
+            else self.limit_offset_pagination
+        )
+        return self.pagination.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.pagination.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = self.limit_offset_pagination.get_paginated_response_schema(schema)
+        response_schema["required"] = ["results"]
+        response_schema["properties"]["count"]["description"] = (
+            "Not included with cursor pagination."
+        )
+        return response_schema
+
+    def get_schema_operation_parameters(self, view):
+        parameters = self.limit_offset_pagination.get_schema_operation_parameters(view) + [
+            {
+                "name": self.pagination_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Set to 'cursor' to use keyset pagination.",
+                "schema": {"type": "string", "enum": ["cursor"]},
+            }
+        ]
+        names = {parameter["name"] for parameter in parameters}
+        return parameters + [
+            parameter
+            for parameter in self.cursor_pagination.get_schema_operation_parameters(view)
+            if parameter["name"] not in names
+        ]
+
+    def to_html(self):
+        return self.pagination.to_html()
+
+    def get_results(self, data):
+        return self.pagination.get_results(data)
+
+    @property
+    def display_page_controls(self):
+        return self.pagination.display_page_controls
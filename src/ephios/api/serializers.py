@@ -1,6 +1,7 @@
+import dataclasses
 import uuid
 
-from django.db.models import Q
+from django.db.models import Manager, Prefetch, Q, prefetch_related_objects
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers
@@ -10,18 +11,57 @@ from rest_framework.relations import SlugRelatedField
 from rest_framework.serializers import ModelSerializer
 
 from ephios.api.fields import ChoiceDisplayField
+from ephios.api.models import ParticipationTombstone
 from ephios.core.models import (
     AbstractParticipation,
     Event,
     EventType,
+    LocalParticipation,
     Qualification,
+    QualificationGrant,
     Shift,
     UserProfile,
 )
 from ephios.core.models.events import ParticipationComment
-from ephios.core.services.qualification import collect_all_included_qualifications
+from ephios.core.services.qualification import (
+    QualificationUniverse,
+    collect_all_included_qualifications,
+)
 from ephios.core.templatetags.settings_extras import make_absolute
 
+UNEXPIRED_GRANTS_ATTR = "unexpired_qualification_grants"
+
+
+def unexpired_grants_prefetch(lookup="qualification_grants"):
+    """
+    Prefetch the unexpired qualification grants of users, so serializers can look up
+    their qualifications in the qualification universe instead of querying them per user.
+    """
+    return Prefetch(
+        lookup, queryset=QualificationGrant.objects.unexpired(), to_attr=UNEXPIRED_GRANTS_ATTR
+    )
+
+
+def get_context_cached(context, key, get_value):
+    """Compute a value once per serialization, as the context is shared by nested serializers."""
+    if key not in context:
+        context[key] = get_value()
+    return context[key]
+
+
+def get_user_qualifications(context, user):
+    """Return the qualifications of a user whose grants were loaded with `unexpired_grants_prefetch`."""
+    qualifications_by_id = get_context_cached(
+        context,
+        "qualifications_by_id",
+        lambda: {q.id: q for q in QualificationUniverse.get_qualifications()},
+    )
+    return [
+        qualifications_by_id[grant.qualification_id]
+        for grant in getattr(user, UNEXPIRED_GRANTS_ATTR)
+        if grant.qualification_id in qualifications_by_id
+    ]
+
 
 class QualificationSerializer(ModelSerializer):
     category = SlugRelatedField(slug_field="uuid", read_only=True)
@@ -38,7 +78,20 @@ class QualificationSerializer(ModelSerializer):
         ]
 
     def get_includes(self, obj) -> list[uuid.UUID]:
-        return [q.uuid for q in collect_all_included_qualifications(obj.includes.all())]
+        graph = get_context_cached(
+            self.context, "qualification_graph", QualificationUniverse.get_graph
+        )
+        try:
+            included = graph.spread_from(graph.children(obj.uuid))
+        except KeyError:  # qualification was created after the universe was built
+            return [q.uuid for q in collect_all_included_qualifications(obj.includes.all())]
+        return [
+            q.uuid
+            for q in get_context_cached(
+                self.context, "qualifications", QualificationUniverse.get_qualifications
+            )
+            if q.uuid in included
+        ]
 
 
 class SignupStatsSerializer(serializers.Serializer):
@@ -121,13 +174,14 @@ class UserProfileSerializer(ModelSerializer):
         ]
 
     def get_qualifications(self, obj) -> list:
-        return QualificationSerializer(
-            Qualification.objects.filter(
+        if hasattr(obj, UNEXPIRED_GRANTS_ATTR):
+            qualifications = get_user_qualifications(self.context, obj)
+        else:
+            qualifications = Qualification.objects.filter(
                 Q(grants__user=obj)
                 & (Q(grants__expires__gte=timezone.now()) | Q(grants__expires__isnull=True))
-            ),
-            many=True,
-        ).data
+            )
+        return QualificationSerializer(qualifications, many=True, context=self.context).data
 
 
 class PublicParticipantSerializer(serializers.Serializer):
@@ -140,6 +194,15 @@ class PublicParticipantSerializer(serializers.Serializer):
         """return class name of dataclass"""
         return obj.__class__.__name__
 
+    def to_representation(self, instance):
+        if (user := getattr(instance, "user", None)) is not None and hasattr(
+            user, UNEXPIRED_GRANTS_ATTR
+        ):
+            instance = dataclasses.replace(
+                instance, qualifications=get_user_qualifications(self.context, user)
+            )
+        return super().to_representation(instance)
+
     def update(self, instance, validated_data):
         raise MethodNotAllowed("update")
 
@@ -161,6 +224,32 @@ class CommentSerializer(ModelSerializer):
         fields = ["author", "text", "created_at"]
 
 
+class ParticipationListSerializer(serializers.ListSerializer):
+    """
+    Load the participants and comments of all participations in bulk before serializing them.
+    """
+
+    # participations are read only, so we don't implement update:
+    # pylint: disable=abstract-method
+
+    def to_representation(self, data):
+        participations = list(data.all() if isinstance(data, Manager) else data)
+        prefetch_related_objects(
+            [p for p in participations if isinstance(p, LocalParticipation)],
+            "user",
+            unexpired_grants_prefetch("user__qualification_grants"),
+        )
+        if "comments" in self.child.fields:
+            prefetch_related_objects(
+                participations,
+                Prefetch(
+                    "comments",
+                    queryset=ParticipationComment.objects.select_related("authored_by_responsible"),
+                ),
+            )
+        return super().to_representation(participations)
+
+
 class UserinfoParticipationSerializer(ModelSerializer):
     state = ChoiceDisplayField(choices=AbstractParticipation.States.choices)
     duration = serializers.SerializerMethodField(label=_("Duration in seconds"))
@@ -183,6 +272,7 @@ class UserinfoParticipationSerializer(ModelSerializer):
 
     class Meta:
         model = AbstractParticipation
+        list_serializer_class = ParticipationListSerializer
         fields = [
             "id",
             "shift",
@@ -210,3 +300,11 @@ class ParticipationSerializer(UserinfoParticipationSerializer):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         del self.fields["comments"]
+
+
+class ParticipationTombstoneSerializer(ModelSerializer):
+    id = serializers.IntegerField(source="participation_id")
+
+    class Meta:
+        model = ParticipationTombstone
+        fields = ["id", "deleted_at"]
@@ -1,10 +1,60 @@
+from datetime import timedelta
+
+from django.db.models.signals import post_delete, post_save, pre_delete
 from django.dispatch import receiver
+from django.utils import timezone
 
+from ephios.api.caching import invalidate_cached_responses
+from ephios.core.models import AbstractParticipation, Event, EventType, Shift
 from ephios.core.signals import periodic_signal
 
+PARTICIPATION_TOMBSTONE_RETENTION = timedelta(days=180)
+
 
 @receiver(periodic_signal, dispatch_uid="ephios.api.signals.clear_expired_tokens")
 def clear_expired_tokens(sender, **kwargs):
     from oauth2_provider.models import clear_expired
 
     clear_expired()
+
+
+@receiver(
+    pre_delete, sender=AbstractParticipation, dispatch_uid="ephios.api.signals.tombstone_owner"
+)
+def remember_participation_tombstone_owner(sender, instance, **kwargs):
+    # the subclass row holding the user is already gone when the AbstractParticipation
+    # row is deleted, so event and user are looked up beforehand
+    instance._tombstone_owner = (  # pylint: disable=protected-access
+        AbstractParticipation.objects
+        .non_polymorphic()
+        .filter(pk=instance.pk)
+        .values_list("shift__event_id", "localparticipation__user_id")
+        .first()
+    )
+
+
+@receiver(post_delete, sender=AbstractParticipation, dispatch_uid="ephios.api.signals.tombstone")
+def create_participation_tombstone(sender, instance, **kwargs):
+    # deleting any participation subclass also deletes the AbstractParticipation row
+    from ephios.api.models import ParticipationTombstone
+
+    event_id, user_id = getattr(instance, "_tombstone_owner", None) or (None, None)
+    ParticipationTombstone.objects.create(
+        participation_id=instance.pk, event_id=event_id, user_id=user_id
+    )
+
+
+@receiver(periodic_signal, dispatch_uid="ephios.api.signals.clear_old_tombstones")
+def clear_old_participation_tombstones(sender, **kwargs):
+    from ephios.api.models import ParticipationTombstone
+
+    ParticipationTombstone.objects.filter(
+        deleted_at__lt=timezone.now() - PARTICIPATION_TOMBSTONE_RETENTION
+    ).delete()
+
+
+@receiver(post_save, dispatch_uid="ephios.api.signals.invalidate_cached_responses")
+@receiver(post_delete, dispatch_uid="ephios.api.signals.invalidate_cached_responses")
+def invalidate_cached_responses_on_change(sender, instance, **kwargs):
+    if isinstance(instance, (Event, EventType, Shift, AbstractParticipation)):
+        invalidate_cached_responses()
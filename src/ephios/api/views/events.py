@@ -1,11 +1,16 @@
 import django_filters
 from django.db.models import Max, Min, Prefetch
 from django_filters.rest_framework import DjangoFilterBackend
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, extend_schema
 from oauth2_provider.contrib.rest_framework import IsAuthenticatedOrTokenHasScope
 from rest_framework import filters, viewsets
+from rest_framework.decorators import action
+from rest_framework.fields import DateTimeField
 from rest_framework.permissions import DjangoObjectPermissions
 from rest_framework_guardian import filters as guardian_filters
 
+from ephios.api.caching import CachedResponseMixin
 from ephios.api.filters import (
     EventFilterSet,
     ParticipationFilterSet,
@@ -14,17 +19,20 @@ from ephios.api.filters import (
     StartEndTimeFilterSet,
     UserinfoParticipationPermissionFilter,
 )
+from ephios.api.models import ParticipationTombstone
+from ephios.api.pagination import CursorOrLimitOffsetPagination
 from ephios.api.permissions import ViewUserModelObjectPermissions
 from ephios.api.serializers import (
     EventSerializer,
     ParticipationSerializer,
+    ParticipationTombstoneSerializer,
     ShiftSerializer,
     UserinfoParticipationSerializer,
 )
 from ephios.core.models import AbstractParticipation, Event, Shift
 
 
-class ShiftViewSet(viewsets.ReadOnlyModelViewSet):
+class ShiftViewSet(CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = ShiftSerializer
     permission_classes = [DjangoObjectPermissions, IsAuthenticatedOrTokenHasScope]
     filter_backends = [
@@ -34,16 +42,19 @@ class ShiftViewSet(viewsets.ReadOnlyModelViewSet):
         ShiftPermissionFilter,
     ]
     filterset_class = StartEndTimeFilterSet
+    ordering = ("meeting_time", "start_time", "id")
+    pagination_class = CursorOrLimitOffsetPagination
     required_scopes = ["PUBLIC_READ"]
     queryset = Shift.objects.all()
 
 
-class EventViewSet(viewsets.ReadOnlyModelViewSet):
+class EventViewSet(CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = EventSerializer
     filterset_class = EventFilterSet
     search_fields = ["title", "description", "location"]
     ordering_fields = ["start_time", "end_time", "title"]
-    ordering = ("start_time", "end_time")
+    ordering = ("start_time", "end_time", "id")
+    pagination_class = CursorOrLimitOffsetPagination
     permission_classes = [DjangoObjectPermissions, IsAuthenticatedOrTokenHasScope]
     required_scopes = ["PUBLIC_READ"]
 
@@ -68,9 +79,47 @@ class EventViewSet(viewsets.ReadOnlyModelViewSet):
     )
 
 
-class UserinfoParticipationViewSet(viewsets.ReadOnlyModelViewSet):
+class ParticipationChangeFeedMixin:
+    """
+    Paginate participations with a cursor when syncing changes with `modified_since`
+    and provide the ids of participations that were deleted since then.
+    Deletions are filtered with the `permission_filter_class` of the participation list.
+    """
+
+    permission_filter_class = None
+    pagination_class = CursorOrLimitOffsetPagination
+
+    @property
+    def force_cursor_pagination(self):
+        return self.action == "deleted" or "modified_since" in self.request.query_params
+
+    def get_cursor_ordering(self):
+        if self.action == "deleted":
+            return ("deleted_at", "id")
+        if "modified_since" in self.request.query_params:
+            return ("updated_at", "id")
+        return ("id",)
+
+    @extend_schema(
+        parameters=[OpenApiParameter("modified_since", OpenApiTypes.DATETIME, required=True)],
+        responses=ParticipationTombstoneSerializer(many=True),
+        filters=False,
+    )
+    @action(detail=False, filter_backends=[])
+    def deleted(self, request, *args, **kwargs):
+        """List participations that were deleted after `modified_since`."""
+        modified_since = DateTimeField().run_validation(request.query_params.get("modified_since"))
+        tombstones = self.permission_filter_class().filter_queryset(
+            request, ParticipationTombstone.objects.filter(deleted_at__gt=modified_since), self
+        )
+        page = self.paginate_queryset(tombstones)
+        return self.get_paginated_response(ParticipationTombstoneSerializer(page, many=True).data)
+
+
+class UserinfoParticipationViewSet(ParticipationChangeFeedMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = UserinfoParticipationSerializer
     permission_classes = [ViewUserModelObjectPermissions, IsAuthenticatedOrTokenHasScope]
+    permission_filter_class = UserinfoParticipationPermissionFilter
     filter_backends = [UserinfoParticipationPermissionFilter, DjangoFilterBackend]
     filterset_class = ParticipationFilterSet
     required_scopes = ["CONFIDENTIAL_READ"]
@@ -90,6 +139,7 @@ class ParticipationViewSet(UserinfoParticipationViewSet):
     """
 
     serializer_class = ParticipationSerializer
+    permission_filter_class = ParticipationPermissionFilter
     filter_backends = [ParticipationPermissionFilter, DjangoFilterBackend]
     permission_classes = [IsAuthenticatedOrTokenHasScope]
     required_scopes = ["CONFIDENTIAL_READ"]
@@ -21,7 +21,9 @@ from ephios.api.serializers import (
     ParticipationSerializer,
     UserinfoParticipationSerializer,
     UserProfileSerializer,
+    unexpired_grants_prefetch,
 )
+from ephios.api.views.events import ParticipationChangeFeedMixin
 from ephios.core.models import AbstractParticipation, UserProfile
 
 
@@ -37,7 +39,7 @@ class UserProfileMeView(RetrieveAPIView):
         return self.request.user
 
 
-class OwnParticipationsViewSet(viewsets.ReadOnlyModelViewSet):
+class OwnParticipationsViewSet(ParticipationChangeFeedMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = UserinfoParticipationSerializer
     permission_classes = [IsAuthenticatedOrTokenHasScope]
     filter_backends = [UserinfoParticipationPermissionFilter, DjangoFilterBackend]
@@ -52,7 +54,7 @@ class OwnParticipationsViewSet(viewsets.ReadOnlyModelViewSet):
 
 class UserViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = UserProfileSerializer
-    queryset = UserProfile.objects.all()
+    queryset = UserProfile.objects.prefetch_related(unexpired_grants_prefetch())
     permission_classes = [IsAuthenticatedOrTokenHasScope, ViewObjectPermissions]
     required_scopes = ["CONFIDENTIAL_READ"]
     search_fields = ["display_name", "email"]
@@ -73,7 +75,7 @@ class UserByMailView(RetrieveModelMixin, GenericViewSet):
     lookup_value_regex = "[^/]+"  # customize to allow dots (".") in the lookup value
 
 
-class UserParticipationView(viewsets.ReadOnlyModelViewSet):
+class UserParticipationView(ParticipationChangeFeedMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = ParticipationSerializer
     permission_classes = [IsAuthenticatedOrTokenHasScope, ViewUserModelObjectPermissions]
     filter_backends = [ParticipationPermissionFilter, DjangoFilterBackend]
@@ -14,3 +14,6 @@ class CoreAppConfig(AppConfig):
 
         EventTypePreference = self.get_model("EventTypePreference")
         preference_models.register(EventTypePreference, event_type_preference_registry)
+
+        # connect signal receivers
+        from ephios.core.services import preferences, workinghours  # noqa: F401
@@ -1,3 +1,4 @@
+import hashlib
 from calendar import HTMLCalendar, day_abbr
 from datetime import date, datetime
 from itertools import groupby
@@ -5,12 +6,19 @@ from itertools import groupby
 from django.template.loader import render_to_string
 from django.utils import timezone
 from django.utils.formats import date_format
-from django.utils.timezone import get_current_timezone
+from django.utils.timezone import get_current_timezone, get_current_timezone_name
+from django.utils.translation import get_language
 from django.utils.translation import gettext_lazy as _
 
 
 class ShiftCalendar(HTMLCalendar):
+    """
+    Month calendar of shifts, rendered in a single template pass.
+    The rendered days are cached, so paging between months does not render unchanged days again.
+    """
+
     cssclass_month = "table table-fixed"
+    cache_timeout = 60 * 60 * 24
 
     def __init__(self, shifts, request, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -21,34 +29,64 @@ class ShiftCalendar(HTMLCalendar):
 
     def formatmonth(self, theyear, themonth, withyear=True):
         self.year, self.month = theyear, themonth
-        return super().formatmonth(theyear, themonth)
+        return render_to_string(
+            "core/fragments/calendar_month.html",
+            request=self.request,
+            context={
+                "cssclass": self.cssclass_month,
+                "month_name": self.formatmonthname(theyear, themonth),
+                "weekdays": [
+                    {"cssclass": self.cssclasses[day], "name": _(day_abbr[day])}
+                    for day in self.iterweekdays()
+                ],
+                "weeks": [
+                    [self.get_day(day, weekday) for day, weekday in week]
+                    for week in self.monthdays2calendar(theyear, themonth)
+                ],
+                "cache_timeout": self.cache_timeout,
+            },
+        )
 
     def formatmonthname(self, theyear, themonth, withyear=True):
         dt = datetime(theyear, themonth, 1, tzinfo=get_current_timezone())
-        return f'<tr><th colspan="7" class="month">{date_format(dt, format="b Y")}</th></tr>'
-
-    def formatweekday(self, day):
-        return f'<th class="text-center {self.cssclasses[day]}">{_(day_abbr[day])}</th>'
-
-    def formatday(self, day, weekday):
-        if day != 0:
-            cssclass = self.cssclasses[weekday]
-            this_date = date(self.year, self.month, day)
-            today = timezone.now().date() == this_date
-            if day in self.shifts:
-                cssclass += " filled"
-            content = render_to_string(
-                "core/fragments/calendar_day.html",
-                request=self.request,
-                context={
-                    "day": day,
-                    "shifts": self.shifts.get(day, None),
-                    "today": today,
-                    "date": this_date.isoformat(),
-                },
-            )
-            return self.day_cell(cssclass, content)
-        return self.day_cell("noday", "&nbsp;")
-
-    def day_cell(self, cssclass, body):
-        return f'<td class="calendar-row-height p-0 pe-1 p-lg-1 {cssclass}">{body}</td>'
+        return date_format(dt, format="b Y")
+
+    def get_day_cache_key(self, this_date, today, shifts):
+        """
+        Return a key for the rendered day that changes whenever the content of the day could change.
+        The shifts are already filtered by the permissions of the user, so their ids cover that.
+        """
+        parts = [
+            this_date.isoformat(),
+            today,
+            get_language(),
+            get_current_timezone_name(),
+            self.request.GET.urlencode(),
+        ]
+        for shift in shifts:
+            parts += [
+                shift.pk,
+                shift.updated_at.isoformat(),
+                shift.event.updated_at.isoformat(),
+                shift.event.type_id,
+                shift.event.type.title,
+            ]
+        return hashlib.sha256("|".join(map(str, parts)).encode()).hexdigest()
+
+    def get_day(self, day, weekday):
+        if day == 0:
+            return None
+        cssclass = self.cssclasses[weekday]
+        this_date = date(self.year, self.month, day)
+        today = timezone.now().date() == this_date
+        shifts = self.shifts.get(day, [])
+        if shifts:
+            cssclass += " filled"
+        return {
+            "day": day,
+            "cssclass": cssclass,
+            "shifts": shifts,
+            "today": today,
+            "date": this_date.isoformat(),
+            "cache_key": self.get_day_cache_key(this_date, today, shifts),
+        }
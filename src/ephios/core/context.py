@@ -2,10 +2,10 @@ from collections import defaultdict
 
 from django.conf import settings
 from django.utils.translation import get_language
-from dynamic_preferences.registries import global_preferences_registry
 
 from ephios.core.dynamic import dynamic_settings
 from ephios.core.models import AbstractParticipation
+from ephios.core.services.preferences import PreferenceSnapshot
 from ephios.core.signals import footer_link, nav_link
 from ephios.core.views.pwa import get_pwa_app_icons
 
@@ -44,7 +44,7 @@ def ephios_base_context(request):
         "PWA_APP_SPLASH_SCREEN": [],
         "VAPID_PUBLIC_KEY": settings.WEBPUSH_SETTINGS.get("VAPID_PUBLIC_KEY", ""),
         "DEBUG": settings.DEBUG,
-        "organization_name": global_preferences_registry.manager()["general__organization_name"],
+        "organization_name": PreferenceSnapshot.get_global("general__organization_name"),
         "platform_name": dynamic_settings.PLATFORM_NAME,
         "brand_color": dynamic_settings.BRAND_COLOR,
     }
@@ -22,7 +22,7 @@ from ephios.core.signup.flow import enabled_signup_flows, signup_flow_from_slug
 from ephios.core.signup.structure import enabled_shift_structures, shift_structure_from_slug
 from ephios.core.widgets import MultiUserProfileWidget
 from ephios.extra.colors import clear_eventtype_color_css_fragment_cache
-from ephios.extra.permissions import get_groups_with_perms
+from ephios.extra.permissions import get_groups_with_perms, invalidate_object_permissions
 from ephios.extra.widgets import CustomDateInput, CustomTimeInput, MarkdownTextarea, RecurrenceField
 from ephios.modellogging.log import add_log_recorder, update_log
 from ephios.modellogging.recorders import (
@@ -170,6 +170,8 @@ class EventForm(forms.ModelForm):
             ),
             event,
         )
+        # guardian bulk creates permissions for multiple users or groups without sending signals
+        invalidate_object_permissions(model=Event)
 
         update_log(event, InstanceActionType.CHANGE)
         return event
@@ -28,7 +28,12 @@ from ephios.core.services.notifications.types import enabled_notification_types
 from ephios.core.signals import register_group_permission_fields
 from ephios.core.widgets import MultiUserProfileWidget
 from ephios.extra.crispy import AbortLink
-from ephios.extra.permissions import PermissionField, PermissionFormMixin, get_groups_with_perms
+from ephios.extra.permissions import (
+    PermissionField,
+    PermissionFormMixin,
+    get_groups_with_perms,
+    invalidate_object_permissions,
+)
 from ephios.extra.widgets import CustomDateInput
 from ephios.modellogging.log import add_log_recorder
 from ephios.modellogging.recorders import DerivedFieldsLogRecorder
@@ -239,6 +244,7 @@ class GroupForm(PermissionFormMixin, ModelForm):
                 group,
                 self.cleaned_data["decide_workinghours_for_group"],
             )
+        invalidate_object_permissions(model=Group)
 
         group.save()  # logging
         return group
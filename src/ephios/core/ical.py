@@ -1,22 +1,45 @@
+import hashlib
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db.models import Prefetch
+from django.core.cache import cache
+from django.db.models import Count, Max, Prefetch
+from django.http import HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from django_ical.views import ICalFeed
-from guardian.shortcuts import get_users_with_perms
-from icalendar import vCalAddress
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from icalendar import Calendar, vCalAddress
+from icalendar import Event as VEvent
 
 from ephios.core.dynamic import dynamic_settings
-from ephios.core.models import AbstractParticipation, Shift
+from ephios.core.models import AbstractParticipation, Event, Shift
 from ephios.extra.auth import access_exempt
+from ephios.extra.permissions import get_user_pks_with_object_perm
+
 
+class UserEventFeed:
+    """
+    iCal feed of the shifts a user participates in. Events, event types and the organizer
+    of each event are loaded in bulk, so rendering takes the same number of queries for any number of shifts.
+    """
 
-class EventFeed(ICalFeed):
     file_name = "events.ics"
+    content_type = "text/calendar; charset=utf-8"
     timezone = "UTC"
     product_id = "-//ephios//ephios//EN"
+    chunk_size = 500
 
-    def items(self):
-        return Shift.objects.all().filter(event__active=True).order_by("meeting_time")
+    def __init__(
+        self,
+        user,
+        include_participation_states=(AbstractParticipation.States.CONFIRMED,),
+        past_days=None,
+    ):
+        self.user = user
+        self.include_participation_states = include_participation_states
+        self.past_days = settings.CALENDAR_FEED_PAST_DAYS if past_days is None else past_days
 
     def item_title(self, item):
         if item.label:
@@ -26,12 +49,6 @@ class EventFeed(ICalFeed):
     def item_description(self, item):
         return item.event.description
 
-    def item_start_datetime(self, item):
-        return item.meeting_time
-
-    def item_end_datetime(self, item):
-        return item.end_time
-
     def item_link(self, item):
         return item.get_absolute_url()
 
@@ -42,12 +59,66 @@ class EventFeed(ICalFeed):
         return f"{item.pk}@{dynamic_settings.SITE_URL}"
 
     def item_organizer(self, item):
-        user = get_users_with_perms(item.event, only_with_perms_in=["change_event"]).first()
-        email = user.email if user else ""
-        return vCalAddress(f"MAILTO:{email}")
-
+        return vCalAddress(f"MAILTO:{self.organizer_emails.get(item.event_id, '')}")
+
+    def get_organizer_emails(self, items):
+        """
+        Return a dict mapping event ids to the email of the first user that can change the event.
+        """
+        event_ids = set(items.values_list("event_id", flat=True))
+        organizer_pks = {
+            event_id: min(user_pks)
+            for event_id, user_pks in get_user_pks_with_object_perm(
+                Event, "change_event", event_ids
+            ).items()
+            if user_pks
+        }
+        emails = dict(
+            get_user_model()
+            .objects.filter(pk__in=organizer_pks.values())
+            .values_list("pk", "email")
+        )
+        return {event_id: emails[user_pk] for event_id, user_pk in organizer_pks.items()}
+
+    def get_calendar_header(self):
+        calendar = Calendar()
+        calendar.add("version", "2.0")
+        calendar.add("prodid", self.product_id)
+        calendar.add("calscale", "GREGORIAN")
+        calendar.add("method", "PUBLISH")
+        calendar.add("x-wr-timezone", self.timezone)
+        return calendar.to_ical().removesuffix(b"END:VCALENDAR\r\n")
+
+    def get_vevent(self, item, request):
+        vevent = VEvent()
+        for name, value in (
+            ("summary", self.item_title(item)),
+            ("dtstart", self.item_start_datetime(item)),
+            ("dtend", self.item_end_datetime(item)),
+            ("dtstamp", timezone.now()),
+            ("uid", self.item_guid(item)),
+            ("description", self.item_description(item)),
+            ("location", self.item_location(item)),
+            ("organizer", self.item_organizer(item)),
+            ("status", self.item_status(item)),
+            ("url", request.build_absolute_uri(self.item_link(item))),
+        ):
+            if value:
+                vevent.add(name, value)
+        return vevent.to_ical()
+
+    def generate(self, request):
+        """Yield the calendar in chunks of single VEVENTs."""
+        items = self.items()
+        self.organizer_emails = self.get_organizer_emails(items)
+        yield self.get_calendar_header()
+        for item in items.iterator(chunk_size=self.chunk_size):
+            yield self.get_vevent(item, request)
+        yield b"END:VCALENDAR\r\n"
+
+    def render(self, request):
+        return b"".join(self.generate(request))
 
-class UserEventFeed(EventFeed):
     def item_start_datetime(self, item):
         return item.participations.all()[0].start_time
 
@@ -62,23 +133,60 @@ class UserEventFeed(EventFeed):
             AbstractParticipation.States.RESPONSIBLE_REJECTED: "CANCELLED",  # often displayed struck out
         }[item.participations.all()[0].state]
 
-    def items(self):
-        shift_ids = self.user.participations.filter(
+    def get_window_start(self):
+        # the window starts at midnight, so it only changes once a day
+        return datetime.combine(
+            timezone.localdate() - timedelta(days=self.past_days),
+            time.min,
+            tzinfo=timezone.get_current_timezone(),
+        )
+
+    def get_participations(self):
+        participations = self.user.participations.filter(
             state__in=self.include_participation_states,
-        ).values_list("shift", flat=True)
+        )
+        if self.past_days:
+            participations = participations.filter(shift__end_time__gte=self.get_window_start())
+        return participations
+
+    def get_version(self):
+        """
+        Return a version string that changes whenever the content of the feed changes.
+        The latest timestamps can move backwards when participations leave the feed, so they
+        are only used together with the count of participations and not as a modification date.
+        """
+        aggregates = self.get_participations().aggregate(
+            count=Count("id"),
+            participation_updated=Max("updated_at"),
+            shift_updated=Max("shift__updated_at"),
+            event_updated=Max("shift__event__updated_at"),
+        )
+        version = "|".join(
+            map(str, [self.past_days and self.get_window_start(), *aggregates.values()])
+        )
+        return hashlib.sha256(version.encode()).hexdigest()[:32]
+
+    def items(self):
+        shift_ids = self.get_participations().values_list("shift", flat=True)
         return (
             Shift.objects
             .filter(pk__in=shift_ids)
-            .select_related("event")
+            .select_related("event", "event__type")
             .prefetch_related(Prefetch("participations", queryset=self.user.participations.all()))
         )
 
-    def __init__(
-        self, user, include_participation_states=(AbstractParticipation.States.CONFIRMED,)
-    ):
-        super().__init__()
-        self.user = user
-        self.include_participation_states = include_participation_states
+
+USER_EVENT_FEED_CACHE_KEY = "ephios.core.ical.user_event_feed.{token}.{states}.{version}"
+USER_EVENT_FEED_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def _cache_when_complete(chunks, cache_key):
+    """Yield the chunks and cache their concatenation once all of them have been sent."""
+    content = []
+    for chunk in chunks:
+        content.append(chunk)
+        yield chunk
+    cache.set(cache_key, b"".join(content), USER_EVENT_FEED_CACHE_TIMEOUT)
 
 
 @access_exempt
@@ -88,8 +196,28 @@ def user_event_feed_view(request, *args, **kwargs):
         include_participation_states.append(AbstractParticipation.States.REQUESTED)
     if (r := request.GET.get("rejected")) and r != "0":
         include_participation_states.append(AbstractParticipation.States.RESPONSIBLE_REJECTED)
-    feed = UserEventFeed(
-        get_object_or_404(get_user_model(), **kwargs),
-        include_participation_states=include_participation_states,
+    user = get_object_or_404(get_user_model(), **kwargs)
+    feed = UserEventFeed(user, include_participation_states=include_participation_states)
+    version = feed.get_version()
+    etag = quote_etag(version)
+    # only the etag is used, as there is no modification date that never moves backwards
+    if response := get_conditional_response(request, etag=etag):
+        response["ETag"] = etag
+        return response
+
+    cache_key = USER_EVENT_FEED_CACHE_KEY.format(
+        token=user.calendar_token,
+        states="-".join(map(str, sorted(include_participation_states))),
+        version=version,
     )
-    return feed(request, *args, **kwargs)
+    if (content := cache.get(cache_key)) is not None:
+        response = HttpResponse(content, content_type=feed.content_type)
+    else:
+        # stream the feed while it is rendered, it is cached once it has been sent completely
+        response = StreamingHttpResponse(
+            _cache_when_complete(feed.generate(request), cache_key),
+            content_type=feed.content_type,
+        )
+    response["Content-Disposition"] = f'attachment; filename="{feed.file_name}"'
+    response["ETag"] = etag
+    return response
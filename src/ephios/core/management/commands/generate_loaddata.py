@@ -0,0 +1,437 @@
+import dataclasses
+import random
+import uuid
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from guardian.shortcuts import assign_perm
+
+from ephios.core.forms.users import MANAGEMENT_PERMISSIONS
+from ephios.core.models import (
+    AbstractParticipation,
+    Event,
+    EventType,
+    LocalParticipation,
+    Qualification,
+    QualificationCategory,
+    QualificationGrant,
+    Shift,
+    UserProfile,
+    WorkingHours,
+)
+from ephios.core.models.events import ParticipationComment
+from ephios.core.services.notifications.types import ParticipationStateChangeNotification
+from ephios.core.services.workinghours import rebuild_working_hours_rollup
+from ephios.extra.permissions import invalidate_object_permissions
+from ephios.plugins.complexsignup.models import (
+    BlockComposition,
+    BuildingBlock,
+    BuildingBlockType,
+    Position,
+)
+
+FIRST_NAMES = [
+    "Alex", "Anna", "Ben", "Clara", "David", "Emma", "Felix", "Greta", "Hannah", "Jonas",
+    "Julia", "Lea", "Lukas", "Marie", "Max", "Mia", "Noah", "Paul", "Sophie", "Tim",
+]  # fmt: skip
+LAST_NAMES = [
+    "Bauer", "Becker", "Fischer", "Hoffmann", "Koch", "Meyer", "Müller", "Richter", "Schäfer",
+    "Schmidt", "Schneider", "Schulz", "Wagner", "Weber", "Wolf",
+]  # fmt: skip
+EVENT_TITLES = [
+    "Concert Medical Service", "Football Match", "City Marathon", "Christmas Market",
+    "Open Air Festival", "First Aid Course", "Ambulance Duty", "Team Meeting", "Blood Drive",
+    "Disaster Relief Exercise",
+]  # fmt: skip
+LOCATIONS = ["Town Square", "Stadium", "Fairground", "Headquarters", "Town Hall", "City Park"]
+EVENT_TYPE_TITLES = ["Service", "Training", "Meeting", "Ambulance", "Exercise"]
+# weights of the participation states in generated shifts
+STATE_WEIGHTS = {
+    AbstractParticipation.States.CONFIRMED: 60,
+    AbstractParticipation.States.REQUESTED: 15,
+    AbstractParticipation.States.USER_DECLINED: 10,
+    AbstractParticipation.States.RESPONSIBLE_REJECTED: 10,
+    AbstractParticipation.States.GETTING_DISPATCHED: 5,
+}
+
+
+@dataclasses.dataclass(frozen=True)
+class LoadDataSizes:
+    """Amounts of data created by ``LoadDataGenerator``."""
+
+    users: int = 2000
+    groups: int = 20
+    qualifications: int = 40
+    qualification_depth: int = 8
+    years: int = 3
+    events_per_week: int = 10
+    future_weeks: int = 12
+
+
+class LoadDataGenerator:
+    """
+    Creates a large instance with users, groups, qualifications, events with all kinds of
+    shift structures, participations, notifications and log entries.
+    All choices are made by a random generator seeded with ``seed``, so the same options
+    on the same day always create the same data.
+    """
+
+    def __init__(self, sizes=None, *, seed=0, stdout=None):
+        self.rng = random.Random(seed)
+        self.sizes = sizes or LoadDataSizes()
+        self.stdout = stdout
+
+    @property
+    def tz(self):
+        return timezone.get_current_timezone()
+
+    def log(self, message):
+        if self.stdout is not None:
+            self.stdout.write(message)
+
+    def uuid(self):
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def generate(self):
+        self.create_users()
+        self.create_groups()
+        self.create_qualifications()
+        self.create_building_blocks()
+        self.create_events(self.create_event_types())
+        self.create_working_hours()
+        invalidate_object_permissions(model=Event, users=self.users)
+
+    def create_users(self):
+        password = make_password("password")
+        admin = UserProfile(
+            email="admin@example.com",
+            display_name="Admin Localhost",
+            date_of_birth=date(1970, 1, 1),
+            is_staff=True,
+            is_superuser=True,
+            password=password,
+        )
+        self.users = [admin] + [
+            UserProfile(
+                email=f"user{index}@example.com",
+                display_name=f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}",
+                date_of_birth=date(self.rng.randint(1950, 2008), self.rng.randint(1, 12), 1),
+                phone=f"+49 {self.rng.randint(100000000, 999999999)}",
+                password=password,
+            )
+            for index in range(self.sizes.users)
+        ]
+        UserProfile.objects.bulk_create(self.users, batch_size=1000)
+        # not all databases return primary keys from bulk_create
+        self.users = list(UserProfile.objects.order_by("pk"))
+        self.log(f"Created {len(self.users)} users.")
+
+    def create_groups(self):
+        self.groups = {
+            name: Group.objects.create(name=name.title())
+            for name in ["managers", "planners", "volunteers"]
+        }
+        managers, planners, volunteers = self.groups.values()
+        units = self.groups["units"] = [
+            Group.objects.create(name=f"Unit {index + 1}") for index in range(self.sizes.groups)
+        ]
+        for permission in MANAGEMENT_PERMISSIONS:
+            assign_perm(permission, managers)
+        assign_perm("decide_workinghours_for_group", managers, volunteers)
+        assign_perm("core.add_event", planners)
+        assign_perm("core.delete_event", planners)
+        for group in [volunteers, *units]:
+            assign_perm("publish_event_for_group", planners, group)
+
+        memberships = []
+        for index, user in enumerate(self.users):
+            groups = {volunteers, *self.rng.sample(units, min(2, len(units)))}
+            if index < max(self.sizes.users // 50, 1):
+                groups.add(planners)
+            if index < max(self.sizes.users // 200, 1):
+                groups.add(managers)
+            memberships += [
+                UserProfile.groups.through(userprofile_id=user.pk, group_id=group.pk)
+                for group in groups
+            ]
+        UserProfile.groups.through.objects.bulk_create(memberships, batch_size=1000)
+        self.log(f"Created {len(units) + 3} groups.")
+
+    def create_qualifications(self):
+        categories = [
+            QualificationCategory.objects.create(title=title, uuid=self.uuid())
+            for title in ["Medical", "License", "Technical"]
+        ]
+        layers = [[] for __ in range(self.sizes.qualification_depth)]
+        self.qualifications = []
+        for index in range(self.sizes.qualifications):
+            layer = index % self.sizes.qualification_depth
+            qualification = Qualification.objects.create(
+                title=f"Qualification {index + 1}",
+                abbreviation=f"Q{index + 1}",
+                category=self.rng.choice(categories),
+                uuid=self.uuid(),
+            )
+            if layer and layers[layer - 1]:
+                # every qualification includes some of the layer below, creating a deep DAG
+                qualification.includes.set(
+                    self.rng.sample(layers[layer - 1], min(2, len(layers[layer - 1])))
+                )
+            layers[layer].append(qualification)
+            self.qualifications.append(qualification)
+
+        today = timezone.localdate()
+        grants = []
+        for user in self.users:
+            for qualification in self.rng.sample(
+                self.qualifications, self.rng.randint(0, min(5, len(self.qualifications)))
+            ):
+                expires = None
+                if self.rng.random() < 0.5:
+                    expires = datetime.combine(
+                        today + timedelta(days=self.rng.randint(-365, 5 * 365)),
+                        time.max,
+                        tzinfo=self.tz,
+                    )
+                grants.append(
+                    QualificationGrant(user=user, qualification=qualification, expires=expires)
+                )
+        QualificationGrant.objects.bulk_create(grants, batch_size=1000)
+        self.log(f"Created {len(self.qualifications)} qualifications and {len(grants)} grants.")
+
+    def create_building_blocks(self):
+        atomic_blocks = []
+        for name in ["Ambulance", "Emergency Doctor Vehicle", "First Aid Team", "Command"]:
+            block = BuildingBlock.objects.create(
+                name=name, block_type=BuildingBlockType.ATOMIC, uuid=self.uuid()
+            )
+            for index in range(self.rng.randint(2, 4)):
+                position = Position.objects.create(
+                    block=block, label=f"Position {index + 1}", optional=index > 1
+                )
+                position.qualifications.set(self.rng.sample(self.qualifications, 1))
+            atomic_blocks.append(block)
+        composite_block = BuildingBlock.objects.create(
+            name="Station", block_type=BuildingBlockType.COMPOSITE, uuid=self.uuid()
+        )
+        for index, block in enumerate(atomic_blocks):
+            BlockComposition.objects.create(
+                composite_block=composite_block,
+                sub_block=block,
+                label=f"Unit {index + 1}",
+                optional=index > 1,
+            )
+        self.blocks = {"atomic": atomic_blocks, "composite": composite_block}
+
+    def create_event_types(self):
+        return [EventType.objects.create(title=title) for title in EVENT_TYPE_TITLES]
+
+    def get_structure(self):
+        """Return a tuple of a structure slug, its configuration and the number of participants."""
+        common = {"minimum_age": None}
+        match self.rng.choice(["uniform", "qualification_mix", "named_teams", "complex"]):
+            case "uniform":
+                maximum = self.rng.randint(2, 10)
+                return (
+                    "uniform",
+                    {
+                        **common,
+                        "minimum_number_of_participants": self.rng.randint(1, maximum),
+                        "maximum_number_of_participants": maximum,
+                        "required_qualification_ids": [
+                            q.id for q in self.rng.sample(self.qualifications, 1)
+                        ],
+                    },
+                    {},
+                )
+            case "qualification_mix":
+                return (
+                    "qualification_mix",
+                    {
+                        **common,
+                        "qualification_requirements": [
+                            {"qualification": q.id, "min_count": 1, "max_count": 2}
+                            for q in self.rng.sample(self.qualifications, 2)
+                        ],
+                    },
+                    {},
+                )
+            case "named_teams":
+                teams = [
+                    {
+                        "title": f"Team {index + 1}",
+                        "qualification": self.rng.choice(self.qualifications).id,
+                        "min_count": 1,
+                        "max_count": 4,
+                        "uuid": str(self.uuid()),
+                    }
+                    for index in range(self.rng.randint(1, 3))
+                ]
+                return (
+                    "named_teams",
+                    {**common, "choose_preferred_team": True, "teams": teams},
+                    {"teams": teams},
+                )
+            case _:
+                blocks = [self.blocks["composite"], *self.rng.sample(self.blocks["atomic"], 1)]
+                return (
+                    "complex",
+                    {
+                        **common,
+                        "choose_preferred_unit": False,
+                        "starting_blocks": [
+                            {
+                                "uuid": str(self.uuid()),
+                                "building_block": block.pk,
+                                "optional": False,
+                                "label": block.name,
+                            }
+                            for block in blocks
+                        ],
+                    },
+                    {},
+                )
+
+    def create_events(self, event_types):
+        first_week = timezone.localdate() - timedelta(
+            weeks=self.sizes.years * 52 - self.sizes.future_weeks,
+            days=timezone.localdate().weekday(),
+        )
+        weeks = self.sizes.years * 52
+        event_count = 0
+        for week in range(weeks):
+            for __ in range(self.sizes.events_per_week):
+                day = first_week + timedelta(weeks=week, days=self.rng.randint(0, 6))
+                self.create_event(day, self.rng.choice(event_types))
+                event_count += 1
+            if week % 10 == 0:
+                self.log(f"Created events for {week + 1} of {weeks} weeks.")
+        self.log(
+            f"Created {event_count} events with "
+            f"{AbstractParticipation.objects.count()} participations."
+        )
+
+    def create_event(self, day, event_type):
+        event = Event.objects.create(
+            title=self.rng.choice(EVENT_TITLES),
+            description="Your contact is Lisa Example. Her phone number is 012345678910.",
+            location=self.rng.choice(LOCATIONS),
+            type=event_type,
+            active=self.rng.random() < 0.95,
+        )
+        # some events are internal to a single unit
+        units, planners = self.groups["units"], self.groups["planners"]
+        visible_for = (
+            self.rng.choice(units)
+            if units and self.rng.random() < 0.1
+            else self.groups["volunteers"]
+        )
+        assign_perm("view_event", Group.objects.filter(pk__in=[visible_for.pk, planners.pk]), event)
+        assign_perm("change_event", planners, event)
+
+        start = datetime.combine(day, time(self.rng.randint(6, 18)), tzinfo=self.tz)
+        for __ in range(self.rng.randint(1, 3)):
+            end = start + timedelta(hours=self.rng.randint(2, 10))
+            slug, configuration, structure_info = self.get_structure()
+            shift = Shift.objects.create(
+                event=event,
+                meeting_time=start - timedelta(minutes=30),
+                start_time=start,
+                end_time=end,
+                signup_flow_slug=self.rng.choice(["instant_confirmation", "request_confirm"]),
+                signup_flow_configuration={
+                    "signup_until": None,
+                    "user_can_decline_confirmed": self.rng.random() < 0.5,
+                },
+                structure_slug=slug,
+                structure_configuration=configuration,
+            )
+            self.create_participations(shift, structure_info)
+            start = end
+
+    def create_participations(self, shift, structure_info):
+        states = list(STATE_WEIGHTS)
+        weights = list(STATE_WEIGHTS.values())
+        for user in self.rng.sample(self.users, self.rng.randint(0, 12)):
+            state = self.rng.choices(states, weights)[0]
+            structure_data = {}
+            if teams := structure_info.get("teams"):
+                team = self.rng.choice(teams)
+                structure_data["preferred_team_uuid"] = team["uuid"]
+                if state == AbstractParticipation.States.CONFIRMED:
+                    structure_data["dispatched_team_uuid"] = team["uuid"]
+            participation = LocalParticipation.objects.create(
+                shift=shift,
+                user=user,
+                state=state,
+                structure_data=structure_data,
+            )
+            if self.rng.random() < 0.05:
+                ParticipationComment.objects.create(
+                    participation=participation,
+                    text="I will be late.",
+                    visible_for=ParticipationComment.Visibility.PARTICIPANT,
+                )
+            if self.rng.random() < 0.2:
+                ParticipationStateChangeNotification.send(participation)
+
+    def create_working_hours(self):
+        today = timezone.localdate()
+        WorkingHours.objects.bulk_create(
+            [
+                WorkingHours(
+                    user=user,
+                    hours=Decimal(self.rng.randint(1, 16)) / 2,
+                    reason=self.rng.choice(["Maintenance", "Office work", "Training"]),
+                    date=today - timedelta(days=self.rng.randint(0, self.sizes.years * 365)),
+                )
+                for user in self.rng.sample(self.users, len(self.users) // 4)
+            ],
+            batch_size=1000,
+        )
+        rebuild_working_hours_rollup()
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a large instance for load testing and benchmarks. "
+        "The data is deterministic for the same seed and day."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--users", type=int, default=LoadDataSizes.users)
+        parser.add_argument("--groups", type=int, default=LoadDataSizes.groups)
+        parser.add_argument("--qualifications", type=int, default=LoadDataSizes.qualifications)
+        parser.add_argument(
+            "--qualification-depth", type=int, default=LoadDataSizes.qualification_depth
+        )
+        parser.add_argument(
+            "--years", type=int, default=LoadDataSizes.years, help="Years of events to create"
+        )
+        parser.add_argument("--events-per-week", type=int, default=LoadDataSizes.events_per_week)
+        parser.add_argument(
+            "--future-weeks",
+            type=int,
+            default=LoadDataSizes.future_weeks,
+            help="Number of weeks the events extend into the future",
+        )
+
+    def handle(self, *args, **options):
+        if UserProfile.objects.exists():
+            raise CommandError("Generating load data requires an empty database.")
+        generator = LoadDataGenerator(
+            LoadDataSizes(**{
+                field.name: options[field.name] for field in dataclasses.fields(LoadDataSizes)
+            }),
+            seed=options["seed"],
+            stdout=self.stdout,
+        )
+        with transaction.atomic():
+            generator.generate()
+        self.stdout.write(self.style.SUCCESS("Done."))
@@ -0,0 +1,10 @@
+from django.core.management import BaseCommand
+
+from ephios.core.services.workinghours import rebuild_working_hours_rollup
+
+
+class Command(BaseCommand):
+    help = "Recreate the working hours rollup used for working hours statistics"
+
+    def handle(self, *args, **options):
+        rebuild_working_hours_rollup()
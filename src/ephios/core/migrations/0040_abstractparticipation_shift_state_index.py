@@ -0,0 +1,16 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0039_alter_userprofile_disabled_notifications"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="abstractparticipation",
+            index=models.Index(fields=["shift", "state"], name="participation_shift_state"),
+        ),
+    ]
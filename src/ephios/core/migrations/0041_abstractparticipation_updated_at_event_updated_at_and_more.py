@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:02
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0040_abstractparticipation_shift_state_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="abstractparticipation",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True, default=django.utils.timezone.now, verbose_name="Last modified"
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="event",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True, default=django.utils.timezone.now, verbose_name="Last modified"
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="shift",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True, default=django.utils.timezone.now, verbose_name="Last modified"
+            ),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,100 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:56
+
+import datetime
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import ExpressionWrapper, F, Sum
+from django.db.models.functions import Coalesce, TruncDate
+
+
+def populate_rollup(apps, schema_editor):
+    LocalParticipation = apps.get_model("core", "LocalParticipation")
+    WorkingHours = apps.get_model("core", "WorkingHours")
+    WorkingHoursRollup = apps.get_model("core", "WorkingHoursRollup")
+
+    participations = (
+        LocalParticipation.objects
+        .filter(state=1)  # confirmed
+        .annotate(
+            start=Coalesce("individual_start_time", "shift__start_time"),
+            end=Coalesce("individual_end_time", "shift__end_time"),
+        )
+        .annotate(
+            day=TruncDate("start"),
+            duration=ExpressionWrapper(F("end") - F("start"), output_field=models.DurationField()),
+        )
+        .values("user_id", "day", "shift__event__type_id")
+        .annotate(total=Sum("duration"))
+        .order_by()
+    )
+    WorkingHoursRollup.objects.bulk_create(
+        [
+            WorkingHoursRollup(
+                user_id=row["user_id"],
+                date=row["day"],
+                event_type_id=row["shift__event__type_id"],
+                duration=row["total"],
+            )
+            for row in participations
+        ]
+        + [
+            WorkingHoursRollup(
+                user_id=row["user_id"],
+                date=row["date"],
+                duration=datetime.timedelta(hours=float(row["total"])),
+            )
+            for row in WorkingHours.objects
+            .values("user_id", "date")
+            .annotate(total=Sum("hours"))
+            .order_by()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0041_abstractparticipation_updated_at_event_updated_at_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="WorkingHoursRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("duration", models.DurationField()),
+                (
+                    "event_type",
+                    models.ForeignKey(
+                        null=True, on_delete=django.db.models.deletion.CASCADE, to="core.eventtype"
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "workinghoursrollup",
+                "indexes": [
+                    models.Index(
+                        fields=["date", "event_type"], name="workinghoursrollup_date_type"
+                    ),
+                    models.Index(fields=["user", "date"], name="workinghoursrollup_user_date"),
+                ],
+            },
+        ),
+        migrations.RunPython(populate_rollup, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("core", "0043_eventexportjob"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="abstractparticipation",
+            index=models.Index(fields=["updated_at"], name="participation_updated_at"),
+        ),
+    ]
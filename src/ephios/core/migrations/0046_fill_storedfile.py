@@ -0,0 +1,28 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.db import migrations
+
+
+def fill_stored_files(apps, schema_editor):
+    StoredFile = apps.get_model("core", "StoredFile")
+    root = Path(settings.MEDIA_ROOT)
+    StoredFile.objects.bulk_create(
+        [
+            StoredFile(path=path.relative_to(root).as_posix(), size=path.stat().st_size)
+            for path in root.rglob("*")
+            if path.is_file()
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0045_storedfile"),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_stored_files, migrations.RunPython.noop),
+    ]
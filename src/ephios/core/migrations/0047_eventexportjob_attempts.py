@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0046_fill_storedfile"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="eventexportjob",
+            name="attempts",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="eventexportjob",
+            name="error",
+            field=models.TextField(blank=True),
+        ),
+    ]
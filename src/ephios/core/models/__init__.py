@@ -1,11 +1,13 @@
 from .events import (
     AbstractParticipation,
     Event,
+    EventExportJob,
     EventType,
     EventTypePreference,
     LocalParticipation,
     Shift,
 )
+from .files import StoredFile
 from .users import (
     Consequence,
     Notification,
@@ -14,12 +16,14 @@ from .users import (
     QualificationGrant,
     UserProfile,
     WorkingHours,
+    WorkingHoursRollup,
 )
 
 __all__ = [
     "AbstractParticipation",
     "Consequence",
     "Event",
+    "EventExportJob",
     "EventType",
     "EventTypePreference",
     "LocalParticipation",
@@ -28,6 +32,8 @@ __all__ = [
     "QualificationCategory",
     "QualificationGrant",
     "Shift",
+    "StoredFile",
     "UserProfile",
     "WorkingHours",
+    "WorkingHoursRollup",
 ]
@@ -20,6 +20,7 @@ from django.db.models import (
     When,
 )
 from django.db.models.functions import Coalesce
+from django.dispatch import receiver
 from django.utils import formats
 from django.utils.functional import cached_property, classproperty
 from django.utils.text import slugify
@@ -28,7 +29,7 @@ from django.utils.translation import gettext_lazy as _
 from django.utils.translation import pgettext
 from dynamic_preferences.models import PerInstancePreferenceModel
 from guardian.models import GroupObjectPermission
-from guardian.shortcuts import assign_perm, get_objects_for_user
+from guardian.shortcuts import assign_perm
 from polymorphic.managers import PolymorphicManager
 from polymorphic.models import PolymorphicModel
 from polymorphic.query import PolymorphicQuerySet
@@ -92,6 +93,7 @@ class Event(Model):
     location = CharField(_("location"), max_length=254)
     type = ForeignKey(EventType, on_delete=models.CASCADE, verbose_name=_("event type"))
     active = BooleanField(default=False, verbose_name=_("active"))
+    updated_at = DateTimeField(auto_now=True, verbose_name=_("Last modified"))
     group_object_permission_set = GenericRelation(
         GroupObjectPermission, object_id_field="object_pk"
     )  # GenericRelation allows us to query Groups that have object permissions for this model in a prefetch
@@ -157,58 +159,106 @@ class Event(Model):
                 self.save()
 
 
-register_model_for_logging(Event, ModelFieldsLogConfig())
+register_model_for_logging(Event, ModelFieldsLogConfig(unlogged_fields=["id", "updated_at"]))
+
+
+class ParticipationVisibility:
+    """
+    Resolves which participations a participant is allowed to see participant data of.
+    The event, event type and user ids this depends on are computed once,
+    so the resulting condition only consists of flat lookups on indexed columns
+    and does not fan out into joins that need to be made distinct again.
+    The lookups of the event, the user and the id of participations can be changed
+    to filter other models referencing participations.
+    """
+
+    def __init__(
+        self,
+        participant: "AbstractParticipant",
+        event_lookup="shift__event",
+        user_lookup="localparticipation__user",
+        id_lookup="id",
+    ):
+        self.participant = participant
+        self.event_lookup = event_lookup
+        self.user_lookup = user_lookup
+        self.id_lookup = id_lookup
+
+    def _event_q(self, lookup, value):
+        return Q(**{f"{self.event_lookup}{lookup}": value})
+
+    def _user_q(self, lookup, value):
+        return Q(**{f"{self.user_lookup}{lookup}": value})
+
+    def _event_permission_q(self, event_permissions, perm):
+        return event_permissions.object_pks_filter(perm, field=f"{self.event_lookup}_id")
+
+    def _event_type_ids(self, *show_participant_data):
+        return set(
+            EventType.objects.filter(show_participant_data__in=show_participant_data).values_list(
+                "id", flat=True
+            )
+        )
+
+    def _local_user_condition(self, user):
+        from ephios.core.models import UserProfile
+        from ephios.extra.permissions import get_permission_resolver
+
+        event_permissions = get_permission_resolver(user, Event)
+        condition = self._event_q("__active", True)
+        if not event_permissions.has_global_perm("core.view_event"):
+            condition &= self._event_permission_q(event_permissions, "core.view_event")
+        if event_permissions.has_global_perm("core.change_event"):
+            return condition
+
+        Choices = EventType.ShowParticipantDataChoices
+        confirmed_event_ids = set(
+            user.participations.filter(state=AbstractParticipation.States.CONFIRMED).values_list(
+                "shift__event_id", flat=True
+            )
+        )
+        user_permissions = get_permission_resolver(user, UserProfile)
+        if user_permissions.has_global_perm("core.view_userprofile"):
+            user_condition = self._user_q("__isnull", False)
+        else:
+            user_condition = self._user_q("", user) | user_permissions.object_pks_filter(
+                "core.view_userprofile", field=self.user_lookup
+            )
+        return condition & (
+            self._event_q(
+                "__type_id__in", self._event_type_ids(Choices.INSTANCE_USERS, Choices.PUBLIC)
+            )
+            | (
+                self._event_q("__type_id__in", self._event_type_ids(Choices.CONFIRMED))
+                & self._event_q("_id__in", confirmed_event_ids)
+            )
+            | self._event_permission_q(event_permissions, "core.change_event")
+            | user_condition
+        )
+
+    @cached_property
+    def condition(self) -> Q:
+        from ephios.core.signup.participants import LocalUserParticipant
+
+        if isinstance(self.participant, LocalUserParticipant):
+            return self._local_user_condition(self.participant.user)
+        return self._event_q(
+            "__type_id__in", self._event_type_ids(EventType.ShowParticipantDataChoices.PUBLIC)
+        ) | Q(**{f"{self.id_lookup}__in": self.participant.all_participations()})
 
 
 class ParticipationQuerySet(PolymorphicQuerySet):
     def with_show_participant_data_to(self, participant):
         return self.annotate(
             show_participant_data=Case(
-                When(
-                    id__in=self.viewable_by(participant=participant),
-                    then=True,
-                ),
+                When(ParticipationVisibility(participant).condition, then=True),
                 default=False,
                 output_field=BooleanField(),
             ),
         )
 
     def viewable_by(self, participant):
-        from ephios.core.signup.participants import LocalUserParticipant
-
-        if not isinstance(participant, LocalUserParticipant):
-            qs = self.filter(
-                Q(
-                    shift__event__type__show_participant_data=EventType.ShowParticipantDataChoices.PUBLIC
-                )
-                | Q(id__in=participant.all_participations())
-            )
-            return qs.distinct()
-
-        viewable_events = get_objects_for_user(participant.user, "core.view_event")
-        viewable_userprofiles = get_objects_for_user(participant.user, "core.view_userprofile")
-        editable_events = get_objects_for_user(participant.user, "core.change_event")
-        participating_events = Event.objects.filter(
-            shifts__participations__in=participant.user.participations.filter(
-                state=AbstractParticipation.States.CONFIRMED
-            )
-        )
-        qs = self.filter(shift__event__in=viewable_events).filter(
-            Q(
-                shift__event__type__show_participant_data=EventType.ShowParticipantDataChoices.INSTANCE_USERS
-            )
-            | Q(
-                shift__event__type__show_participant_data=EventType.ShowParticipantDataChoices.PUBLIC
-            )
-            | Q(
-                shift__event__type__show_participant_data=EventType.ShowParticipantDataChoices.CONFIRMED,
-                shift__event__in=participating_events,
-            )
-            | Q(shift__event__in=editable_events)
-            | Q(localparticipation__user=participant.user)
-            | Q(localparticipation__user__in=viewable_userprofiles)
-        )
-        return qs.distinct()
+        return self.filter(ParticipationVisibility(participant).condition)
 
 
 class ParticipationManager(PolymorphicManager):
@@ -287,6 +337,7 @@ class AbstractParticipation(DatetimeDisplayMixin, PolymorphicModel):
     if the shift time is changed afterwards.
     """
     finished = models.BooleanField(default=False, verbose_name=_("finished"))
+    updated_at = DateTimeField(auto_now=True, verbose_name=_("Last modified"))
 
     objects = ParticipationManager()
 
@@ -308,6 +359,12 @@ class AbstractParticipation(DatetimeDisplayMixin, PolymorphicModel):
 
     class Meta:
         db_table = "abstractparticipation"
+        indexes = [
+            # participations are mostly looked up per shift and state, e.g. for counting requests
+            models.Index(fields=["shift", "state"], name="participation_shift_state"),
+            # used by API clients that sync changes incrementally
+            models.Index(fields=["updated_at"], name="participation_updated_at"),
+        ]
 
     def __str__(self):
         try:
@@ -320,7 +377,7 @@ class AbstractParticipation(DatetimeDisplayMixin, PolymorphicModel):
 
 
 PARTICIPATION_LOG_CONFIG = ModelFieldsLogConfig(
-    unlogged_fields=["id", "data", "abstractparticipation_ptr"],
+    unlogged_fields=["id", "data", "abstractparticipation_ptr", "updated_at"],
     attach_to_func=lambda instance: (Event, instance.shift.event_id),
 )
 
@@ -397,6 +454,7 @@ class Shift(DatetimeDisplayMixin, Model):
         encoder=CustomJSONEncoder,
         decoder=CustomJSONDecoder,
     )
+    updated_at = DateTimeField(auto_now=True, verbose_name=_("Last modified"))
 
     class Meta:
         verbose_name = _("shift")
@@ -494,6 +552,7 @@ class ShiftLogConfig(ModelFieldsLogConfig):
                 "signup_flow_configuration",
                 "structure_slug",
                 "structure_configuration",
+                "updated_at",
             ]
         )
 
@@ -536,6 +595,8 @@ class LocalParticipation(AbstractParticipation):
     )
 
     def save(self, *args, **kwargs):
+        from ephios.extra.permissions import clear_permission_resolvers
+
         super().save(*args, **kwargs)
         if (
             not self.user.has_perm("core.view_event", obj=self.shift.event)
@@ -545,6 +606,7 @@ class LocalParticipation(AbstractParticipation):
             # the event, if not already permitted through its group.
             # Currently, this permission does not get removed automatically.
             assign_perm("core.view_event", user_or_group=self.user, obj=self.shift.event)
+            clear_permission_resolvers(self.user)
 
     @cached_property
     def participant(self):
@@ -593,3 +655,59 @@ class EventTypePreference(PerInstancePreferenceModel):
     class Meta:
         db_table = "eventtypepreference"
         app_label = "core"  # https://github.com/agateblue/django-dynamic-preferences/issues/96
+
+
+@dont_log
+class EventExportJob(Model):
+    """
+    Export of several events into one file. The file is generated by the periodic worker
+    and handed out to the user that requested the export.
+    Generating the file is given up after ``MAX_ATTEMPTS`` failed attempts.
+    """
+
+    MAX_ATTEMPTS = 3
+
+    class Formats(models.TextChoices):
+        PDF = "pdf", _("PDF")
+        ZIP = "zip", _("ZIP archive of PDFs")
+
+    user = ForeignKey(
+        "UserProfile",
+        on_delete=models.CASCADE,
+        related_name="event_export_jobs",
+        verbose_name=_("user"),
+    )
+    events = models.ManyToManyField(Event, related_name="+", verbose_name=_("events"))
+    format = CharField(max_length=8, choices=Formats.choices, default=Formats.PDF)
+    created_at = DateTimeField(auto_now_add=True)
+    finished_at = DateTimeField(null=True, blank=True)
+    file = models.FileField(upload_to="exports/", blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        verbose_name = _("event export")
+        verbose_name_plural = _("event exports")
+
+    def __str__(self):
+        return f"{self.get_format_display()} export of {self.user} at {self.created_at}"
+
+    @property
+    def is_finished(self):
+        return self.finished_at is not None
+
+    @property
+    def has_failed(self):
+        return not self.is_finished and self.attempts >= self.MAX_ATTEMPTS
+
+
+@receiver(models.signals.post_delete, sender=EventExportJob)
+def delete_export_file(sender, instance, using, **kwargs):
+    from ephios.core.services.files import untrack_stored_file
+
+    def run_on_commit():
+        untrack_stored_file(instance.file.name)
+        instance.file.delete(save=False)
+
+    if instance.file:
+        transaction.on_commit(run_on_commit, using)
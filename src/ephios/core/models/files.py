@@ -0,0 +1,22 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from ephios.modellogging.log import dont_log
+
+
+@dont_log
+class StoredFile(models.Model):
+    """
+    Ledger of the files stored in the media storage, used to enforce the user content quota
+    without walking the media directory.
+    """
+
+    path = models.CharField(max_length=255, unique=True, verbose_name=_("path"))
+    size = models.PositiveBigIntegerField(verbose_name=_("size"))
+
+    class Meta:
+        verbose_name = _("stored file")
+        verbose_name_plural = _("stored files")
+
+    def __str__(self):
+        return str(self.path)
@@ -201,21 +201,30 @@ class UserProfile(guardian.mixins.GuardianUserMixin, PermissionsMixin, AbstractB
         end: datetime.date = datetime.date.max,
         eventtype: EventType | None = None,
     ):
+        """
+        Return the sum of working hours of the user and a list of the confirmed participations
+        and manual working hours it consists of, newest first. Like the working hours statistics,
+        items are counted for the day they start on and the sum is read from ``WorkingHoursRollup``.
+        """
         from ephios.core.models import AbstractParticipation
 
+        rollup = WorkingHoursRollup.objects.filter(user=self, date__gte=start, date__lte=end)
+        if eventtype is not None:
+            rollup = rollup.filter(event_type=eventtype)
+        hour_sum = rollup.aggregate(Sum("duration"))["duration__sum"] or datetime.timedelta()
+
         participations = (
             self.participations
             .filter(state=AbstractParticipation.States.CONFIRMED)
-            .filter(
-                start_time__date__gte=start,
-                end_time__date__lte=end,
+            .annotate(
+                date=ExpressionWrapper(TruncDate(F("start_time")), output_field=DateField()),
             )
+            .filter(date__gte=start, date__lte=end)
             .annotate(
                 duration=ExpressionWrapper(
                     (F("end_time") - F("start_time")),
                     output_field=models.DurationField(),
                 ),
-                date=ExpressionWrapper(TruncDate(F("start_time")), output_field=DateField()),
                 reason=F("shift__event__title"),
                 type=F("shift__event__type__title"),
                 origin_id=F("shift__event__pk"),
@@ -224,20 +233,19 @@ class UserProfile(guardian.mixins.GuardianUserMixin, PermissionsMixin, AbstractB
         if eventtype is not None:
             participations = participations.filter(shift__event__type=eventtype)
         participations = participations.values("duration", "date", "reason", "type", "origin_id")
-        hour_sum = (
-            participations.aggregate(Sum("duration"))["duration__sum"] or datetime.timedelta()
-        )
         workinghours = []
         if eventtype is None:
             from ephios.core.views.workinghours import MANUAL_WORKINGHOUR_TYPE
 
-            workinghours = self.workinghours_set.annotate(
-                duration=F("hours"),
-                type=Value(MANUAL_WORKINGHOUR_TYPE, output_field=CharField()),
-                origin_id=F("pk"),
-            ).values("duration", "date", "reason", "type", "origin_id")
-            hour_sum += datetime.timedelta(
-                hours=float(workinghours.aggregate(Sum("duration"))["duration__sum"] or 0)
+            workinghours = (
+                self.workinghours_set
+                .filter(date__gte=start, date__lte=end)
+                .annotate(
+                    duration=F("hours"),
+                    type=Value(MANUAL_WORKINGHOUR_TYPE, output_field=CharField()),
+                    origin_id=F("pk"),
+                )
+                .values("duration", "date", "reason", "type", "origin_id")
             )
         return hour_sum, sorted(
             chain(participations, workinghours), key=lambda k: k["date"], reverse=True
@@ -524,6 +532,33 @@ class WorkingHours(Model):
         return f"{self.hours} hours for {self.user} because of {self.reason} on {self.date}"
 
 
+@dont_log
+class WorkingHoursRollup(Model):
+    """
+    Sum of confirmed participation durations per user, day and event type, used for working hours
+    statistics. Rows without an event type contain the manual working hours of that day.
+    The table is maintained by ``ephios.core.services.workinghours`` and can be recreated
+    with the ``rebuild_working_hours_rollup`` management command.
+    """
+
+    user = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name="+")
+    date = models.DateField()
+    event_type = models.ForeignKey(EventType, on_delete=models.CASCADE, null=True)
+    duration = models.DurationField()
+
+    class Meta:
+        db_table = "workinghoursrollup"
+        indexes = [
+            models.Index(fields=["date", "event_type"], name="workinghoursrollup_date_type"),
+            models.Index(fields=["user", "date"], name="workinghoursrollup_user_date"),
+        ]
+
+    def __str__(self):
+        return (
+            f"{self.duration} for user {self.user_id} of type {self.event_type_id} on {self.date}"
+        )
+
+
 @dont_log
 class Notification(Model):
     slug = models.SlugField(max_length=255)
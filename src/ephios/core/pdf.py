@@ -1,20 +1,47 @@
+import hashlib
 import io
+import logging
+import zipfile
+from datetime import timedelta
 
+from django.contrib import messages
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models import Count, Max
 from django.http import FileResponse
-from django.utils import formats
+from django.shortcuts import redirect
+from django.urls import reverse
+from django.utils import formats, timezone, translation
+from django.utils.text import slugify
 from django.utils.timezone import get_default_timezone
+from django.utils.translation import get_language
 from django.utils.translation import gettext_lazy as _
 from django.views import View
+from django.views.generic import DetailView
+from django.views.generic.base import TemplateResponseMixin
 from django.views.generic.detail import SingleObjectMixin
 from reportlab.lib import colors
 from reportlab.lib.colors import HexColor
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
 from reportlab.lib.units import cm, mm
-from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+from reportlab.platypus import (
+    PageBreak,
+    Paragraph,
+    SimpleDocTemplate,
+    Spacer,
+    Table,
+    TableStyle,
+)
 
-from ephios.core.models import AbstractParticipation, Event
+from ephios.core.models import AbstractParticipation, Event, EventExportJob, QualificationGrant
+from ephios.core.services.files import redirect_to_file_download, track_stored_file
 from ephios.extra.mixins import CustomPermissionRequiredMixin
+from ephios.extra.permissions import get_permission_resolver
+
+logger = logging.getLogger(__name__)
 
 
 class BasePDFExporter:
@@ -28,7 +55,7 @@ class BasePDFExporter:
     def content_width(self):
         return self.pagesize[0] - 2 * self.margin
 
-    def get_pdf(self):
+    def render(self):
         buffer = io.BytesIO()
         story = self.get_story()
         p = SimpleDocTemplate(
@@ -41,8 +68,10 @@ class BasePDFExporter:
             bottomMargin=self.margin,
         )
         p.build(story)
-        buffer.seek(0)
-        return FileResponse(buffer, as_attachment=True, filename=f"{self.title}.pdf")
+        return buffer.getvalue()
+
+    def get_pdf(self):
+        return pdf_response(self.render(), self.title)
 
     def get_story(self):
         return NotImplemented
@@ -200,12 +229,174 @@ class MultipleShiftEventExporter(EventExport):
         return story
 
 
+class MultipleEventExporter(BasePDFExporter):
+    def __init__(self, events, title):
+        self.events = events
+        super().__init__(title=title)
+
+    def get_story(self):
+        story = []
+        for event in self.events:
+            if story:
+                story.append(PageBreak())
+            story += get_event_exporter(event).get_story()
+        return story
+
+
+def get_event_exporter(event):
+    if event.shifts.count() > 1:
+        return MultipleShiftEventExporter(event=event)
+    return SingleShiftEventExporter(event=event)
+
+
+def pdf_response(content, title):
+    return FileResponse(io.BytesIO(content), as_attachment=True, filename=f"{title}.pdf")
+
+
+EVENT_PDF_CACHE_KEY = "ephios.core.pdf.event.{pk}.{version}"
+EVENT_PDF_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def get_event_version(event):
+    """
+    Return a string that changes whenever the content of the event PDF changes, i.e. when the
+    event, its shifts, its participations or the qualifications of its participants change.
+    """
+    shifts = event.shifts.aggregate(count=Count("id"), updated=Max("updated_at"))
+    participations = AbstractParticipation.objects.filter(shift__event=event).aggregate(
+        count=Count("id"), updated=Max("updated_at")
+    )
+    grants = QualificationGrant.objects.filter(user__participations__shift__event=event).aggregate(
+        count=Count("id"), last=Max("id"), expires=Max("expires")
+    )
+    version = "|".join(
+        map(
+            str,
+            [
+                event.updated_at,
+                get_language(),
+                timezone.localdate(),  # expired qualifications are not shown
+                *shifts.values(),
+                *participations.values(),
+                *grants.values(),
+            ],
+        )
+    )
+    return hashlib.sha256(version.encode()).hexdigest()[:32]
+
+
+def get_event_pdf(event):
+    """Return the PDF of the event as bytes, rendering it only if the event changed."""
+    cache_key = EVENT_PDF_CACHE_KEY.format(pk=event.pk, version=get_event_version(event))
+    if (content := cache.get(cache_key)) is None:
+        content = get_event_exporter(event).render()
+        cache.set(cache_key, content, EVENT_PDF_CACHE_TIMEOUT)
+    return content
+
+
+def get_event_file_name(event):
+    return f"{slugify(event.title)}-{event.pk}.pdf"
+
+
+def generate_event_export(job: EventExportJob):
+    events = job.events.select_related("type").order_by("pk")
+    events = sorted(events, key=lambda event: (event.get_start_time(), event.pk))
+    if job.format == EventExportJob.Formats.ZIP:
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for event in events:
+                archive.writestr(get_event_file_name(event), get_event_pdf(event))
+        content, extension = buffer.getvalue(), "zip"
+    elif len(events) == 1:
+        content, extension = get_event_pdf(events[0]), "pdf"
+    else:
+        content, extension = MultipleEventExporter(events, title=_("Events")).render(), "pdf"
+    job.file.save(f"events-{job.pk}.{extension}", ContentFile(content), save=False)
+    job.finished_at = timezone.now()
+    job.save(update_fields=["file", "finished_at"])
+    track_stored_file(job.file)
+
+
+EVENT_EXPORT_RETENTION = timedelta(days=1)
+
+
+def generate_pending_event_exports():
+    """
+    Generate the files of all requested event exports and delete expired exports.
+    Failed exports are retried on the next runs until they ran out of attempts.
+    """
+    pending = EventExportJob.objects.filter(
+        finished_at__isnull=True, attempts__lt=EventExportJob.MAX_ATTEMPTS
+    )
+    for job_pk in pending.values_list("pk", flat=True):
+        with transaction.atomic():
+            job = (
+                pending
+                .select_for_update(skip_locked=True)
+                .filter(pk=job_pk)
+                .select_related("user")
+                .first()
+            )
+            if job is None:
+                continue
+            try:
+                with transaction.atomic(), translation.override(job.user.preferred_language):
+                    generate_event_export(job)
+            except Exception as e:  # pylint: disable=broad-except
+                logger.exception(f"Event export #{job.pk} failed")
+                job.attempts += 1
+                job.error = str(e) or type(e).__name__
+                job.save(update_fields=["attempts", "error"])
+    for job in EventExportJob.objects.filter(
+        created_at__lt=timezone.now() - EVENT_EXPORT_RETENTION
+    ):
+        job.delete()
+
+
 class EventDetailPDFView(CustomPermissionRequiredMixin, SingleObjectMixin, View):
     permission_required = "core.view_event"
     model = Event
 
     def get(self, request, *args, **kwargs):
         event = self.get_object()
-        if event.shifts.count() > 1:
-            return MultipleShiftEventExporter(event=event).get_pdf()
-        return SingleShiftEventExporter(event=event).get_pdf()
+        return pdf_response(get_event_pdf(event), event.title)
+
+
+class EventBulkExportView(LoginRequiredMixin, TemplateResponseMixin, View):
+    template_name = "core/event_bulk_export.html"
+
+    def get_events(self):
+        return (
+            get_permission_resolver(self.request.user, Event)
+            .filter_queryset(Event.objects.all(), "core.view_event")
+            .filter(pk__in=self.request.POST.getlist("bulk_action"))
+        )
+
+    def post(self, request, *args, **kwargs):
+        events = self.get_events()
+        if not events:
+            messages.info(request, _("No events were selected for export."))
+            return redirect(reverse("core:event_list"))
+        if request.POST.get("confirm"):
+            job = EventExportJob.objects.create(
+                user=request.user,
+                format=request.POST.get("format")
+                if request.POST.get("format") in EventExportJob.Formats.values
+                else EventExportJob.Formats.PDF,
+            )
+            job.events.set(events)
+            return redirect(reverse("core:event_export_job", kwargs={"pk": job.pk}))
+        return self.render_to_response({"events": events, "formats": EventExportJob.Formats})
+
+
+class EventExportJobView(LoginRequiredMixin, DetailView):
+    model = EventExportJob
+
+    def get_queryset(self):
+        return EventExportJob.objects.filter(user=self.request.user)
+
+    def get(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        if self.object.is_finished:
+            return redirect_to_file_download(request, self.object.file)
+        return self.render_to_response(self.get_context_data(object=self.object))
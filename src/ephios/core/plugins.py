@@ -3,7 +3,6 @@ import logging
 from django.apps import AppConfig, apps
 from django.conf import settings
 from django.dispatch import Signal
-from dynamic_preferences.registries import global_preferences_registry
 
 logger = logging.getLogger(__name__)
 
@@ -32,7 +31,9 @@ def get_enabled_plugins():
     """
     Return a subset of all plugin meta classes - those that are enabled
     """
-    enabled_plugins = global_preferences_registry.manager().get("general__enabled_plugins")
+    from ephios.core.services.preferences import PreferenceSnapshot
+
+    enabled_plugins = PreferenceSnapshot.get_global("general__enabled_plugins")
     yield from (
         plugin
         for plugin in get_all_plugins()
@@ -0,0 +1,142 @@
+from datetime import datetime
+
+from django.contrib.auth.models import Group
+from django.db import transaction
+from django.utils import timezone
+from guardian.ctypes import get_content_type
+from guardian.models import GroupObjectPermission, UserObjectPermission
+from guardian.shortcuts import get_objects_for_user, get_users_with_perms
+
+from ephios.api.caching import invalidate_cached_responses
+from ephios.core.models import Event, Shift
+from ephios.extra.database import bulk_create_with_pks, copy_instance
+from ephios.extra.permissions import (
+    get_groups_with_perms,
+    get_permissions_from_qualified_names,
+    invalidate_object_permissions,
+)
+
+
+class EventCopier:
+    """
+    Copies an event with its shifts to a list of dates.
+    Permissions of the original event are computed once and all events, shifts and
+    object permissions are created in bulk, so the number of queries does not
+    depend on the number of copies (unless the database does not return the
+    primary keys of bulk inserted rows).
+    """
+
+    def __init__(self, event: Event, user):
+        self.event = event
+        self.user = user
+        self.tz = timezone.get_current_timezone()
+        self.shifts = list(event.shifts.order_by("start_time"))
+        self.start_date = event.get_start_time().astimezone(self.tz).date()
+
+    def _get_group_permissions(self):
+        can_publish_for_groups = set(
+            get_objects_for_user(self.user, "publish_event_for_group", klass=Group).values_list(
+                "pk", flat=True
+            )
+        )
+        view_groups = {
+            group.pk
+            for group in get_groups_with_perms(self.event, only_with_perms_in=["view_event"])
+            if group.pk in can_publish_for_groups
+        }
+        change_groups = {
+            group.pk
+            for group in get_groups_with_perms(self.event, only_with_perms_in=["change_event"])
+        }
+        return {"core.view_event": view_groups, "core.change_event": change_groups}
+
+    def _get_user_permissions(self):
+        change_users = {
+            user.pk
+            for user in get_users_with_perms(
+                self.event, only_with_perms_in=["change_event"], with_group_users=False
+            )
+        }
+        return {
+            "core.view_event": {self.user.pk},
+            "core.change_event": change_users | {self.user.pk},
+        }
+
+    def _copy_shift(self, shift, date, event):
+        tz = self.tz
+        shift = copy_instance(shift, event=event)
+        # shifts on following days should have the same offset from the new date
+        offset = shift.start_time.astimezone(tz).date() - self.start_date
+        # shifts ending on the next day should end on the next day to the new date
+        end_offset = shift.end_time.astimezone(tz).date() - shift.start_time.astimezone(tz).date()
+        shift.meeting_time = datetime.combine(
+            date + offset, shift.meeting_time.astimezone(tz).time(), tzinfo=tz
+        )
+        shift.start_time = datetime.combine(
+            date + offset, shift.start_time.astimezone(tz).time(), tzinfo=tz
+        )
+        shift.end_time = datetime.combine(
+            date + offset + end_offset, shift.end_time.astimezone(tz).time(), tzinfo=tz
+        )
+        return shift
+
+    def _create_permissions(self, copies):
+        permissions = {
+            f"{permission.content_type.app_label}.{permission.codename}": permission
+            for permission in get_permissions_from_qualified_names([
+                "core.view_event",
+                "core.change_event",
+            ]).select_related("content_type")
+        }
+        content_type = get_content_type(Event)
+        GroupObjectPermission.objects.bulk_create(
+            GroupObjectPermission(
+                permission=permissions[name],
+                group_id=group_id,
+                content_type=content_type,
+                object_pk=str(event.pk),
+            )
+            for name, group_ids in self._get_group_permissions().items()
+            for group_id in group_ids
+            for event in copies
+        )
+        UserObjectPermission.objects.bulk_create(
+            UserObjectPermission(
+                permission=permissions[name],
+                user_id=user_id,
+                content_type=content_type,
+                object_pk=str(event.pk),
+            )
+            for name, user_ids in self._get_user_permissions().items()
+            for user_id in user_ids
+            for event in copies
+        )
+        invalidate_object_permissions(model=Event)
+
+    def copy_to(self, dates):
+        """
+        Create a copy of the event for every date in `dates` and return the list of copies.
+        Afterwards, `event_copy` is sent so plugins can copy their related data in bulk.
+        """
+        from ephios.core.signals import event_copy
+
+        dates = [date.date() if isinstance(date, datetime) else date for date in dates]
+        with transaction.atomic():
+            copies = bulk_create_with_pks(
+                Event, [copy_instance(self.event, type=self.event.type) for _ in dates]
+            )
+
+            shift_copies = {shift: [] for shift in self.shifts}
+            shifts_to_create = []
+            for date, event in zip(dates, copies):
+                for shift in self.shifts:
+                    shift_copy = self._copy_shift(shift, date, event)
+                    shift_copies[shift].append(shift_copy)
+                    shifts_to_create.append(shift_copy)
+            bulk_create_with_pks(Shift, shifts_to_create)
+
+            self._create_permissions(copies)
+            # the bulk queries don't send the signals that invalidate cached api responses
+            invalidate_cached_responses()
+            event_copy.send(sender=None, event=self.event, copies=copies, shift_copies=shift_copies)
+        return copies
@@ -0,0 +1,186 @@
+import codecs
+import csv
+import re
+import zipfile
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from django.dispatch import receiver
+from django.http import Http404, StreamingHttpResponse
+from django.utils.translation import gettext_lazy as _
+
+from ephios.core.signals import register_export_formats
+
+
+def installed_export_formats():
+    for __, export_formats in register_export_formats.send(None):
+        yield from (export_format() for export_format in export_formats)
+
+
+def export_format_from_slug(slug):
+    for export_format in installed_export_formats():
+        if export_format.slug == slug:
+            return export_format
+    raise ValueError(_("Export format '{slug}' was not found.").format(slug=slug))
+
+
+class AbstractExportFormat:
+    """
+    A file format tabular data can be exported to. ``render`` gets the header row and an iterable
+    of rows and yields the file in chunks of bytes, so exports can be streamed to the client.
+    Pass querysets as ``.iterator(chunk_size=...)`` to avoid loading all rows into memory.
+    """
+
+    slug = None
+    verbose_name = None
+    file_extension = None
+    content_type = None
+
+    def render(self, header, rows):
+        raise NotImplementedError
+
+
+class _ChunkBuffer:
+    """A write-only file-like object that collects written data until it is drained."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(
+            chunk.encode() if isinstance(chunk, str) else bytes(chunk) for chunk in self.chunks
+        )
+        self.chunks = []
+        return data
+
+
+class CSVExportFormat(AbstractExportFormat):
+    slug = "csv"
+    verbose_name = _("CSV")
+    file_extension = "csv"
+    content_type = "text/csv"
+
+    def render(self, header, rows):
+        buffer = _ChunkBuffer()
+        writer = csv.writer(buffer)
+        yield codecs.BOM_UTF8  # needed for excel to recognise utf-8 encoding
+        writer.writerow(header)
+        for row in rows:
+            writer.writerow(row)
+            yield buffer.drain()
+        yield buffer.drain()
+
+
+class XLSXExportFormat(AbstractExportFormat):
+    """
+    Minimal streaming writer for Office Open XML spreadsheets with a single worksheet.
+    The zip archive is written to a non-seekable buffer, so no part of the file needs to be
+    kept in memory after it has been yielded.
+    """
+
+    slug = "xlsx"
+    verbose_name = _("Excel")
+    file_extension = "xlsx"
+    content_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    rows_per_chunk = 100
+
+    STATIC_PARTS = {
+        "[Content_Types].xml": (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" '
+            'ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" ContentType="application/'
+            'vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/'
+            'vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            "</Types>"
+        ),
+        "_rels/.rels": (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/'
+            '2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+            "</Relationships>"
+        ),
+        "xl/workbook.xml": (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            '<sheets><sheet name="Sheet1" sheetId="1" r:id="rId1"/></sheets>'
+            "</workbook>"
+        ),
+        "xl/_rels/workbook.xml.rels": (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/'
+            '2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+            "</Relationships>"
+        ),
+    }
+    ILLEGAL_CHARACTERS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+    def format_cell(self, value):
+        if value is None:
+            return "<c/>"
+        if isinstance(value, bool):
+            return f'<c t="b"><v>{int(value)}</v></c>'
+        if isinstance(value, int | float | Decimal):
+            return f"<c><v>{value}</v></c>"
+        text = escape(self.ILLEGAL_CHARACTERS.sub("", str(value)))
+        return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+    def format_row(self, row):
+        return f"<row>{''.join(self.format_cell(value) for value in row)}</row>".encode()
+
+    def render(self, header, rows):
+        buffer = _ChunkBuffer()
+        with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for name, content in self.STATIC_PARTS.items():
+                archive.writestr(name, content)
+            with archive.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+                sheet.write(
+                    b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                    b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                    b"<sheetData>"
+                )
+                sheet.write(self.format_row(header))
+                for index, row in enumerate(rows):
+                    sheet.write(self.format_row(row))
+                    if index % self.rows_per_chunk == 0:
+                        yield buffer.drain()
+                sheet.write(b"</sheetData></worksheet>")
+        yield buffer.drain()
+
+
+@receiver(register_export_formats, dispatch_uid="ephios.core.services.export.register_formats")
+def register_core_export_formats(sender, **kwargs):
+    return [CSVExportFormat, XLSXExportFormat]
+
+
+def get_export_response(request, filename, header, rows):
+    """
+    Return a streaming response with the header and rows rendered in the format that is
+    selected by the ``format`` GET parameter. ``filename`` is given without file extension.
+    """
+    try:
+        export_format = export_format_from_slug(request.GET.get("format", CSVExportFormat.slug))
+    except ValueError as e:
+        raise Http404(e) from e
+    return StreamingHttpResponse(
+        export_format.render(header, rows),
+        content_type=export_format.content_type,
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="{filename}.{export_format.file_extension}"'
+            )
+        },
+    )
@@ -1,19 +1,32 @@
+import mimetypes
 import os
 import random
+import re
 import string
+from pathlib import Path
 from urllib.parse import urljoin, urlsplit, urlunsplit
 
 from django.conf import settings
 from django.core.cache import cache
 from django.core.exceptions import PermissionDenied
-from django.http import FileResponse, Http404, HttpResponse
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.db.models import Sum
+from django.db.models.functions import Coalesce
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
 from django.shortcuts import redirect
 from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import content_disposition_header, http_date, quote_etag
 from django.views import View
 
 from ephios.core.dynamic import dynamic_settings
+from ephios.core.models import StoredFile
 from ephios.extra.auth import access_exempt
 
+MEDIA_RANGE_RE = re.compile(r"^\s*bytes=(?P<start>\d*)-(?P<end>\d*)\s*$")
+MEDIA_RANGE_CHUNK_SIZE = 64 * 1024
+
 
 class UserContentView(View):
     """
@@ -37,22 +50,104 @@ class FileTicketView(UserContentView):
     """
 
     def get(self, request, *args, **kwargs):
-        file = cache.get(self.kwargs["ticket"])
-        if file is None:
+        name = cache.get(self.kwargs["ticket"])
+        if name is None:
             raise Http404()
-        return accelerated_media_response(file)
+        return accelerated_media_response(request, name)
 
 
-def accelerated_media_response(file):
+def accelerated_media_response(request, name, storage=default_storage):
+    """
+    Respond with the stored file ``name`` as a download.
+    """
     if settings.FALLBACK_MEDIA_SERVING:
-        # use built-in django file serving - only as a fallback as this is slow
-        response = FileResponse(file)
+        # use built-in django file serving - only as a fallback as this is slower
+        return media_file_response(request, name, storage)
+    # use nginx x-accel-redirect for faster file serving
+    # nginx needs to be set up to serve files from the media url
+    response = HttpResponse()
+    response["X-Accel-Redirect"] = storage.url(name)
+    response["Content-Disposition"] = content_disposition_header(True, os.path.basename(name))
+    return response
+
+
+def _parse_range(header, size):
+    """
+    Return a tuple of the first and last byte requested by a ``Range`` header or None
+    if the header should be ignored. Raises ValueError if the range can not be satisfied.
+    """
+    # multiple ranges are rarely used for downloads, so we answer them with the whole file
+    if not (match := MEDIA_RANGE_RE.match(header)) or not (match["start"] or match["end"]):
+        return None
+    if not match["start"]:
+        # suffix range of the last bytes
+        first, last = max(size - int(match["end"]), 0), size - 1
+        if not int(match["end"]):
+            raise ValueError
     else:
-        # use nginx x-accel-redirect for faster file serving
-        # nginx needs to be set up to serve files from the media url
-        response = HttpResponse()
-        response["X-Accel-Redirect"] = file.url
-    response["Content-Disposition"] = "attachment; filename=" + os.path.split(file.name)[1]
+        first = int(match["start"])
+        last = min(int(match["end"]), size - 1) if match["end"] else size - 1
+    if first > last:
+        raise ValueError
+    return first, last
+
+
+def _file_range_iterator(file, first, length):
+    with file:
+        file.seek(first)
+        while length > 0 and (chunk := file.read(min(length, MEDIA_RANGE_CHUNK_SIZE))):
+            length -= len(chunk)
+            yield chunk
+
+
+def _media_file_content_response(request, name, storage, size, etag, last_modified):
+    filename = os.path.basename(name)
+    range_header = request.headers.get("Range")
+    if range_header and request.headers.get("If-Range", etag) not in {
+        etag,
+        http_date(last_modified),
+    }:
+        # the file changed since the client downloaded the first part
+        range_header = None
+    try:
+        byte_range = _parse_range(range_header, size) if range_header else None
+    except ValueError:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+        return response
+    if byte_range is None:
+        # complete files are streamed with the wsgi.file_wrapper, using sendfile where available
+        return FileResponse(storage.open(name, "rb"), as_attachment=True, filename=filename)
+    first, last = byte_range
+    response = StreamingHttpResponse(
+        _file_range_iterator(storage.open(name, "rb"), first, last - first + 1),
+        status=206,
+        content_type=mimetypes.guess_type(filename)[0] or "application/octet-stream",
+    )
+    response["Content-Length"] = last - first + 1
+    response["Content-Range"] = f"bytes {first}-{last}/{size}"
+    response["Content-Disposition"] = content_disposition_header(True, filename)
+    return response
+
+
+def media_file_response(request, name, storage=default_storage):
+    """
+    Serve a stored file with support for conditional requests and byte ranges.
+    """
+    try:
+        size = storage.size(name)
+        last_modified = int(storage.get_modified_time(name).timestamp())
+    except OSError as e:
+        raise Http404() from e
+    etag = quote_etag(f"{last_modified:x}-{size:x}")
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    ) or _media_file_content_response(request, name, storage, size, etag, last_modified)
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    response["Accept-Ranges"] = "bytes"
+    # files are only served to authorized users and may change, so clients have to revalidate
+    patch_cache_control(response, private=True, no_cache=True)
     return response
 
 
@@ -60,11 +155,11 @@ def file_ticket(file):
     key = "".join(
         random.SystemRandom().choice(string.ascii_uppercase + string.digits) for __ in range(32)
     )
-    cache.set(key, file, 60)
+    cache.set(key, file.name, 60)
     return key
 
 
-def redirect_to_file_download(field_file):
+def redirect_to_file_download(request, field_file):
     """
     Shortcut for redirecting to the ticketed media file download view.
     """
@@ -72,7 +167,7 @@ def redirect_to_file_download(field_file):
         ticket = file_ticket(field_file)
         path = reverse("core:file_ticket", kwargs={"ticket": ticket})
         return redirect(urlunsplit(("http" if settings.DEBUG else "https", loc, path, "", "")))
-    return accelerated_media_response(field_file)
+    return accelerated_media_response(request, field_file.name, field_file.storage)
 
 
 class EphiosMediaFileMiddleware:
@@ -91,3 +186,62 @@ class EphiosMediaFileMiddleware:
         ):
             return redirect(urljoin(dynamic_settings.SITE_URL, request.path))
         return response
+
+
+USERCONTENT_USED_CACHE_KEY = "ephios.core.services.files.usercontent_used"
+USERCONTENT_USED_CACHE_TIMEOUT = 60 * 60
+STORED_FILES_RECONCILED_CACHE_KEY = "ephios.core.services.files.stored_files_reconciled"
+STORED_FILES_RECONCILE_INTERVAL = 60 * 60 * 24
+
+
+def track_stored_file(field_file):
+    """Add a stored file to the ledger of the user content quota."""
+    StoredFile.objects.update_or_create(path=field_file.name, defaults={"size": field_file.size})
+    cache.delete(USERCONTENT_USED_CACHE_KEY)
+
+
+def untrack_stored_file(name):
+    """Remove a deleted file from the ledger of the user content quota."""
+    StoredFile.objects.filter(path=name).delete()
+    cache.delete(USERCONTENT_USED_CACHE_KEY)
+
+
+def get_usercontent_used():
+    """Return the number of bytes used by stored files according to the ledger."""
+    used = cache.get(USERCONTENT_USED_CACHE_KEY)
+    if used is None:
+        used = StoredFile.objects.aggregate(used=Coalesce(Sum("size"), 0))["used"]
+        cache.set(USERCONTENT_USED_CACHE_KEY, used, USERCONTENT_USED_CACHE_TIMEOUT)
+    return used
+
+
+def reconcile_stored_files():
+    """
+    Walk the media directory and correct the ledger of stored files, e.g. for files
+    written or deleted without being tracked or after restoring a backup.
+    """
+    root = Path(settings.MEDIA_ROOT)
+    sizes = {
+        path.relative_to(root).as_posix(): path.stat().st_size
+        for path in root.rglob("*")
+        if path.is_file()
+    }
+    tracked = dict(StoredFile.objects.values_list("path", "size"))
+    deleted = list(tracked.keys() - sizes.keys())
+    for start in range(0, len(deleted), 1000):
+        StoredFile.objects.filter(path__in=deleted[start : start + 1000]).delete()
+    StoredFile.objects.bulk_create(
+        [
+            StoredFile(path=path, size=size)
+            for path, size in sizes.items()
+            if tracked.get(path) != size
+        ],
+        update_conflicts=True,
+        # MySQL upserts on any unique constraint and does not support specifying it
+        unique_fields=(
+            ["path"] if connection.features.supports_update_conflicts_with_target else None
+        ),
+        update_fields=["size"],
+        batch_size=1000,
+    )
+    cache.delete(USERCONTENT_USED_CACHE_KEY)
@@ -1,15 +1,19 @@
 import shutil
+from datetime import timedelta
 
 from django.conf import settings
 from django.contrib.auth.models import Permission
 from django.contrib.humanize.templatetags.humanize import naturaltime
 from django.dispatch import receiver
 from django.template.defaultfilters import floatformat
+from django.utils import timezone
+from django.utils.html import format_html_join
 from django.utils.safestring import mark_safe
 from django.utils.translation import gettext_lazy as _
 
 from ephios.core.dynamic_preferences_registry import LastRunPeriodicCall
 from ephios.core.signals import register_healthchecks
+from ephios.extra.middleware import get_slow_requests
 
 # health checks are meant to monitor the health of the application while it is running
 # in contrast there are django checks which are meant to check the configuration of the application
@@ -194,9 +198,41 @@ class DiskSpaceHealthCheck(AbstractHealthCheck):
         )
 
 
+class SlowRequestsHealthCheck(AbstractHealthCheck):
+    slug = "slow_requests"
+    name = _("Response times")
+    description = _("Pages should load quickly, even with a lot of data.")
+    documentation_link = (
+        "https://docs.ephios.de/en/stable/admin/configuration/index.html#data-storage-and-logging"
+    )
+
+    def check(self):
+        slow_requests = get_slow_requests(since=timezone.now() - timedelta(days=1))
+        if not slow_requests:
+            return HealthCheckStatus.OK, _("No slow requests in the last 24 hours.")
+        return (
+            HealthCheckStatus.WARNING,
+            mark_safe(
+                _("Slow requests in the last 24 hours: {endpoints}").format(
+                    endpoints=format_html_join(
+                        ", ",
+                        "{} ({}&times;, up to {}&nbsp;s)",
+                        (
+                            (url_name, count, floatformat(max_duration, 1))
+                            for url_name, (count, max_duration, __) in sorted(
+                                slow_requests.items(), key=lambda item: -item[1][1]
+                            )
+                        ),
+                    )
+                )
+            ),
+        )
+
+
 @receiver(register_healthchecks, dispatch_uid="ephios.core.healthchecks.register_core_healthchecks")
 def register_core_healthchecks(sender, **kwargs):
     yield DBHealthCheck
     yield CacheHealthCheck
     yield CronJobHealthCheck
     yield DiskSpaceHealthCheck
+    yield SlowRequestsHealthCheck
@@ -230,22 +230,32 @@ class ParticipationMixin:
         ]
 
     @classmethod
-    def send(cls, participation: AbstractParticipation, **additional_data):
+    def build(cls, participation: AbstractParticipation, **additional_data):
+        """
+        Return unsaved notifications for the participation, so that notifications for
+        multiple participations can be created at once.
+        """
         user = (
             participation.user
             if participation.get_real_instance_class() == LocalParticipation
             else None
         )
-        Notification.objects.create(
-            slug=cls.slug,
-            user=user,
-            data={
-                "participation_id": participation.id,
-                "participation_state": participation.state,
-                "email": participation.participant.email,
-                **additional_data,
-            },
-        )
+        return [
+            Notification(
+                slug=cls.slug,
+                user=user,
+                data={
+                    "participation_id": participation.id,
+                    "participation_state": participation.state,
+                    "email": participation.participant.email,
+                    **additional_data,
+                },
+            )
+        ]
+
+    @classmethod
+    def send(cls, participation: AbstractParticipation, **additional_data):
+        Notification.objects.bulk_create(cls.build(participation, **additional_data))
 
 
 class ParticipationStateChangeNotification(ParticipationMixin, AbstractNotificationHandler):
@@ -313,18 +323,25 @@ class ParticipationCustomizationNotification(ParticipationMixin, AbstractNotific
         return message
 
 
+def get_responsible_users(event):
+    """
+    Return the users responsible for the event. Pass them to ``build`` of responsible notifications
+    to avoid looking them up again for every participation.
+    """
+    return list(get_users_with_perms(event, only_with_perms_in=["change_event"]).distinct())
+
+
 class ResponsibleMixin:
     @classmethod
-    def _other_responsible_users(cls, participation: AbstractParticipation):
+    def _other_responsible_users(cls, participation: AbstractParticipation, responsible_users=None):
         """
         Yield users responsible for the participation's event that should receive a notification.
         This excludes: users if it is their own participation (as they will receive the normal participation notification)
         Notifications for the acting user are filtered elsewhere.
         """
-        users = get_users_with_perms(
-            participation.shift.event, only_with_perms_in=["change_event"]
-        ).distinct()
-        for user in users:
+        if responsible_users is None:
+            responsible_users = get_responsible_users(participation.shift.event)
+        for user in responsible_users:
             if (
                 participation.get_real_instance_class() == LocalParticipation
                 and user == participation.user
@@ -333,22 +350,31 @@ class ResponsibleMixin:
             yield user
 
     @classmethod
-    def send(cls, participation: AbstractParticipation, **additional_data):
-        Notification.objects.bulk_create([
+    def build(cls, participation: AbstractParticipation, responsible_users=None, **additional_data):
+        """
+        Return unsaved notifications for the participation. Pass ``responsible_users`` from
+        ``get_responsible_users`` when building notifications for multiple participations of an event.
+        """
+        disposition_url = make_absolute(
+            reverse("core:shift_disposition", kwargs={"pk": participation.shift.pk}),
+        )
+        return [
             Notification(
                 slug=cls.slug,
                 user=user,
                 data={
-                    "disposition_url": make_absolute(
-                        reverse("core:shift_disposition", kwargs={"pk": participation.shift.pk}),
-                    ),
+                    "disposition_url": disposition_url,
                     "participation_id": participation.id,
                     "participation_state": participation.state,
                     **additional_data,
                 },
             )
-            for user in cls._other_responsible_users(participation)
-        ])
+            for user in cls._other_responsible_users(participation, responsible_users)
+        ]
+
+    @classmethod
+    def send(cls, participation: AbstractParticipation, **additional_data):
+        Notification.objects.bulk_create(cls.build(participation, **additional_data))
 
     @classmethod
     def get_actions(cls, notification):
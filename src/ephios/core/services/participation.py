@@ -1,13 +1,108 @@
 import logging
+from collections import defaultdict
 
 from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import Q, prefetch_related_objects
 from django.utils import timezone
+from guardian.shortcuts import assign_perm
 
-from ephios.core.models import AbstractParticipation
+from ephios.api.caching import invalidate_cached_responses
+from ephios.core.models import AbstractParticipation, Event, LocalParticipation
+from ephios.core.services.workinghours import (
+    participation_rollup_keys,
+    refresh_working_hours_rollup,
+)
+from ephios.extra.permissions import (
+    clear_permission_resolvers,
+    get_permissions_from_qualified_names,
+    get_user_pks_with_object_perm,
+    invalidate_object_permissions,
+)
+from ephios.modellogging.log import bulk_update_log
+from ephios.modellogging.recorders import InstanceActionType
 
 logger = logging.getLogger(__name__)
 
 
+def bulk_update_participations(participations, fields):
+    """
+    Save ``fields`` of existing participations with bulk queries.
+    Bulk queries don't send the model signals, so this logs the changes and updates the working hours
+    rollup and cached API responses. For participations with a changed state, users are permitted to view
+    the event like in ``LocalParticipation.save`` and ``participation_states_changed`` is sent.
+    """
+    from ephios.core.signals import participation_states_changed
+
+    if not participations:
+        return
+    pks = [participation.pk for participation in participations]
+    old_states = dict(AbstractParticipation.objects.filter(pk__in=pks).values_list("pk", "state"))
+    local_participations = LocalParticipation.objects.filter(pk__in=pks)
+    rollup_keys = participation_rollup_keys(local_participations)
+
+    now = timezone.now()
+    for participation in participations:
+        participation.updated_at = now
+    # the participants are part of the logged string representation
+    prefetch_related_objects(
+        [p for p in participations if isinstance(p, LocalParticipation)], "user"
+    )
+    bulk_update_log(participations, InstanceActionType.CHANGE)
+    AbstractParticipation.objects.non_polymorphic().bulk_update(
+        participations, list(dict.fromkeys([*fields, "updated_at"]))
+    )
+    refresh_working_hours_rollup(rollup_keys | participation_rollup_keys(local_participations))
+    invalidate_cached_responses()
+
+    if state_changed := [
+        participation
+        for participation in participations
+        if participation.state != old_states[participation.pk]
+    ]:
+        _permit_participants_to_view_events(state_changed)
+        participation_states_changed.send(None, participations=state_changed)
+
+
+def _permit_participants_to_view_events(participations):
+    """Bulk version of permitting participants to view the event in ``LocalParticipation.save``."""
+    users_by_event = defaultdict(dict)
+    for participation in participations:
+        if (
+            isinstance(participation, LocalParticipation)
+            and participation.state != AbstractParticipation.States.GETTING_DISPATCHED
+        ):
+            users_by_event[participation.shift.event][participation.user_id] = participation.user
+    if not users_by_event:
+        return
+    view_event = get_permissions_from_qualified_names(["core.view_event"])
+    globally_permitted = set(
+        get_user_model()
+        .objects.filter(
+            Q(is_superuser=True)
+            | Q(user_permissions__in=view_event)
+            | Q(groups__permissions__in=view_event),
+            pk__in={pk for users in users_by_event.values() for pk in users},
+            is_active=True,
+        )
+        .values_list("pk", flat=True)
+    )
+    permitted_by_event = get_user_pks_with_object_perm(
+        Event, "view_event", [event.pk for event in users_by_event]
+    )
+    for event, users in users_by_event.items():
+        if unpermitted := [
+            user
+            for pk, user in users.items()
+            if pk not in globally_permitted and pk not in permitted_by_event[event.pk]
+        ]:
+            # guardian assigns permissions to multiple users with bulk_create
+            assign_perm("core.view_event", unpermitted, event)
+            invalidate_object_permissions(users=unpermitted)
+            for user in unpermitted:
+                clear_permission_resolvers(user)
+
+
 def send_participation_finished(sender, **kwargs):
     """
     This method is registered in signals.py as a receiver of ``periodic_signal``.
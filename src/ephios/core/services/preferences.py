@@ -0,0 +1,119 @@
+import threading
+import time
+import uuid
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signals import request_started
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from dynamic_preferences.models import GlobalPreferenceModel
+from dynamic_preferences.registries import global_preferences_registry
+
+from ephios.core.models import EventType, EventTypePreference
+
+PREFERENCE_VERSION_CACHE_KEY = "ephios.core.services.preferences.version"
+# seconds a snapshot is kept if changes of other processes can't be noticed through a shared cache
+LOCAL_SNAPSHOT_TIMEOUT = 10
+
+
+class PreferenceSnapshot:
+    """
+    Process-local snapshot of all global and event type preferences.
+    The raw values are loaded from the database in bulk and kept until the version stamp in the
+    shared cache changes. The version is checked at most once per request, so reading preferences
+    neither hits the database nor the cache backend for every single value.
+    Without a shared cache (see the ``SHARED_CACHE`` setting), other processes can't announce
+    changes, so the snapshot is additionally reloaded after ``LOCAL_SNAPSHOT_TIMEOUT`` seconds.
+    """
+
+    _snapshot = None
+    _local = threading.local()
+
+    def __init__(self, version):
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self.global_values = {
+            (pref.section, pref.name): pref.raw_value
+            for pref in GlobalPreferenceModel.objects.all()
+        }
+        self.event_type_values = defaultdict(dict)
+        for pref in EventTypePreference.objects.all():
+            self.event_type_values[pref.instance_id][(pref.section, pref.name)] = pref.raw_value
+        self.event_type_values.default_factory = None
+
+    @classmethod
+    def get_version(cls):
+        version = cache.get(PREFERENCE_VERSION_CACHE_KEY)
+        if version is None:
+            version = uuid.uuid4().hex
+            cache.add(PREFERENCE_VERSION_CACHE_KEY, version)
+            version = cache.get(PREFERENCE_VERSION_CACHE_KEY, version)
+        return version
+
+    @property
+    def expired(self):
+        return (
+            not settings.SHARED_CACHE and time.monotonic() - self.loaded_at > LOCAL_SNAPSHOT_TIMEOUT
+        )
+
+    @classmethod
+    def current(cls):
+        snapshot = cls._snapshot
+        if snapshot is not None and getattr(cls._local, "version", None) == snapshot.version:
+            return snapshot
+        version = cls.get_version()
+        if snapshot is None or snapshot.version != version or snapshot.expired:
+            snapshot = cls._snapshot = cls(version)
+        cls._local.version = version
+        return snapshot
+
+    @classmethod
+    def mark_stale(cls):
+        """Revalidate the version stamp on the next access in this thread."""
+        cls._local.version = None
+
+    @classmethod
+    def clear(cls):
+        cls._snapshot = None
+        cache.set(PREFERENCE_VERSION_CACHE_KEY, uuid.uuid4().hex)
+
+    @staticmethod
+    def _get(manager, values, key):
+        section, name = manager.parse_lookup(key)
+        preference = manager.registry.get(section=section, name=name, fallback=False)
+        try:
+            raw_value = values[(preference.section.name, preference.name)]
+        except KeyError:
+            # not stored yet, let dynamic preferences create the row with the default value
+            return manager.get(key)
+        return preference.serializer.deserialize(raw_value)
+
+    @classmethod
+    def get_global(cls, key):
+        """Return the value of a global preference, e.g. ``general__organization_name``."""
+        return cls._get(global_preferences_registry.manager(), cls.current().global_values, key)
+
+    @classmethod
+    def get_event_type(cls, event_type: EventType, key):
+        """Return the value of the preference named ``key`` of the given event type."""
+        return cls._get(
+            event_type.preferences, cls.current().event_type_values.get(event_type.pk, {}), key
+        )
+
+
+@receiver(request_started, dispatch_uid="ephios.core.services.preferences.request_started")
+def revalidate_preference_snapshot(sender, **kwargs):
+    PreferenceSnapshot.mark_stale()
+
+
+@receiver(post_save, sender=GlobalPreferenceModel)
+@receiver(post_delete, sender=GlobalPreferenceModel)
+@receiver(post_save, sender=EventTypePreference)
+@receiver(post_delete, sender=EventTypePreference)
+def clear_preference_snapshot(sender, **kwargs):
+    # clear again after commit so other processes don't load values that were not committed yet
+    PreferenceSnapshot.clear()
+    transaction.on_commit(PreferenceSnapshot.clear)
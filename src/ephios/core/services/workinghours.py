@@ -0,0 +1,183 @@
+import datetime
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import DateField, DurationField, ExpressionWrapper, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from ephios.core.models import (
+    AbstractParticipation,
+    Event,
+    LocalParticipation,
+    Shift,
+    WorkingHours,
+    WorkingHoursRollup,
+)
+
+
+def participation_rollup_keys(participations):
+    """Return the set of (user_id, date) keys the given participations are counted for."""
+    return set(
+        participations.annotate(
+            date=ExpressionWrapper(TruncDate("start_time"), output_field=DateField())
+        ).values_list("user_id", "date")
+    )
+
+
+def _key_filter(keys, date_field="date"):
+    dates_by_user = defaultdict(set)
+    for user_id, date in keys:
+        dates_by_user[user_id].add(date)
+    return reduce(
+        or_,
+        (
+            Q(user_id=user_id, **{f"{date_field}__in": dates})
+            for user_id, dates in dates_by_user.items()
+        ),
+    )
+
+
+def _compute_rollup(participations, workinghours):
+    participations = (
+        participations
+        .filter(state=AbstractParticipation.States.CONFIRMED)
+        .annotate(
+            day=ExpressionWrapper(TruncDate("start_time"), output_field=DateField()),
+            duration=ExpressionWrapper(
+                F("end_time") - F("start_time"), output_field=DurationField()
+            ),
+        )
+        .values("user_id", "day", "shift__event__type_id")
+        .annotate(total=Sum("duration"))
+        .order_by()
+    )
+    rows = [
+        WorkingHoursRollup(
+            user_id=row["user_id"],
+            date=row["day"],
+            event_type_id=row["shift__event__type_id"],
+            duration=row["total"],
+        )
+        for row in participations
+    ]
+    rows += [
+        WorkingHoursRollup(
+            user_id=row["user_id"],
+            date=row["date"],
+            duration=datetime.timedelta(hours=float(row["total"])),
+        )
+        for row in workinghours.values("user_id", "date").annotate(total=Sum("hours")).order_by()
+    ]
+    return rows
+
+
+def refresh_working_hours_rollup(keys):
+    """Recompute the rollup rows for an iterable of (user_id, date) keys."""
+    keys = {(user_id, date) for user_id, date in keys if user_id is not None and date is not None}
+    if not keys:
+        return
+    with transaction.atomic():
+        WorkingHoursRollup.objects.filter(_key_filter(keys)).delete()
+        rows = _compute_rollup(
+            LocalParticipation.objects.alias(
+                start_date=ExpressionWrapper(TruncDate("start_time"), output_field=DateField())
+            ).filter(_key_filter(keys, date_field="start_date")),
+            WorkingHours.objects.filter(_key_filter(keys)),
+        )
+        WorkingHoursRollup.objects.bulk_create(rows)
+
+
+def rebuild_working_hours_rollup():
+    """Recreate the whole rollup table from participations and working hours."""
+    with transaction.atomic():
+        WorkingHoursRollup.objects.all().delete()
+        WorkingHoursRollup.objects.bulk_create(
+            _compute_rollup(LocalParticipation.objects.all(), WorkingHours.objects.all()),
+            batch_size=1000,
+        )
+
+
+def _remember_keys(instance, keys):
+    instance._rollup_keys = keys  # pylint: disable=protected-access
+
+
+def _remembered_keys(instance):
+    return vars(instance).pop("_rollup_keys", set())
+
+
+@receiver(pre_save, sender=LocalParticipation)
+@receiver(pre_delete, sender=LocalParticipation)
+def remember_participation_keys(sender, instance, **kwargs):
+    if instance.pk:
+        _remember_keys(
+            instance, participation_rollup_keys(LocalParticipation.objects.filter(pk=instance.pk))
+        )
+
+
+@receiver(post_save, sender=LocalParticipation)
+def update_participation_rollup(sender, instance, **kwargs):
+    refresh_working_hours_rollup(
+        _remembered_keys(instance)
+        | participation_rollup_keys(LocalParticipation.objects.filter(pk=instance.pk))
+    )
+
+
+@receiver(post_delete, sender=LocalParticipation)
+def update_deleted_participation_rollup(sender, instance, **kwargs):
+    refresh_working_hours_rollup(_remembered_keys(instance))
+
+
+@receiver(pre_save, sender=Shift)
+def remember_shift_keys(sender, instance, **kwargs):
+    if instance.pk:
+        _remember_keys(
+            instance,
+            participation_rollup_keys(LocalParticipation.objects.filter(shift_id=instance.pk)),
+        )
+
+
+@receiver(post_save, sender=Shift)
+def update_shift_rollup(sender, instance, created, **kwargs):
+    if not created:
+        refresh_working_hours_rollup(
+            _remembered_keys(instance)
+            | participation_rollup_keys(LocalParticipation.objects.filter(shift_id=instance.pk))
+        )
+
+
+@receiver(pre_save, sender=Event)
+def remember_event_keys(sender, instance, **kwargs):
+    if not instance.pk:
+        return
+    old_type_id = Event.all_objects.filter(pk=instance.pk).values_list("type_id", flat=True).first()
+    if old_type_id is not None and old_type_id != instance.type_id:
+        _remember_keys(
+            instance,
+            participation_rollup_keys(
+                LocalParticipation.objects.filter(shift__event_id=instance.pk)
+            ),
+        )
+
+
+@receiver(post_save, sender=Event)
+def update_event_rollup(sender, instance, **kwargs):
+    refresh_working_hours_rollup(_remembered_keys(instance))
+
+
+@receiver(pre_save, sender=WorkingHours)
+def remember_workinghours_keys(sender, instance, **kwargs):
+    if instance.pk:
+        _remember_keys(
+            instance,
+            set(WorkingHours.objects.filter(pk=instance.pk).values_list("user_id", "date")),
+        )
+
+
+@receiver(post_save, sender=WorkingHours)
+@receiver(post_delete, sender=WorkingHours)
+def update_workinghours_rollup(sender, instance, **kwargs):
+    refresh_working_hours_rollup(_remembered_keys(instance) | {(instance.user_id, instance.date)})
@@ -1,13 +1,17 @@
 import sys
 
+from django.core.cache import cache
+from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.urls import reverse_lazy
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from ephios.core.models import Event
 from ephios.core.plugins import PluginSignal
 from ephios.core.services.notifications.backends import send_all_notifications
 from ephios.core.services.participation import send_participation_finished
+from ephios.extra.permissions import invalidate_object_permissions
 
 insert_html = PluginSignal()
 """
@@ -120,6 +124,14 @@ This signal is set out after a shift got copied to allow plugins to copy related
 Receivers will receive the original ``shift`` and a list of the created ``copies``.
 """
 
+event_copy = PluginSignal()
+"""
+This signal is sent out after an event got copied to allow plugins to copy related data as well.
+Receivers will receive the original ``event``, a list of the created ``copies`` and ``shift_copies``,
+a dict mapping every shift of the original event to the list of its copies.
+All copies have been created in bulk, so receivers should also use bulk operations.
+"""
+
 shift_forms = PluginSignal()
 """
 This signal is sent out to get a list of form instances to show on the shift create and update views.
@@ -203,6 +215,12 @@ This signal is sent out to get all health checks that can be run to monitor the
 Receivers should return a list of subclasses of ``ephios.core.services.health.AbstractHealthCheck``
 """
 
+register_export_formats = PluginSignal()
+"""
+This signal is sent out to get all file formats that tabular data like working hours can be exported to.
+Receivers should return a list of subclasses of ``ephios.core.services.export.AbstractExportFormat``
+"""
+
 periodic_signal = PluginSignal()
 """
 This signal is called periodically, at least every 15 minutes.
@@ -216,6 +234,14 @@ Exceptions in receivers are ignored, so make sure your code is robust enough to
 This signal is based on ``periodic_signal`` and provides a ``participation`` keyword argument.
 """
 
+participation_states_changed = PluginSignal()
+"""
+This signal is sent out after the state of participations got changed with bulk queries, e.g. in the
+disposition. Bulk queries don't send the model signals, so receivers reacting to saved participations
+should handle this signal as well. Receivers will receive a list of changed ``participations``
+and should also use bulk operations.
+"""
+
 register_event_bulk_action = PluginSignal()
 """
 This signal is sent out to get a list of actions that a user can perform on a list of events.
@@ -343,6 +369,26 @@ def send_notifications(sender, **kwargs):
     send_all_notifications()
 
 
+@receiver(periodic_signal, dispatch_uid="ephios.core.signals.generate_event_exports")
+def generate_event_exports(sender, **kwargs):
+    from ephios.core.pdf import generate_pending_event_exports
+
+    generate_pending_event_exports()
+
+
+@receiver(periodic_signal, dispatch_uid="ephios.core.signals.run_stored_files_reconciliation")
+def run_stored_files_reconciliation(sender, **kwargs):
+    from ephios.core.services.files import (
+        STORED_FILES_RECONCILE_INTERVAL,
+        STORED_FILES_RECONCILED_CACHE_KEY,
+        reconcile_stored_files,
+    )
+
+    # walking the media directory is expensive, so it is only done once in a while
+    if cache.add(STORED_FILES_RECONCILED_CACHE_KEY, True, STORED_FILES_RECONCILE_INTERVAL):
+        reconcile_stored_files()
+
+
 @receiver(periodic_signal, dispatch_uid="ephios.core.signals.update_last_run_periodic_call")
 def update_last_run_periodic_call(sender, **kwargs):
     from ephios.core.dynamic_preferences_registry import LastRunPeriodicCall
@@ -367,3 +413,9 @@ def structure_signup_save(
 periodic_signal.connect(
     send_participation_finished, dispatch_uid="ephios.core.signals.send_participation_finished"
 )
+
+
+@receiver(post_save, sender=Event, dispatch_uid="ephios.core.signals.invalidate_event_permissions")
+def invalidate_event_permissions(sender, instance, created, **kwargs):
+    if created:
+        invalidate_object_permissions(model=Event)
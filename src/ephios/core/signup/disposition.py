@@ -13,6 +13,7 @@ from django_select2.forms import ModelSelect2Widget
 from ephios.core.models import (
     AbstractParticipation,
     LocalParticipation,
+    Notification,
     Qualification,
     Shift,
     UserProfile,
@@ -22,7 +23,9 @@ from ephios.core.services.notifications.types import (
     ParticipationCustomizationNotification,
     ParticipationStateChangeNotification,
     ResponsibleParticipationStateChangeNotification,
+    get_responsible_users,
 )
+from ephios.core.services.participation import bulk_update_participations
 from ephios.core.signup.forms import BaseParticipationForm
 from ephios.extra.database import OF_SELF
 from ephios.extra.mixins import CustomPermissionRequiredMixin
@@ -94,9 +97,33 @@ class DispositionBaseModelFormset(forms.BaseModelFormSet):
     def save_existing(self, form, obj, commit=True):
         """Existing participation state overwrites the getting dispatched state."""
         if form.instance.state == AbstractParticipation.States.GETTING_DISPATCHED:
-            form.instance.state = AbstractParticipation.objects.get(id=form.instance.id).state
+            form.instance.state = form.initial["state"]
         return form.save(commit=commit)
 
+    def bulk_save(self):
+        """
+        Save the formset with bulk queries instead of saving every participation on its own.
+        Changes are diffed against the participations as they were loaded for the formset.
+        Return a list of tuples of changed participations and their forms.
+        """
+        changed = []
+        for form in self.forms:
+            if form in self.deleted_forms or not form.has_changed():
+                continue
+            participation = self.save_existing(form, form.instance, commit=False)
+            changed.append((participation, form))
+        bulk_update_participations(
+            [participation for participation, __ in changed],
+            ["state", "individual_start_time", "individual_end_time", "structure_data"],
+        )
+        for __, form in changed:
+            if comment := form.get_comment():
+                comment.save()
+        AbstractParticipation.objects.filter(
+            pk__in=[form.instance.pk for form in self.deleted_forms]
+        ).non_polymorphic().delete()
+        return changed
+
 
 def get_disposition_formset(form):
     return forms.modelformset_factory(
@@ -237,39 +264,47 @@ class DispositionView(DispositionBaseViewMixin, TemplateView):
         )
         return formset
 
-    def _send_participant_notifications(self, formset):
-        for participation, changed_fields in formset.changed_objects:
+    def _send_participant_notifications(self, changed):
+        if not changed:
+            return
+        responsible_users = get_responsible_users(self.object.event)
+        notifications = []
+        for participation, form in changed:
             if (
                 participation.get_real_instance_class() != LocalParticipation
                 or participation.user != self.request.user
             ):
-                if "state" in changed_fields:
-                    ParticipationStateChangeNotification.send(
+                if "state" in form.changed_data:
+                    notifications += ParticipationStateChangeNotification.build(
                         participation, acting_user=self.request.user
                     )
-                    ResponsibleParticipationStateChangeNotification.send(
-                        participation, acting_user=self.request.user
+                    notifications += ResponsibleParticipationStateChangeNotification.build(
+                        participation,
+                        responsible_users=responsible_users,
+                        acting_user=self.request.user,
                     )
-                elif participation.state == AbstractParticipation.States.CONFIRMED:
-                    form: BaseParticipationForm = next(
-                        filter(lambda f, p=participation: f.instance == p, formset.forms)
+                elif participation.state == AbstractParticipation.States.CONFIRMED and (
+                    claims := form.get_customization_notification_info()
+                ):
+                    # If state didn't change, but confirmed participation was customized, notify about that.
+                    notifications += ParticipationCustomizationNotification.build(
+                        participation, claims=claims
                     )
-                    if claims := form.get_customization_notification_info():
-                        # If state didn't change, but confirmed participation was customized, notify about that.
-                        ParticipationCustomizationNotification.send(participation, claims)
+        Notification.objects.bulk_create(notifications)
 
     def post(self, request, *args, **kwargs):
         formset = self.get_formset()
         if not formset.is_valid():
             return self.get(request, *args, **kwargs, formset=formset)
 
-        formset.save()
-        self._send_participant_notifications(formset)
+        with transaction.atomic():
+            changed = formset.bulk_save()
+            self._send_participant_notifications(changed)
 
-        # non_polymorphic() needed because of https://github.com/django-polymorphic/django-polymorphic/issues/34
-        self.object.participations.filter(
-            state=AbstractParticipation.States.GETTING_DISPATCHED
-        ).non_polymorphic().delete()
+            # non_polymorphic() needed because of https://github.com/django-polymorphic/django-polymorphic/issues/34
+            self.object.participations.filter(
+                state=AbstractParticipation.States.GETTING_DISPATCHED
+            ).non_polymorphic().delete()
         return redirect(self.object.event.get_absolute_url())
 
     def get_context_data(self, **kwargs):
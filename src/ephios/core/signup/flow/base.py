@@ -3,6 +3,7 @@ from argparse import Namespace
 from collections import OrderedDict
 
 from django import forms
+from django.db import transaction
 from django.utils.translation import gettext_lazy as _
 
 from ephios.core.models import AbstractParticipation
@@ -75,13 +76,18 @@ class BaseSignupFlow(AbstractSignupFlow):
         participation = participation or self.get_or_create_participation_for(participant)
         participation = self._configure_participation(participation, **kwargs)
         participation.save()
+        # notifications are created after the signup transaction to keep it short
         if participation.state == AbstractParticipation.States.REQUESTED:
-            ResponsibleParticipationAwaitsDispositionNotification.send(
-                participation, acting_user=acting_user
+            transaction.on_commit(
+                lambda: ResponsibleParticipationAwaitsDispositionNotification.send(
+                    participation, acting_user=acting_user
+                )
             )
         else:
-            ResponsibleParticipationStateChangeNotification.send(
-                participation, acting_user=acting_user
+            transaction.on_commit(
+                lambda: ResponsibleParticipationStateChangeNotification.send(
+                    participation, acting_user=acting_user
+                )
             )
         return participation
 
@@ -90,8 +96,10 @@ class BaseSignupFlow(AbstractSignupFlow):
         participation = participation or self.get_or_create_participation_for(participant)
         participation.state = AbstractParticipation.States.USER_DECLINED
         participation.save()
-        ResponsibleConfirmedParticipationDeclinedNotification.send(
-            participation, acting_user=acting_user
+        transaction.on_commit(
+            lambda: ResponsibleConfirmedParticipationDeclinedNotification.send(
+                participation, acting_user=acting_user
+            )
         )
         return participation
 
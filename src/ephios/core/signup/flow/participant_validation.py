@@ -4,6 +4,7 @@ from django.utils.translation import gettext_lazy as _
 
 from ephios.core.dynamic_preferences_registry import GeneralRequiredQualificationPreference
 from ephios.core.models import AbstractParticipation, Shift
+from ephios.core.services.preferences import PreferenceSnapshot
 from ephios.core.signals import participant_signup_checkers
 from ephios.core.signup.participants import AbstractParticipant
 
@@ -72,7 +73,9 @@ def check_inside_signup_timeframe(shift, participant):
 
 def check_general_required_qualifications(shift, participant):
     if not participant.has_qualifications(
-        shift.event.type.preferences[GeneralRequiredQualificationPreference.name]
+        PreferenceSnapshot.get_event_type(
+            shift.event.type, GeneralRequiredQualificationPreference.name
+        )
     ):
         raise ParticipantUnfitError(
             _(
@@ -140,14 +143,21 @@ class BaseSignupActionValidator:
     def get_checkers(self):
         return []
 
+    def get_commit_checkers(self):
+        """
+        Return checkers that are run again while the participant and shift are locked, right before a signup is saved.
+        These should only check what concurrent signups can change, like the capacity of the shift.
+        """
+        return []
+
     def __init__(self, shift, participant):
         self.shift = shift
         self.participant = participant
         self.participation = participant.participation_for(shift)
 
-    def _get_errors(self, error_class):
+    def _get_errors(self, error_class, checkers=None):
         errors = []
-        for checker in self.get_checkers():
+        for checker in self.get_checkers() if checkers is None else checkers:
             try:
                 checker(self.shift, self.participant)
             except error_class as e:
@@ -174,6 +184,12 @@ class BaseSignupActionValidator:
         """
         return self._get_errors(BaseSignupError)
 
+    def get_commit_errors(self):
+        """
+        Return a list of errors that prevent saving a signup of the participant, as checked by the commit checkers.
+        """
+        return self._get_errors(SignupDisallowedError, self.get_commit_checkers())
+
     def can_sign_up(self):
         """
         Return whether the participant is allowed to perform signup.
@@ -220,6 +236,9 @@ class BasicSignupActionValidator(BaseSignupActionValidator):
             *signal_checkers,
         ]
 
+    def get_commit_checkers(self):
+        return [check_conflicting_participations, *self.shift.structure.get_capacity_checkers()]
+
 
 class NoSignupSignupActionValidator(BaseSignupActionValidator):
     def get_no_signup_allowed_message(self):
@@ -57,16 +57,27 @@ class BaseParticipationForm(forms.ModelForm):
                 self.add_error("individual_end_time", _("End time must not be before start time."))
             return cleaned_data
 
-    @transaction.atomic
-    def save(self, commit=True):
-        result = super().save()
+    def get_comment(self):
+        """
+        Return an unsaved comment for the participation if one was entered.
+        """
         if comment := self.cleaned_data["comment"]:
-            ParticipationComment.objects.create(
-                participation=result,
+            return ParticipationComment(
+                participation=self.instance,
                 text=comment,
                 authored_by_responsible=self.acting_user,
                 visible_for=self.get_comment_visibility(),
             )
+        return None
+
+    @transaction.atomic
+    def save(self, commit=True):
+        """
+        With ``commit=False``, neither the participation nor the comment is saved (see ``get_comment``).
+        """
+        result = super().save(commit)
+        if commit and (comment := self.get_comment()):
+            comment.save()
         return result
 
     class Meta:
@@ -82,6 +82,15 @@ class AbstractShiftStructure(ABC):
         """
         raise NotImplementedError()
 
+    def get_capacity_checkers(self):
+        """
+        Return a list of checkers that are run again while the shift is locked, right before a signup is saved.
+        Concurrent signups for the shift are blocked meanwhile, so these should only check whether
+        the shift still has capacity for the participant and use as few queries as possible.
+        Structures without a capacity don't need to implement this.
+        """
+        return []
+
     def render(self, context):
         """
         Render the state/participations of the shift.
@@ -5,11 +5,12 @@ from operator import attrgetter
 
 from django.template.loader import get_template
 
-from ephios.core.models import AbstractParticipation
+from ephios.core.models import AbstractParticipation, Event
 from ephios.core.signup.disposition import BaseDispositionParticipationForm
 from ephios.core.signup.forms import SignupConfigurationForm
 from ephios.core.signup.stats import SignupStats
 from ephios.core.signup.structure.abstract import AbstractShiftStructure
+from ephios.extra.permissions import get_permission_resolver
 from ephios.extra.utils import format_anything
 
 logger = logging.getLogger(__name__)
@@ -91,7 +92,9 @@ class BaseShiftStructure(AbstractShiftStructure):
             if p.state
             in {AbstractParticipation.States.REQUESTED, AbstractParticipation.States.CONFIRMED}
         ]
-        kwargs["show_comments"] = request.user.has_perm("core.change_event", obj=self.shift.event)
+        kwargs["show_comments"] = get_permission_resolver(request.user, Event).has_perm(
+            "core.change_event", self.shift.event
+        )
         return kwargs
 
     def get_list_export_data(self):
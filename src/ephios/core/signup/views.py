@@ -1,3 +1,6 @@
+import dataclasses
+from collections.abc import Callable
+
 from django.contrib import messages
 from django.db import transaction
 from django.shortcuts import redirect
@@ -21,6 +24,13 @@ from ephios.core.signup.participants import AbstractParticipant, LocalUserPartic
 from ephios.extra.database import OF_SELF
 
 
+@dataclasses.dataclass(frozen=True)
+class SignupAction:
+    flow_action: Callable
+    error_message: str
+    success_message: str
+
+
 class SignupView(FormView):
     """
     This View reacts to the signup or decline buttons being pressed using a POST request.
@@ -50,23 +60,42 @@ class SignupView(FormView):
     def participation(self):
         return self.shift.signup_flow.get_or_create_participation_for(self.participant)
 
-    def _get_shift_participant_locked_validator(self):
+    def _get_validator(self):
+        # Signup actions are validated before any locks are taken, so that concurrent signups
+        # don't have to wait for validation of all checkers (see `_lock_shift_participant`).
+        # pylint: disable=protected-access
+        return (
+            Shift._base_manager
+            .prefetch_related("participations")
+            .select_related("event", "event__type")
+            .get(pk=self.shift.pk)
+        ).signup_flow.get_validator(self.participant)
+
+    def _lock_shift_participant(self, signup_choice, error_message):
         # We need to avoid race conditions like:
         # - multiple people signing up at the same time violating the max participation count
         # - the user signing up for two conflicting shifts at the same time
         # - there being multiple participation objects for the same participant/shift combination
         # Therefore we select user and shift for update, making transactions block.
-        # To avoid Deadlocks, the lock order must always be user, then shift.
+        # To avoid Deadlocks, the lock order must always be user, then shift, and the locks must be
+        # taken before writing participations, which reference both rows.
+        # While holding the locks, we only validate what concurrent signups can change again.
+        # This relies on the read committed isolation level, so we see the participations of signups
+        # that were committed while we were waiting for the lock.
         # pylint: disable=protected-access
         if isinstance(self.participant, LocalUserParticipant):
             UserProfile._base_manager.select_for_update(of=OF_SELF).get(pk=self.participant.user.pk)
-        return (
+        shift = (
             Shift._base_manager
             .select_for_update(of=OF_SELF)
-            .prefetch_related("participations")
             .select_related("event", "event__type")
             .get(pk=self.shift.pk)
-        ).signup_flow.get_validator(self.participant)
+        )
+        if signup_choice == SignupForm.SignupChoices.SIGNUP and (
+            errors := shift.signup_flow.get_validator(self.participant).get_commit_errors()
+        ):
+            messages.error(self.request, error_message.format(error=errors[0]))
+            raise errors[0]
 
     def _collect_quick_action_signup_data(self):
         """
@@ -123,11 +152,12 @@ class SignupView(FormView):
                 # quick action not valid -> redirect so it acts like a click on the customize-button
                 return redirect(self.participant.reverse_signup_action(self.shift))
             try:
+                action = self._get_signup_action(signup_data["signup_choice"])
                 instance = self.participation
                 with transaction.atomic():
-                    validator = self._get_shift_participant_locked_validator()
+                    self._lock_shift_participant(signup_data["signup_choice"], action.error_message)
                     instance.save()
-                    return self._process_signup_action(instance, signup_data, validator)
+                    return self._perform_signup_action(instance, signup_data, action)
             except BaseSignupError:
                 return redirect(self.participant.reverse_event_detail(self.shift.event))
 
@@ -136,42 +166,53 @@ class SignupView(FormView):
             form = self.get_form()
             if form.is_valid():
                 signup_data = form.cleaned_data
+                action = self._get_signup_action(signup_data["signup_choice"])
                 with transaction.atomic():
-                    validator = self._get_shift_participant_locked_validator()
+                    self._lock_shift_participant(signup_data["signup_choice"], action.error_message)
                     instance = form.save()
                     if signup_data["signup_choice"] == SignupForm.SignupChoices.CUSTOMIZE and (
                         claims := form.get_customization_notification_info()
                     ):
-                        ResponsibleConfirmedParticipationCustomizedNotification.send(
-                            form.instance, claims
+                        transaction.on_commit(
+                            lambda: ResponsibleConfirmedParticipationCustomizedNotification.send(
+                                instance, claims
+                            )
                         )
-                    return self._process_signup_action(instance, signup_data, validator)
+                    return self._perform_signup_action(instance, signup_data, action)
         except BaseSignupError:
             # jump back to event-detail, in case SignupForm should be unreachable
             return redirect(self.participant.reverse_event_detail(self.shift.event))
         return self.form_invalid(form)
 
-    def _process_signup_action(self, participation, signup_data, validator):
-        match signup_data["signup_choice"]:
+    def _get_signup_action(self, signup_choice):
+        validator = self._get_validator()
+        match signup_choice:
             case SignupForm.SignupChoices.SIGNUP if validator.can_sign_up():
-                flow_action = self.shift.signup_flow.perform_signup
-                error_message = self.shift.signup_flow.signup_error_message
-                success_message = self.shift.signup_flow.signup_success_message
+                return SignupAction(
+                    self.shift.signup_flow.perform_signup,
+                    self.shift.signup_flow.signup_error_message,
+                    self.shift.signup_flow.signup_success_message,
+                )
             case SignupForm.SignupChoices.DECLINE if validator.can_decline():
-                flow_action = self.shift.signup_flow.perform_decline
-                error_message = self.shift.signup_flow.decline_error_message
-                success_message = self.shift.signup_flow.decline_success_message
+                return SignupAction(
+                    self.shift.signup_flow.perform_decline,
+                    self.shift.signup_flow.decline_error_message,
+                    self.shift.signup_flow.decline_success_message,
+                )
             case SignupForm.SignupChoices.CUSTOMIZE if validator.can_customize_signup():
-                # pylint: disable-next=unnecessary-lambda-assignment
-                flow_action = lambda **kwargs: None  # noop
-                error_message = _("There was an error saving your participation.")
-                success_message = _("Your participation was saved.")
+                return SignupAction(
+                    lambda **kwargs: None,  # noop
+                    _("There was an error saving your participation."),
+                    _("Your participation was saved."),
+                )
             case _:
                 messages.error(self.request, _("This action is not allowed."))
                 raise BaseSignupError(_("This action is not allowed."))
+
+    def _perform_signup_action(self, participation, signup_data, action):
         try:
             self._send_signup_save_signal(participation, signup_data)
-            flow_action(
+            action.flow_action(
                 participant=self.participant,
                 participation=participation,
                 acting_user=self._acting_user,
@@ -179,9 +220,9 @@ class SignupView(FormView):
             )
         except BaseSignupError as error:
             # except hook for inserting the error message
-            messages.error(self.request, error_message.format(error=error))
+            messages.error(self.request, action.error_message.format(error=error))
             raise  # must reraise for transaction rollback
-        messages.success(self.request, success_message.format(shift=self.shift))
+        messages.success(self.request, action.success_message.format(shift=self.shift))
         return redirect(self.participant.reverse_event_detail(self.shift.event))
 
     def _send_signup_save_signal(self, participation, signup_data):
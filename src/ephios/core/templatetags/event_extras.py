@@ -6,11 +6,12 @@ from django import template
 from django.utils import timezone
 from django.utils.safestring import mark_safe
 
-from ephios.core.models import AbstractParticipation, EventType, Shift, UserProfile
+from ephios.core.models import AbstractParticipation, Event, EventType, Shift, UserProfile
 from ephios.core.signals import event_menu, register_event_bulk_action, shift_action
 from ephios.core.signup.fallback import default_on_exception, get_signup_config_invalid_error
 from ephios.core.views.signup import request_to_participant
 from ephios.extra.colors import get_eventtype_color_style
+from ephios.extra.permissions import get_permission_resolver
 
 register = template.Library()
 
@@ -158,7 +159,7 @@ def shift_plugin_actions(shift, request):
 @register.filter
 def can_do_disposition_for(user: UserProfile, shift):
     return (
-        user.has_perm("change_event", shift.event)
+        get_permission_resolver(user, Event).has_perm("core.change_event", shift.event)
         and shift.structure.disposition_participation_form_class is not None
     )
 
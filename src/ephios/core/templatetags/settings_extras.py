@@ -6,10 +6,10 @@ from urllib.parse import urljoin
 from django import template
 from django.conf import settings
 from django.contrib.staticfiles import finders
-from dynamic_preferences.registries import global_preferences_registry
 
 from ephios.core.dynamic import dynamic_settings
 from ephios.core.models.users import IdentityProvider
+from ephios.core.services.preferences import PreferenceSnapshot
 
 register = template.Library()
 logger = logging.getLogger(__name__)
@@ -34,7 +34,7 @@ def site_url():
 
 @register.simple_tag
 def organization_name():
-    return global_preferences_registry.manager().get("general__organization_name")
+    return PreferenceSnapshot.get_global("general__organization_name")
 
 
 @register.filter
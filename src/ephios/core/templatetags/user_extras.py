@@ -3,12 +3,12 @@ from collections.abc import Iterable
 from django import template
 from django.db.models import Count, Q
 from django.utils import timezone
-from guardian.shortcuts import get_objects_for_user
 
 from ephios.core.consequences import editable_consequences, pending_consequences
-from ephios.core.models import AbstractParticipation, QualificationGrant, Shift
+from ephios.core.models import AbstractParticipation, Event, QualificationGrant, Shift
 from ephios.core.services.qualification import essential_set_of_qualifications
 from ephios.core.signup.flow.participant_validation import get_conflicting_participations
+from ephios.extra.permissions import get_permission_resolver
 
 register = template.Library()
 
@@ -39,9 +39,8 @@ def shifts_needing_disposition(user):
     return (
         Shift.objects
         .filter(
-            event__in=get_objects_for_user(
-                user,
-                perms=["core.change_event"],
+            event__in=get_permission_resolver(user, Event).filter_queryset(
+                Event.objects.all(), "core.change_event"
             ),
             end_time__gt=timezone.now(),
         )
@@ -136,6 +136,16 @@ urlpatterns = [
         EventBulkDeleteView.as_view(),
         name="event_bulk_delete",
     ),
+    path(
+        "events/export/",
+        pdf.EventBulkExportView.as_view(),
+        name="event_bulk_export",
+    ),
+    path(
+        "events/export/<int:pk>/",
+        pdf.EventExportJobView.as_view(),
+        name="event_export_job",
+    ),
     path(
         "shifts/<int:pk>/signup/",
         LocalUserShiftActionView.as_view(),
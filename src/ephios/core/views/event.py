@@ -6,9 +6,21 @@ from django import forms
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.contrib.auth.models import Group
 from django.core.exceptions import ValidationError
-from django.db.models import BooleanField, Case, Count, Max, Min, Prefetch, Q, QuerySet, When
+from django.db.models import (
+    BooleanField,
+    Case,
+    Count,
+    Exists,
+    Max,
+    Min,
+    OuterRef,
+    Prefetch,
+    Q,
+    QuerySet,
+    Value,
+    When,
+)
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse, reverse_lazy
 from django.utils import timezone
@@ -30,11 +42,11 @@ from django.views.generic import (
 )
 from django.views.generic.detail import SingleObjectMixin
 from guardian.models import GroupObjectPermission
-from guardian.shortcuts import assign_perm, get_objects_for_user, get_users_with_perms
 
 from ephios.core.calendar import ShiftCalendar
 from ephios.core.forms.events import EventCopyForm, EventForm
 from ephios.core.models import AbstractParticipation, Event, EventType, Shift
+from ephios.core.services.event_copy import EventCopier
 from ephios.core.signals import event_forms
 from ephios.core.views.signup import request_to_participant
 from ephios.extra.csp import csp_allow_unsafe_eval
@@ -43,7 +55,10 @@ from ephios.extra.mixins import (
     CustomPermissionRequiredMixin,
     PluginFormMixin,
 )
-from ephios.extra.permissions import get_groups_with_perms
+from ephios.extra.permissions import (
+    get_groups_with_perms,
+    get_permission_resolver,
+)
 from ephios.extra.widgets import CustomDateInput
 
 
@@ -126,18 +141,33 @@ class EventFilterForm(forms.Form):
             )
 
         if state_filter := fdata.get("state"):
+            own_participations = AbstractParticipation.objects.filter(
+                shift__event=OuterRef("pk"), localparticipation__user=self.request.user
+            )
             qs = {
-                "confirmed": qs.filter(**{
-                    f"state_{AbstractParticipation.States.CONFIRMED}_count__gt": 0
-                }),
+                "confirmed": qs.filter(
+                    Exists(own_participations.filter(state=AbstractParticipation.States.CONFIRMED))
+                ),
                 "requested-confirmed": qs.filter(
-                    Q(**{f"state_{AbstractParticipation.States.CONFIRMED}_count__gt": 0})
-                    | Q(**{f"state_{AbstractParticipation.States.REQUESTED}_count__gt": 0})
+                    Exists(
+                        own_participations.filter(
+                            state__in=[
+                                AbstractParticipation.States.CONFIRMED,
+                                AbstractParticipation.States.REQUESTED,
+                            ]
+                        )
+                    )
+                ),
+                "no-response": qs.filter(~Exists(own_participations)),
+                "pending": qs.filter(
+                    Exists(
+                        AbstractParticipation.objects.filter(
+                            shift__event=OuterRef("pk"),
+                            state=AbstractParticipation.States.REQUESTED,
+                        )
+                    ),
+                    can_change=True,
                 ),
-                "no-response": qs.filter(**{
-                    f"state_{state}_count": 0 for state in AbstractParticipation.States
-                }),
-                "pending": qs.filter(pending_disposition_count__gt=0),
             }.get(state_filter, qs)
 
         return qs
@@ -192,57 +222,42 @@ class EventListView(LoginRequiredMixin, ListView):
     model = Event
     paginate_by = settings.DEFAULT_LISTVIEW_PAGINATION
 
+    @cached_property
+    def event_permissions(self):
+        return get_permission_resolver(self.request.user, Event)
+
+    def _can_change_annotation(self, field="id"):
+        if self.event_permissions.has_global_perm("core.change_event"):
+            return Value(True, output_field=BooleanField())
+        return Case(
+            When(
+                self.event_permissions.object_pks_filter("core.change_event", field=field),
+                then=True,
+            ),
+            default=False,
+            output_field=BooleanField(),
+        )
+
     def get_queryset(self):
         qs = (
-            get_objects_for_user(self.request.user, "core.view_event")
+            self.event_permissions
+            .filter_queryset(Event.objects.all(), "core.view_event")
             .annotate(
                 start_time=Min("shifts__start_time"),
                 end_time=Max("shifts__end_time"),
             )
             .annotate(
-                can_change=Case(
-                    When(
-                        id__in=get_objects_for_user(self.request.user, ["core.change_event"]),
-                        then=True,
-                    ),
-                    default=False,
-                    output_field=BooleanField(),
-                ),
+                can_change=self._can_change_annotation(),
                 is_responsible=Case(
                     When(
-                        id__in=get_objects_for_user(
-                            self.request.user,
-                            ["core.change_event"],
-                            klass=Event,
-                            accept_global_perms=False,
-                            with_superuser=False,
-                            any_perm=True,  # needed to avoid global permissions
-                        ),
+                        # only object permissions, as global permissions don't make a responsible
+                        self.event_permissions.object_pks_filter("core.change_event", field="id"),
                         then=True,
                     ),
                     default=False,
                     output_field=BooleanField(),
                 ),
             )
-            .annotate(
-                pending_disposition_count=Count(
-                    "shifts__participations",
-                    filter=Q(
-                        shifts__participations__state=AbstractParticipation.States.REQUESTED,
-                        can_change=True,
-                    ),
-                ),
-                **{
-                    f"state_{state}_count": Count(
-                        "shifts__participations",
-                        filter=Q(
-                            shifts__participations__localparticipation__user=self.request.user,
-                            shifts__participations__state=state,
-                        ),
-                    )
-                    for state in AbstractParticipation.States
-                },
-            )
             .select_related("type")
         )
         if self.filter_form.is_valid():
@@ -250,6 +265,7 @@ class EventListView(LoginRequiredMixin, ListView):
         else:
             # safeguard for not loading too many events
             qs = qs.filter(end_time__gte=timezone.now()).order_by("start_time", "end_time")
+        # prefetching only happens for the events of the current page
         qs = qs.prefetch_related("shifts__participations")
 
         # annotate groups that can view the event by prefetching the object permission model
@@ -271,6 +287,44 @@ class EventListView(LoginRequiredMixin, ListView):
         )
         return qs
 
+    def paginate_queryset(self, queryset, page_size):
+        paginator, page, queryset, is_paginated = super().paginate_queryset(queryset, page_size)
+        page.object_list = self._annotate_participation_counts(list(page.object_list))
+        return paginator, page, page.object_list, is_paginated
+
+    def _annotate_participation_counts(self, events):
+        """
+        Annotate the number of pending participations and of the users participations by state.
+        Counting in a separate grouped query over the events of the page avoids joining
+        all participations into the paginated event query.
+        """
+        counts = {
+            row.pop("shift__event"): row
+            for row in AbstractParticipation.objects
+            .filter(shift__event__in=events)
+            .order_by()
+            .values("shift__event")
+            .annotate(
+                pending_disposition_count=Count(
+                    "id", filter=Q(state=AbstractParticipation.States.REQUESTED)
+                ),
+                **{
+                    f"state_{state}_count": Count(
+                        "id", filter=Q(localparticipation__user=self.request.user, state=state)
+                    )
+                    for state in AbstractParticipation.States
+                },
+            )
+        }
+        for event in events:
+            event_counts = counts.get(event.pk, {})
+            event.pending_disposition_count = (
+                event_counts.get("pending_disposition_count", 0) if event.can_change else 0
+            )
+            for state in AbstractParticipation.States:
+                setattr(event, f"state_{state}_count", event_counts.get(f"state_{state}_count", 0))
+        return events
+
     @cached_property
     def filter_form(self):
         return EventFilterForm(data=self.request.GET or None, request=self.request)
@@ -294,20 +348,11 @@ class EventListView(LoginRequiredMixin, ListView):
 
     def _get_shifts_for_calendar(self):
         return (
-            Shift.objects
-            .filter(
-                event__in=get_objects_for_user(self.request.user, "core.view_event", klass=Event),
-            )
-            .annotate(
-                can_change=Case(
-                    When(
-                        event_id__in=get_objects_for_user(self.request.user, ["core.change_event"]),
-                        then=True,
-                    ),
-                    default=False,
-                    output_field=BooleanField(),
-                )
+            self.event_permissions
+            .filter_queryset(
+                Shift.objects.filter(event__active=True), "core.view_event", field="event_id"
             )
+            .annotate(can_change=self._can_change_annotation(field="event_id"))
             .select_related("event", "event__type")
             .prefetch_related("participations")
         )
@@ -509,7 +554,9 @@ class EventDetailView(CustomPermissionRequiredMixin, CanonicalSlugDetailMixin, D
         )
 
     def get_context_data(self, **kwargs):
-        kwargs["can_change_event"] = self.request.user.has_perm("core.change_event", self.object)
+        kwargs["can_change_event"] = get_permission_resolver(self.request.user, Event).has_perm(
+            "core.change_event", self.object
+        )
         responsible_groups = get_groups_with_perms(
             self.object, only_with_perms_in=["change_event"], accept_global_perms=False
         )
@@ -622,72 +669,12 @@ class EventCopyView(CustomPermissionRequiredMixin, SingleObjectMixin, FormView):
         return kwargs
 
     def form_valid(self, form):
-        tz = timezone.get_current_timezone()
-        can_publish_for_groups = get_objects_for_user(
-            self.request.user, "publish_event_for_group", klass=Group
-        )
-        visible_for = get_groups_with_perms(
-            self.object, only_with_perms_in=["view_event"]
-        ).intersection(can_publish_for_groups)
-        for date in form.cleaned_data["recurrence"].xafter(
+        dates = form.cleaned_data["recurrence"].xafter(
             datetime.now() - timedelta(days=365 * 100),  # noqa: DTZ005 # recurrence must use naive time
             1000,
             inc=True,
-        ):
-            event = self.get_object()
-            start_date = event.get_start_time().astimezone(tz).date()
-            shifts = list(event.shifts.all())
-            event.pk = None
-            event.save()
-            assign_perm(
-                "view_event",
-                visible_for,
-                event,
-            )
-            assign_perm(
-                "change_event",
-                get_groups_with_perms(self.get_object(), only_with_perms_in=["change_event"]),
-                event,
-            )
-            assign_perm(
-                "change_event",
-                get_users_with_perms(
-                    self.get_object(),
-                    only_with_perms_in=["change_event"],
-                    with_group_users=False,
-                ),
-                event,
-            )
-            assign_perm("view_event", self.request.user, event)
-            assign_perm("change_event", self.request.user, event)
-
-            shifts_to_create = []
-            for shift in shifts:
-                shift.pk = None
-                # shifts on following days should have the same offset from the new date
-                offset = shift.start_time.astimezone(tz).date() - start_date
-                # shifts ending on the next day should end on the next day to the new date
-                end_offset = (
-                    shift.end_time.astimezone(tz).date() - shift.start_time.astimezone(tz).date()
-                )
-                shift.meeting_time = datetime.combine(
-                    date.date() + offset,
-                    shift.meeting_time.astimezone(tz).time(),
-                    tzinfo=tz,
-                )
-                shift.start_time = datetime.combine(
-                    date.date() + offset,
-                    shift.start_time.astimezone(tz).time(),
-                    tzinfo=tz,
-                )
-                shift.end_time = datetime.combine(
-                    date.date() + offset + end_offset,
-                    shift.end_time.astimezone(tz).time(),
-                    tzinfo=tz,
-                )
-                shift.event = event
-                shifts_to_create.append(shift)
-            Shift.objects.bulk_create(shifts_to_create)
+        )
+        EventCopier(self.object, self.request.user).copy_to(dates)
 
         messages.success(self.request, _("Event copied successfully."))
         return redirect(reverse("core:event_list"))
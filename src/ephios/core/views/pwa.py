@@ -6,9 +6,9 @@ from django.utils.translation import get_language
 from django.utils.translation import gettext_lazy as _
 from django.views import View
 from django.views.generic import TemplateView
-from dynamic_preferences.registries import global_preferences_registry
 
 from ephios.core.dynamic import dynamic_settings
+from ephios.core.services.preferences import PreferenceSnapshot
 from ephios.core.templatetags.settings_extras import as_brand_static_path
 from ephios.extra.auth import access_exempt
 
@@ -47,7 +47,7 @@ def get_pwa_app_icons():
 @access_exempt
 class PWAManifestView(View):
     def get(self, request, *args, **kwargs):
-        org_name = global_preferences_registry.manager().get("general__organization_name")
+        org_name = PreferenceSnapshot.get_global("general__organization_name")
         manifest_json = {
             "name": f"{dynamic_settings.PLATFORM_NAME} {org_name}",
             "short_name": dynamic_settings.PLATFORM_NAME,
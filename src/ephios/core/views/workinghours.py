@@ -1,17 +1,14 @@
-import codecs
-import csv
 import datetime
 from collections import Counter
 from datetime import date
-from itertools import chain
 
 from django import forms
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.models import Group
 from django.contrib.messages.views import SuccessMessageMixin
-from django.db.models import CharField, DurationField, ExpressionWrapper, F, Sum, Value
-from django.http import HttpRequest, HttpResponse
+from django.db.models import Sum
+from django.http import HttpRequest
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse
 from django.utils.functional import cached_property
@@ -23,7 +20,13 @@ from django_select2.forms import Select2Widget
 from guardian.shortcuts import get_objects_for_user
 
 from ephios.core.forms.users import WorkingHourRequestForm
-from ephios.core.models import EventType, LocalParticipation, UserProfile, WorkingHours
+from ephios.core.models import (
+    EventType,
+    UserProfile,
+    WorkingHours,
+    WorkingHoursRollup,
+)
+from ephios.core.services.export import get_export_response, installed_export_formats
 from ephios.extra.mixins import CustomCheckPermissionMixin, CustomPermissionRequiredMixin
 from ephios.extra.templatetags.utils import timedelta_in_hours
 from ephios.extra.widgets import CustomDateInput
@@ -66,55 +69,32 @@ def _get_filterform_with_defaults(request):
 
 
 def _get_working_hours_stats(start: date, end: date, eventtype: EventType | None):
-    start = start or date.min
-    end = end or date.max
-    # pylint: disable=assignment-from-no-return
-    participations = LocalParticipation.objects.filter(
-        state=LocalParticipation.States.CONFIRMED,
-        start_time__date__gte=start,
-        end_time__date__lte=end,
+    rollup = WorkingHoursRollup.objects.filter(
+        date__gte=start or date.min, date__lte=end or date.max
     )
-    workinghours = {}
     if eventtype is not None:
-        participations = participations.filter(shift__event__type=eventtype)
-    else:
-        workinghours = (
-            WorkingHours.objects
-            .filter(date__gte=start, date__lte=end)
-            .annotate(
-                hour_sum=Sum("hours"), type=Value(MANUAL_WORKINGHOUR_TYPE, output_field=CharField())
-            )
-            .values_list("user__pk", "user__display_name", "hour_sum", "type")
-        )
-    participations = (
-        participations
-        .annotate(
-            duration=ExpressionWrapper(
-                (F("end_time") - F("start_time")),
-                output_field=DurationField(),
-            ),
-        )
-        .annotate(hour_sum=Sum("duration"), type=F("shift__event__type__title"))
-        .values_list("user__pk", "user__display_name", "hour_sum", "type")
+        rollup = rollup.filter(event_type=eventtype)
+    rollup = (
+        rollup
+        .values("user_id", "user__display_name", "event_type__title")
+        .annotate(duration=Sum("duration"))
+        .order_by()
     )
 
     result = {}
-    c = Counter()
-    for user_pk, display_name, hours, item_type in chain(participations, workinghours):
-        current_sum = (
-            hours.total_seconds() / (60 * 60)
-            if isinstance(hours, datetime.timedelta)
-            else float(hours)
+    for row in rollup:
+        hours = row["duration"].total_seconds() / (60 * 60)
+        user_stats = result.setdefault(
+            row["user_id"],
+            {
+                "pk": row["user_id"],
+                "display_name": row["user__display_name"],
+                "hours": 0,
+                "by_type": Counter(),
+            },
         )
-        c[user_pk] += current_sum
-        type_counter = result[user_pk]["by_type"] if user_pk in result else Counter()
-        type_counter[item_type] += current_sum
-        result[user_pk] = {
-            "pk": user_pk,
-            "display_name": display_name,
-            "hours": c[user_pk],
-            "by_type": type_counter,
-        }
+        user_stats["hours"] += hours
+        user_stats["by_type"][row["event_type__title"] or MANUAL_WORKINGHOUR_TYPE] += hours
     return sorted(result.values(), key=lambda x: x["hours"], reverse=True)
 
 
@@ -126,6 +106,7 @@ class WorkingHourOverview(CustomPermissionRequiredMixin, TemplateView):
         filter_form = _get_filterform_with_defaults(self.request)
         filter_form.is_valid()
         kwargs["filter_form"] = filter_form
+        kwargs["export_formats"] = list(installed_export_formats())
         kwargs["users"] = _get_working_hours_stats(
             start=filter_form.cleaned_data.get("start"),
             end=filter_form.cleaned_data.get("end"),
@@ -185,6 +166,7 @@ class UserProfileWorkingHourView(CanGrantMixin, CustomPermissionRequiredMixin, D
         filter_form = WorkingHourFilterForm(self.request.GET)
         filter_form.is_valid()
         kwargs["filter_form"] = filter_form
+        kwargs["export_formats"] = list(installed_export_formats())
         kwargs["workhour_items"] = self.get_object().get_workhour_items(
             start=filter_form.cleaned_data.get("start") or date.min,  # start/end are not required
             end=filter_form.cleaned_data.get("end") or date.max,
@@ -266,24 +248,15 @@ class WorkingHourExportView(CustomPermissionRequiredMixin, View):
         eventtypes = list(EventType.objects.all().values_list("title", flat=True)) + [
             MANUAL_WORKINGHOUR_TYPE
         ]
-        rows = []
-        for user in workinghours:
-            row = (
-                [user["display_name"]]
-                + [user["by_type"][eventtype] for eventtype in eventtypes]
-                + [user["hours"]]
-            )
-            rows.append(row)
-
-        response = HttpResponse(
-            content_type="text/csv",
-            headers={"Content-Disposition": 'attachment; filename="workinghours.csv"'},
+        rows = (
+            [user["display_name"]]
+            + [user["by_type"][eventtype] for eventtype in eventtypes]
+            + [user["hours"]]
+            for user in workinghours
+        )
+        return get_export_response(
+            request, "workinghours", [_("Name")] + eventtypes + [_("Total")], rows
         )
-        response.write(codecs.BOM_UTF8)  # needed for excel to recognise utf-8 encoding
-        writer = csv.writer(response)
-        writer.writerow([_("Name")] + eventtypes + [_("Total")])
-        writer.writerows(rows)
-        return response
 
 
 class UserProfileWorkingHourExportView(
@@ -303,23 +276,18 @@ class UserProfileWorkingHourExportView(
             eventtype=filter_form.cleaned_data.get("type"),
         )[1]
 
-        rows = []
-        for entry in workinghours:
-            rows.append([
+        rows = (
+            [
                 entry["date"],
                 entry["reason"],
                 timedelta_in_hours(entry["duration"]),
                 entry["type"],
-            ])
-
-        response = HttpResponse(
-            content_type="text/csv",
-            headers={
-                "Content-Disposition": f'attachment; filename="{self.get_object().display_name}.csv"'
-            },
+            ]
+            for entry in workinghours
+        )
+        return get_export_response(
+            request,
+            self.get_object().display_name,
+            [_("Date"), _("Reason"), _("Hours"), _("Type")],
+            rows,
         )
-        response.write(codecs.BOM_UTF8)  # needed for excel to recognise utf-8 encoding
-        writer = csv.writer(response)
-        writer.writerow([_("Date"), _("Reason"), _("Hours"), _("Type")])
-        writer.writerows(rows)
-        return response
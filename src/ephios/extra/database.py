@@ -4,3 +4,42 @@ from django.utils.functional import lazy
 # Shorthand for .select_for_update(of=("self,")) that handles DBS that don't support that feature
 # https://docs.djangoproject.com/en/dev/ref/models/querysets/#django.db.models.query.QuerySet.select_for_update
 OF_SELF = lazy(lambda: ("self",) if connection.features.has_select_for_update_of else (), tuple)()
+
+
+def copy_instance(instance, **overrides):
+    """
+    Return an unsaved copy of the instance with some fields overridden. Unlike ``copy``,
+    this initializes a new instance, so it e.g. gets its own log recorders.
+    Related objects already loaded for the instance are reused.
+    """
+    values = {}
+    for field in instance._meta.concrete_fields:  # pylint: disable=protected-access
+        if field.primary_key or field.name in overrides:
+            continue
+        if field.is_relation and field.is_cached(instance):
+            values[field.name] = getattr(instance, field.name)
+        else:
+            values[field.attname] = getattr(instance, field.attname)
+    return type(instance)(**values, **overrides)
+
+
+def bulk_create_with_pks(model, instances, log=True):
+    """
+    Create the instances with a single query and return them with their primary keys set,
+    e.g. to create related objects afterwards. On databases that don't return the primary keys
+    of inserted rows, the instances are saved one by one instead. As bulk queries don't send
+    the signals used for logging, bulk created instances of logged models are logged explicitly
+    unless ``log`` is False.
+    """
+    from ephios.modellogging.log import LOGGED_MODELS, bulk_update_log
+    from ephios.modellogging.recorders import InstanceActionType
+
+    instances = list(instances)
+    if connection.features.can_return_rows_from_bulk_insert:
+        model.objects.bulk_create(instances)
+        if log and model in LOGGED_MODELS:
+            bulk_update_log(instances, InstanceActionType.CREATE)
+    else:
+        for instance in instances:
+            instance.save()
+    return instances
@@ -1,7 +1,26 @@
+import functools
+import json
+import logging
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+
 from django.conf import settings
+from django.core.cache import cache, caches
+from django.db import connections
+from django.dispatch import Signal
+from django.template.backends.django import Template as DjangoTemplate
+from django.urls import URLResolver, get_resolver
+from django.utils import timezone
 
 from ephios.core.services.notifications.types import NOTIFICATION_READ_PARAM_NAME
 
+logger = logging.getLogger(__name__)
+
+SLOW_REQUESTS_CACHE_KEY = "ephios.extra.middleware.slow_requests.{url_name}"
+SLOW_REQUESTS_COUNT_CACHE_KEY = "ephios.extra.middleware.slow_requests.count.{url_name}"
+SLOW_REQUESTS_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+
 
 class EphiosLocaleMiddleware:
     def __init__(self, get_response):
@@ -41,3 +60,222 @@ class EphiosNotificationMiddleware:
                 notification.read = True
                 notification.save(update_fields=["read"])
         return response
+
+
+class QueryBudgetExceeded(Exception):
+    """
+    A view executed more database queries than its budget in ``settings.QUERY_BUDGETS`` allows.
+    """
+
+
+class RequestMetrics:
+    """
+    Collects timings of a single request. Durations are in seconds.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.duration = 0
+        self.queries = 0
+        self.db_duration = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.template_duration = 0
+        self.signal_duration = 0
+        # nesting depth of timed sections, so that nested renders or signals are not counted twice
+        self.depth = {}
+
+    def as_dict(self):
+        return {
+            "duration": round(self.duration * 1000, 1),
+            "queries": self.queries,
+            "db": round(self.db_duration * 1000, 1),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "templates": round(self.template_duration * 1000, 1),
+            "signals": round(self.signal_duration * 1000, 1),
+        }
+
+    def server_timing(self):
+        return ", ".join([
+            f'db;dur={self.db_duration * 1000:.1f};desc="{self.queries} queries"',
+            f'cache;desc="{self.cache_hits} hits, {self.cache_misses} misses"',
+            f"tpl;dur={self.template_duration * 1000:.1f}",
+            f"signals;dur={self.signal_duration * 1000:.1f}",
+            f"total;dur={self.duration * 1000:.1f}",
+        ])
+
+
+_request_metrics = ContextVar("ephios_request_metrics", default=None)
+_MISSING = object()
+
+
+def _timed(func, attribute):
+    """Wrap ``func`` to add its runtime to ``attribute`` of the metrics of the current request."""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if (metrics := _request_metrics.get()) is None:
+            return func(*args, **kwargs)
+        depth = metrics.depth.get(attribute, 0)
+        metrics.depth[attribute] = depth + 1
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            metrics.depth[attribute] = depth
+            if not depth:
+                setattr(
+                    metrics, attribute, getattr(metrics, attribute) + time.perf_counter() - start
+                )
+
+    wrapper.ephios_instrumented = True
+    return wrapper
+
+
+def _instrument_templates_and_signals():
+    if getattr(DjangoTemplate.render, "ephios_instrumented", False):
+        return
+    DjangoTemplate.render = _timed(DjangoTemplate.render, "template_duration")
+    Signal.send = _timed(Signal.send, "signal_duration")
+    Signal.send_robust = _timed(Signal.send_robust, "signal_duration")
+
+
+def _instrument_cache(backend):
+    # cache backends are instantiated per thread, so the bound methods of the instance are wrapped
+    if getattr(backend.get, "ephios_instrumented", False):
+        return
+    get, get_many = backend.get, backend.get_many
+
+    def instrumented_get(key, default=None, version=None):
+        value = get(key, _MISSING, version=version)
+        if metrics := _request_metrics.get():
+            if value is _MISSING:
+                metrics.cache_misses += 1
+            else:
+                metrics.cache_hits += 1
+        return default if value is _MISSING else value
+
+    def instrumented_get_many(keys, version=None):
+        keys = list(keys)
+        values = get_many(keys, version=version)
+        if metrics := _request_metrics.get():
+            metrics.cache_hits += len(values)
+            metrics.cache_misses += len(keys) - len(values)
+        return values
+
+    instrumented_get.ephios_instrumented = True
+    backend.get, backend.get_many = instrumented_get, instrumented_get_many
+
+
+def _count_query(execute, sql, params, many, context):
+    if (metrics := _request_metrics.get()) is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.db_duration += time.perf_counter() - start
+
+
+def _iter_url_names(patterns, namespace=None):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            child_namespace = (
+                ":".join(filter(None, [namespace, pattern.namespace]))
+                if pattern.namespace
+                else namespace
+            )
+            yield from _iter_url_names(pattern.url_patterns, child_namespace)
+        elif pattern.name:
+            yield f"{namespace}:{pattern.name}" if namespace else pattern.name
+
+
+@functools.cache
+def _get_url_names():
+    return frozenset(_iter_url_names(get_resolver().url_patterns))
+
+
+def record_slow_request(url_name, duration):
+    """Remember a slow request to the view named ``url_name`` for the slow requests health check."""
+    # every view has its own keys and the count is incremented atomically,
+    # so concurrent slow requests do not overwrite each other
+    count_key = SLOW_REQUESTS_COUNT_CACHE_KEY.format(url_name=url_name)
+    cache.add(count_key, 0, SLOW_REQUESTS_CACHE_TIMEOUT)
+    try:
+        cache.incr(count_key)
+    except ValueError:  # expired in between
+        cache.set(count_key, 1, SLOW_REQUESTS_CACHE_TIMEOUT)
+    key = SLOW_REQUESTS_CACHE_KEY.format(url_name=url_name)
+    max_duration, __ = cache.get(key, (0, None))
+    cache.set(key, (max(max_duration, duration), timezone.now()), SLOW_REQUESTS_CACHE_TIMEOUT)
+
+
+def get_slow_requests(since):
+    """Return a dict mapping url names to tuples of (count, max duration, last seen)."""
+    url_names = _get_url_names()
+    entries = cache.get_many([SLOW_REQUESTS_CACHE_KEY.format(url_name=name) for name in url_names])
+    counts = cache.get_many([
+        SLOW_REQUESTS_COUNT_CACHE_KEY.format(url_name=name) for name in url_names
+    ])
+    slow_requests = {}
+    for url_name in url_names:
+        entry = entries.get(SLOW_REQUESTS_CACHE_KEY.format(url_name=url_name))
+        if entry is not None and entry[1] >= since:
+            count = counts.get(SLOW_REQUESTS_COUNT_CACHE_KEY.format(url_name=url_name), 1)
+            slow_requests[url_name] = (count, *entry)
+    return slow_requests
+
+
+class EphiosInstrumentationMiddleware:
+    """
+    Measure database queries, cache hits, template rendering and signal dispatching of every request
+    and expose them in a ``Server-Timing`` header and a log line. Views can be given a query budget
+    by their url name in ``settings.QUERY_BUDGETS``. Exceeding it is logged or, if
+    ``settings.QUERY_BUDGETS_RAISE`` is set, raises ``QueryBudgetExceeded``.
+    Timing templates and signals patches django for the whole process,
+    so it is only done if ``settings.INSTRUMENT_TEMPLATES_AND_SIGNALS`` is set.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if settings.INSTRUMENT_TEMPLATES_AND_SIGNALS:
+            _instrument_templates_and_signals()
+
+    def __call__(self, request):
+        _instrument_cache(caches["default"])
+        metrics = RequestMetrics()
+        token = _request_metrics.set(metrics)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(_count_query))
+                response = self.get_response(request)
+        finally:
+            _request_metrics.reset(token)
+        metrics.duration = time.perf_counter() - metrics.start
+        url_name = request.resolver_match.view_name if request.resolver_match else None
+
+        response["Server-Timing"] = metrics.server_timing()
+        slow = metrics.duration > settings.SLOW_REQUEST_THRESHOLD
+        # the path is not logged, as it may contain secrets like calendar tokens
+        logger.log(
+            logging.INFO if slow else logging.DEBUG,
+            "%s %s %s",
+            request.method,
+            url_name,
+            json.dumps({"status": response.status_code, **metrics.as_dict()}),
+        )
+        if slow and url_name:
+            record_slow_request(url_name, metrics.duration)
+        if (
+            budget := settings.QUERY_BUDGETS.get(url_name)
+        ) is not None and metrics.queries > budget:
+            message = f"{url_name} executed {metrics.queries} queries, its budget is {budget}."
+            if settings.QUERY_BUDGETS_RAISE:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
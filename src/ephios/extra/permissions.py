@@ -1,18 +1,28 @@
-from functools import wraps
+import uuid
+from collections import defaultdict
+from functools import cached_property, wraps
 from typing import Optional
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache
 from django.core.exceptions import PermissionDenied
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import F, Q
+from django.db.models.functions import Cast
 from django.forms import BooleanField
 from guardian.ctypes import get_content_type
 from guardian.shortcuts import assign_perm, remove_perm
-from guardian.utils import get_group_obj_perms_model
+from guardian.utils import get_group_obj_perms_model, get_user_obj_perms_model
 
 Q_FALSE = Q(pk__in=[])
 
+# object primary key sets larger than this are matched with a subquery on the permission tables
+# instead of a literal list, which would make for large queries and bad query plans
+OBJECT_PKS_LITERAL_LIMIT = 200
+
 
 def staff_required(view_func):
     @wraps(view_func)
@@ -116,6 +126,274 @@ def get_permissions_from_qualified_names(qualified_names):
     return Permission.objects.filter(perms_filter)
 
 
+PERMISSION_VERSION_CACHE_KEY = "ephios.extra.permissions.version.{scope}"
+OBJECT_PKS_CACHE_KEY = "ephios.extra.permissions.object_pks.{content_type}.{user}.{versions}"
+
+
+def _content_type_scope(content_type_id):
+    return f"content_type.{content_type_id}"
+
+
+def _user_scope(user_pk):
+    return f"user.{user_pk}"
+
+
+def _bump_permission_versions(scopes):
+    cache.set_many({
+        PERMISSION_VERSION_CACHE_KEY.format(scope=scope): uuid.uuid4().hex for scope in scopes
+    })
+
+
+def invalidate_object_permissions(*, model=None, content_type_id=None, users=()):
+    """
+    Invalidate object permission sets cached by ``ObjectPermissionResolver`` in the shared cache,
+    either for all users of a model or for all models of some users.
+    Changes to guardian's permission models are picked up through model signals, but guardian
+    uses ``bulk_create`` when assigning a permission to multiple users or groups at once,
+    so call this after doing so.
+    """
+    scopes = {_user_scope(getattr(user, "pk", user)) for user in users}
+    if model is not None:
+        content_type_id = get_content_type(model).pk
+    if content_type_id is not None:
+        scopes.add(_content_type_scope(content_type_id))
+    if not scopes:
+        return
+    _bump_permission_versions(scopes)
+    # another request might have repopulated the cache from data not yet committed
+    transaction.on_commit(lambda: _bump_permission_versions(scopes))
+
+
+def get_permission_version(user, model):
+    """
+    Return a string that changes whenever the object permissions of the user for the model
+    might have changed. Use it in keys of cached data that depends on these permissions.
+    """
+    version_keys = [
+        PERMISSION_VERSION_CACHE_KEY.format(scope=scope)
+        for scope in (_content_type_scope(get_content_type(model).pk), _user_scope(user.pk))
+    ]
+    versions = cache.get_many(version_keys)
+    if missing := {key: uuid.uuid4().hex for key in version_keys if key not in versions}:
+        cache.set_many(missing)
+        versions.update(missing)
+    return "-".join(versions[key] for key in version_keys)
+
+
+class ObjectPermissionResolver:
+    """
+    Resolves the permissions a user has on objects of a single model.
+    Global permissions as well as user and group object permissions for the model's content type
+    are loaded once and checks are answered from memory afterwards.
+
+    If the cache is shared by all processes (see the ``SHARED_CACHE`` setting), the sets of object
+    primary keys are additionally materialized in it, versioned per content type and per user,
+    so they only need to be queried from the database again after permissions or group memberships
+    changed (see ``invalidate_object_permissions``).
+
+    Use ``get_permission_resolver`` to share a resolver for the lifetime of a user instance,
+    which usually means the current request. Like django's own permission cache, the resolver
+    does not notice permission changes after it has been loaded, so use
+    ``clear_permission_resolvers`` after assigning or removing permissions of a loaded user.
+    """
+
+    def __init__(self, user, klass):
+        self.user = user
+        self.model = klass._meta.concrete_model  # pylint: disable=protected-access
+        self.content_type = get_content_type(self.model)
+
+    @property
+    def _is_active_user(self):
+        return getattr(self.user, "is_authenticated", False) and self.user.is_active
+
+    def _codename(self, perm):
+        if "." in perm:
+            app_label, codename = perm.split(".", 1)
+            if app_label != self.content_type.app_label:
+                raise ValueError(
+                    f"Permission {perm} does not belong to app {self.content_type.app_label}"
+                )
+            return codename
+        return perm
+
+    @cached_property
+    def global_codenames(self):
+        """Set of codenames of global permissions the user has for this model's app."""
+        if not self._is_active_user:
+            return frozenset()
+        prefix = f"{self.content_type.app_label}."
+        return frozenset(
+            perm.removeprefix(prefix)
+            for perm in self.user.get_all_permissions()
+            if perm.startswith(prefix)
+        )
+
+    def _load_pks_by_codename(self):
+        pks_by_codename = defaultdict(set)
+        for perms_model, owner_filter in (
+            (get_user_obj_perms_model(self.model), {"user": self.user}),
+            (get_group_obj_perms_model(self.model), {"group__in": self.user.groups.all()}),
+        ):
+            pk_field = "object_pk" if perms_model.objects.is_generic() else "content_object_id"
+            rows = perms_model.objects.filter(
+                permission__content_type=self.content_type, **owner_filter
+            ).values_list(pk_field, "permission__codename")
+            for pk, codename in rows:
+                pks_by_codename[codename].add(self.model._meta.pk.to_python(pk))  # pylint: disable=protected-access
+        return {codename: frozenset(pks) for codename, pks in pks_by_codename.items()}
+
+    @cached_property
+    def _pks_by_codename(self):
+        if not self._is_active_user:
+            return {}
+        if not settings.SHARED_CACHE:
+            return self._load_pks_by_codename()
+        key = OBJECT_PKS_CACHE_KEY.format(
+            content_type=self.content_type.pk,
+            user=self.user.pk,
+            versions=get_permission_version(self.user, self.model),
+        )
+        return cache.get_or_set(key, self._load_pks_by_codename)
+
+    def has_global_perm(self, perm):
+        if not self._is_active_user:
+            return False
+        return self.user.is_superuser or self._codename(perm) in self.global_codenames
+
+    def has_perm(self, perm, obj, accept_global_perms=True):
+        """
+        Return whether the user has ``perm`` on ``obj``, either through global permissions
+        (unless ``accept_global_perms`` is False) or through user or group object permissions.
+        """
+        if not self._is_active_user:
+            return False
+        if accept_global_perms and self.has_global_perm(perm):
+            return True
+        return obj.pk in self.get_object_pks(perm)
+
+    def get_object_pks(self, perm):
+        """
+        Return a frozenset of primary keys of objects the user has ``perm`` for
+        through user or group object permissions, ignoring global permissions.
+        """
+        return self._pks_by_codename.get(self._codename(perm), frozenset())
+
+    def _object_pks_subqueries(self, perm):
+        codename = self._codename(perm)
+        for perms_model, owner_filter in (
+            (get_user_obj_perms_model(self.model), {"user": self.user}),
+            (get_group_obj_perms_model(self.model), {"group__in": self.user.groups.all()}),
+        ):
+            if perms_model.objects.is_generic():
+                pk_field = Cast("object_pk", output_field=self.model._meta.pk)  # pylint: disable=protected-access
+            else:
+                pk_field = F("content_object_id")
+            yield perms_model.objects.filter(
+                permission__content_type=self.content_type,
+                permission__codename=codename,
+                **owner_filter,
+            ).values(object_id=pk_field)
+
+    def object_pks_filter(self, perm, field="pk"):
+        """
+        Return a Q object matching the objects referenced by ``field`` that the user has ``perm``
+        for through user or group object permissions, ignoring global permissions.
+        Like ``get_object_pks``, but large sets of primary keys are matched with subqueries.
+        """
+        object_pks = self.get_object_pks(perm)
+        if len(object_pks) <= OBJECT_PKS_LITERAL_LIMIT:
+            return Q(**{f"{field}__in": object_pks})
+        condition = Q_FALSE
+        for subquery in self._object_pks_subqueries(perm):
+            condition |= Q(**{f"{field}__in": subquery})
+        return condition
+
+    def filter_queryset(self, queryset, perm, accept_global_perms=True, field="pk"):
+        """
+        Filter ``queryset`` to objects the user has ``perm`` for.
+        ``field`` names the field on ``queryset`` that references objects of this resolver's model.
+        """
+        if accept_global_perms and self.has_global_perm(perm):
+            return queryset
+        return queryset.filter(self.object_pks_filter(perm, field=field))
+
+
+def get_permission_resolver(user, klass) -> ObjectPermissionResolver:
+    """
+    Return the ``ObjectPermissionResolver`` for the given user and model (or model instance),
+    cached on the user instance.
+    """
+    model = klass._meta.concrete_model  # pylint: disable=protected-access
+    if not hasattr(user, "_ephios_permission_resolvers"):
+        user._ephios_permission_resolvers = {}  # pylint: disable=protected-access
+    resolvers = user._ephios_permission_resolvers  # pylint: disable=protected-access
+    if model not in resolvers:
+        resolvers[model] = ObjectPermissionResolver(user, model)
+    return resolvers[model]
+
+
+def clear_permission_resolvers(user):
+    """Drop permission resolvers (and django's permission cache) cached on the user instance."""
+    for attr in (
+        "_ephios_permission_resolvers",
+        "_perm_cache",
+        "_user_perm_cache",
+        "_group_perm_cache",
+    ):
+        if hasattr(user, attr):
+            delattr(user, attr)
+
+
+def _get_object_perm_owner_rows(model, perm, object_pks):
+    """
+    Yield ``(perms_model, object_pk, owner_pk)`` tuples for the user and group object
+    permissions ``perm`` (a codename) on the given objects.
+    """
+    content_type = get_content_type(model)
+    for perms_model, owner_field in (
+        (get_user_obj_perms_model(model), "user_id"),
+        (get_group_obj_perms_model(model), "group_id"),
+    ):
+        if perms_model.objects.is_generic():
+            pk_field, pks = "object_pk", [str(pk) for pk in object_pks]
+        else:
+            pk_field, pks = "content_object_id", list(object_pks)
+        rows = perms_model.objects.filter(
+            permission__content_type=content_type,
+            permission__codename=perm,
+            **{f"{pk_field}__in": pks},
+        ).values_list(pk_field, owner_field)
+        for pk, owner_pk in rows:
+            yield perms_model, model._meta.pk.to_python(pk), owner_pk  # pylint: disable=protected-access
+
+
+def get_user_pks_with_object_perm(klass, perm, object_pks):
+    """
+    Return a dict mapping each of the given object primary keys to the set of primary keys of
+    users that have the object permission ``perm`` (a codename) on it, directly or through a group.
+    This is a bulk version of guardian's ``get_users_with_perms`` for a single permission and
+    does not take global permissions into account.
+    """
+    model = klass._meta.concrete_model  # pylint: disable=protected-access
+    user_pks = {pk: set() for pk in object_pks}
+    group_pks = defaultdict(set)
+    user_perms_model = get_user_obj_perms_model(model)
+    for perms_model, pk, owner_pk in _get_object_perm_owner_rows(model, perm, user_pks):
+        if perms_model is user_perms_model:
+            user_pks[pk].add(owner_pk)
+        else:
+            group_pks[owner_pk].add(pk)
+    if group_pks:
+        groups_field = get_user_model().groups.field
+        memberships = groups_field.remote_field.through.objects.filter(
+            group_id__in=group_pks
+        ).values_list("group_id", f"{groups_field.m2m_field_name()}_id")
+        for group_pk, user_pk in memberships:
+            for pk in group_pks[group_pk]:
+                user_pks[pk].add(user_pk)
+    return user_pks
+
+
 class ObjectSupportingModelBackend(ModelBackend):
     """
     The default model backend denies permissions when an obj is supplied.
@@ -0,0 +1,33 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from guardian.models import GroupObjectPermission, UserObjectPermission
+
+from ephios.extra.permissions import invalidate_object_permissions
+
+
+@receiver(post_save, sender=UserObjectPermission)
+@receiver(post_delete, sender=UserObjectPermission)
+def invalidate_user_object_permissions(sender, instance, **kwargs):
+    invalidate_object_permissions(users=[instance.user_id])
+
+
+@receiver(post_save, sender=GroupObjectPermission)
+@receiver(post_delete, sender=GroupObjectPermission)
+def invalidate_group_object_permissions(sender, instance, **kwargs):
+    invalidate_object_permissions(content_type_id=instance.content_type_id)
+
+
+@receiver(m2m_changed, sender=get_user_model().groups.through)
+def invalidate_object_permissions_on_group_membership_change(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if action not in {"post_add", "post_remove", "pre_clear"}:
+        return
+    if not reverse:
+        users = [instance.pk]
+    elif action == "pre_clear":
+        users = list(instance.user_set.values_list("pk", flat=True))
+    else:
+        users = pk_set
+    invalidate_object_permissions(users=users)
@@ -1,9 +1,13 @@
+import functools
+import hashlib
+import threading
 from urllib.parse import urlparse
 
 import bleach
 import markdown
 from bleach.linkifier import DEFAULT_CALLBACKS
 from django import template
+from django.core.cache import cache
 from django.utils.http import url_has_allowed_host_and_scheme
 from django.utils.safestring import mark_safe
 
@@ -57,16 +61,45 @@ ALLOWED_ATTRIBUTES = {
 
 ALLOWED_PROTOCOLS = {"http", "https", "mailto", "tel"}
 
+MARKDOWN_EXTENSIONS = ["markdown.extensions.sane_lists", "markdown.extensions.nl2br"]
+
+RICH_TEXT_CACHE_KEY = "ephios.extra.rich_text.{hash}"
+RICH_TEXT_CACHE_TIMEOUT = 60 * 60 * 24
+RICH_TEXT_LOCAL_CACHE_SIZE = 512
+
+# markdown and bleach instances are expensive to create, but not thread safe
+_local = threading.local()
+
+
+def _get_markdown():
+    if (md := getattr(_local, "markdown", None)) is None:
+        md = _local.markdown = markdown.Markdown(extensions=MARKDOWN_EXTENSIONS)
+    return md.reset()
+
+
+def _get_cleaner(excluded_tags):
+    if (cleaners := getattr(_local, "cleaners", None)) is None:
+        cleaners = _local.cleaners = {}
+    if (cleaner := cleaners.get(excluded_tags)) is None:
+        cleaner = cleaners[excluded_tags] = bleach.Cleaner(
+            tags=ALLOWED_TAGS - set(excluded_tags.split(",")),
+            attributes=ALLOWED_ATTRIBUTES,
+            protocols=ALLOWED_PROTOCOLS,
+        )
+    return cleaner
+
+
+def _get_linker():
+    if (linker := getattr(_local, "linker", None)) is None:
+        linker = _local.linker = bleach.Linker(
+            parse_email=True,
+            callbacks=DEFAULT_CALLBACKS + [safelink_callback],
+        )
+    return linker
+
 
 def markdown_compile(source, excluded_tags=""):
-    extensions = ["markdown.extensions.sane_lists", "markdown.extensions.nl2br"]
-    tags = ALLOWED_TAGS - set(excluded_tags.split(","))
-    return bleach.clean(
-        markdown.markdown(source, extensions=extensions),
-        tags=tags,
-        attributes=ALLOWED_ATTRIBUTES,
-        protocols=ALLOWED_PROTOCOLS,
-    )
+    return _get_cleaner(excluded_tags).clean(_get_markdown().convert(source))
 
 
 def safelink_callback(attrs, new=False):
@@ -87,15 +120,21 @@ def safelink_callback(attrs, new=False):
     return attrs
 
 
+@functools.lru_cache(maxsize=RICH_TEXT_LOCAL_CACHE_SIZE)
+def _render_rich_text(text, excluded_tags, site_url):
+    # the site url is part of the key, as links to other sites are rendered differently
+    content_hash = hashlib.sha256(f"{site_url}|{excluded_tags}|{text}".encode()).hexdigest()
+    key = RICH_TEXT_CACHE_KEY.format(hash=content_hash)
+    if (html := cache.get(key)) is None:
+        html = _get_linker().linkify(markdown_compile(text, excluded_tags=excluded_tags))
+        cache.set(key, html, RICH_TEXT_CACHE_TIMEOUT)
+    return html
+
+
 @register.filter
 def rich_text(text: str, excluded_tags=""):
     """
     Processes markdown and cleans HTML in a text input.
+    The result is cached in the process and the shared cache by the content.
     """
-    text = str(text)
-    linker = bleach.Linker(
-        parse_email=True,
-        callbacks=DEFAULT_CALLBACKS + [safelink_callback],
-    )
-    body_md = linker.linkify(markdown_compile(text, excluded_tags=excluded_tags))
-    return mark_safe(body_md)
+    return mark_safe(_render_rich_text(str(text), excluded_tags, dynamic_settings.SITE_URL))
@@ -174,6 +174,27 @@ def _get_log_data(instance, action_type):
     return data
 
 
+def _new_logentry(instance, config, action_type, log_data):
+    try:
+        user = log_request.get(None).user
+        if not user.is_authenticated:
+            user = None
+        request_id = log_request_id.get(None)
+    except AttributeError:
+        user = None
+        request_id = None
+    attach_to_model, attached_to_object_id = config.object_to_attach_logentries_to(instance)
+    return LogEntry(
+        content_object=instance,
+        attached_to_object_type=ContentType.objects.get_for_model(attach_to_model),
+        attached_to_object_id=attached_to_object_id,
+        user=user,
+        request_id=request_id,
+        action_type=action_type,
+        data=log_data,
+    )
+
+
 def update_log(instance, action_type: InstanceActionType):
     logentry = getattr(instance, "_current_logentry", None)
     log_data = _get_log_data(instance, logentry.action_type if logentry else action_type)
@@ -184,30 +205,41 @@ def update_log(instance, action_type: InstanceActionType):
     if logentry:
         logentry.data.update(log_data)
     else:
-        try:
-            user = log_request.get(None).user
-            if not user.is_authenticated:
-                user = None
-            request_id = log_request_id.get(None)
-        except AttributeError:
-            user = None
-            request_id = None
-        attach_to_model, attached_to_object_id = config.object_to_attach_logentries_to(instance)
-        attached_to_object_type = ContentType.objects.get_for_model(attach_to_model)
-        logentry = LogEntry(
-            content_object=instance,
-            attached_to_object_type=attached_to_object_type,
-            attached_to_object_id=attached_to_object_id,
-            user=user,
-            request_id=request_id,
-            action_type=action_type,
-            data=log_data,
-        )
+        logentry = _new_logentry(instance, config, action_type, log_data)
 
     config.save_logentry(logentry)
     instance._current_logentry = logentry
 
 
+def bulk_update_log(instances, action_type: InstanceActionType):
+    """
+    Log instances that were written with bulk operations, which do not send the signals used for logging.
+    The log entries are saved with a single query, so ``save_logentry`` of the log config is not called.
+    """
+    logentries = []
+    for instance in instances:
+        config = LOGGED_MODELS[type(instance)]
+        if log_data := _get_log_data(instance, action_type):
+            logentries.append(_new_logentry(instance, config, action_type, log_data))
+    LogEntry.objects.bulk_create(logentries)
+
+
+def record_m2m_changes(instance, through, added=(), removed=()):
+    """
+    Record related objects ``added`` to and ``removed`` from m2m relations of a logged instance
+    with bulk operations on the ``through`` model, which do not send ``m2m_changed``.
+    Call ``bulk_update_log`` afterwards.
+    """
+    for recorder in getattr(instance, "_log_recorders", []):
+        if (
+            recorder.slug == M2MLogRecorder.slug
+            and getattr(type(instance), recorder.field_name).through == through
+        ):
+            recorder.added_pks |= {obj.pk for obj in added}
+            recorder.removed_pks |= {obj.pk for obj in removed}
+            recorder.loaded_objects.update({obj.pk: obj for obj in [*added, *removed]})
+
+
 @receiver(post_init)
 def log_post_init(sender, instance, **kwargs):
     if config := LOGGED_MODELS.get(sender):
@@ -223,6 +223,8 @@ class M2MLogRecorder(BaseLogRecorder):
         if field and not self.verbose_name:
             self.verbose_name = str(getattr(field, "verbose_name", capitalize_first(field.name)))
         self.added_pks, self.removed_pks = set(), set()
+        # related objects already loaded by bulk operations, by pk
+        self.loaded_objects = {}
 
     def attached(self, instance):
         self.model = type(instance)
@@ -251,8 +253,8 @@ class M2MLogRecorder(BaseLogRecorder):
         data = {
             "field_name": self.field_name,
             "verbose_name": self.verbose_name,
-            "added": related_model._base_manager.filter(pk__in=self.added_pks),
-            "removed": related_model._base_manager.filter(pk__in=self.removed_pks),
+            "added": self._related_objects(related_model, self.added_pks),
+            "removed": self._related_objects(related_model, self.removed_pks),
         }
 
         if (current := getattr(self, "current", None)) is not None:
@@ -260,6 +262,11 @@ class M2MLogRecorder(BaseLogRecorder):
 
         return data
 
+    def _related_objects(self, related_model, pks):
+        if self.loaded_objects and pks <= self.loaded_objects.keys():
+            return [self.loaded_objects[pk] for pk in pks]
+        return related_model._base_manager.filter(pk__in=pks)
+
     @classmethod
     def deserialize(cls, data, model, action_type: InstanceActionType):
         try:
@@ -41,23 +41,40 @@ class MinimumAgeMixin(_Base):
         return ConfigurationForm
 
 
+def _check_maximum_number_of_participants(shift, count_confirmed):
+    if (
+        not shift.signup_flow.uses_requested_state
+        and (maximum := shift.structure.configuration.maximum_number_of_participants) is not None
+        and count_confirmed() >= maximum
+    ):
+        raise SignupDisallowedError(_("The maximum number of participants is reached."))
+
+
 class MinMaxParticipantsMixin(_Base):
     def get_checkers(self):
         def check_maximum_number_of_participants(shift, participant):
-            if (
-                not shift.signup_flow.uses_requested_state
-                and shift.structure.configuration.maximum_number_of_participants is not None
-            ):
-                current_count = len([
+            _check_maximum_number_of_participants(
+                shift,
+                lambda: len([
                     participation
                     for participation in shift.participations.all()
                     if participation.state == AbstractParticipation.States.CONFIRMED
-                ])
-                if current_count >= shift.structure.configuration.maximum_number_of_participants:
-                    raise SignupDisallowedError(_("The maximum number of participants is reached."))
+                ]),
+            )
 
         return super().get_checkers() + [check_maximum_number_of_participants]
 
+    def get_capacity_checkers(self):
+        def check_capacity(shift, participant):
+            _check_maximum_number_of_participants(
+                shift,
+                AbstractParticipation.objects.filter(
+                    shift=shift, state=AbstractParticipation.States.CONFIRMED
+                ).count,
+            )
+
+        return super().get_capacity_checkers() + [check_capacity]
+
     def get_participant_count_bounds(self):
         return (
             self.configuration.minimum_number_of_participants,
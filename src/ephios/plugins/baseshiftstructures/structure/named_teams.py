@@ -87,7 +87,7 @@ class NamedTeamsDispositionParticipationForm(BaseDispositionParticipationForm):
 
     def save(self, commit=True):
         self.instance.structure_data["dispatched_team_uuid"] = self.cleaned_data["team"]
-        super().save(commit)
+        return super().save(commit)
 
 
 class NamedTeamForm(QualificationRequirementForm):
@@ -191,27 +191,33 @@ class NamedTeamsShiftStructure(BaseGroupBasedShiftStructure):
 
         return d
 
+    def check_qualifications_and_max_count(self, shift, participant):
+        viable_teams = teams_participant_qualifies_for(
+            shift.structure.configuration.teams, participant
+        )
+        if not viable_teams:
+            raise ParticipantUnfitError(_("You are not qualified."))
+
+        # check if teams are full if signup flow does not use requested state
+        if shift.signup_flow.uses_requested_state:
+            return
+        free_team = False
+        team_stats = self._get_signup_stats_per_group(self.shift.participations.all())
+        for team in viable_teams:
+            if team_stats[team["uuid"]].has_free():
+                free_team = True
+                break
+        if not free_team:
+            raise ParticipantUnfitError(_("All teams you qualify for are full."))
+
     def get_checkers(self):
-        def check_qualifications_and_max_count(shift, participant):
-            viable_teams = teams_participant_qualifies_for(
-                shift.structure.configuration.teams, participant
-            )
-            if not viable_teams:
-                raise ParticipantUnfitError(_("You are not qualified."))
-
-            # check if teams are full if signup flow does not use requested state
-            if shift.signup_flow.uses_requested_state:
-                return
-            free_team = False
-            team_stats = self._get_signup_stats_per_group(self.shift.participations.all())
-            for team in viable_teams:
-                if team_stats[team["uuid"]].has_free():
-                    free_team = True
-                    break
-            if not free_team:
-                raise ParticipantUnfitError(_("All teams you qualify for are full."))
-
-        return super().get_checkers() + [check_qualifications_and_max_count]
+        return super().get_checkers() + [self.check_qualifications_and_max_count]
+
+    def get_capacity_checkers(self):
+        # whether there is a free place depends on the team, so we need to check the teams again
+        if self.shift.signup_flow.uses_requested_state:
+            return super().get_capacity_checkers()
+        return super().get_capacity_checkers() + [self.check_qualifications_and_max_count]
 
     def _configure_participation(
         self, participation: AbstractParticipation, **kwargs
@@ -95,6 +95,14 @@ class QualificationMixShiftStructure(BaseGroupBasedShiftStructure):
             )
         ]
 
+    def get_capacity_checkers(self):
+        # whether there is a free place depends on the matching, so we need to match again
+        if self.shift.signup_flow.uses_requested_state:
+            return super().get_capacity_checkers()
+        return super().get_capacity_checkers() + [
+            partial(self.check_qualifications, strict_mode=True)
+        ]
+
     @cached_property
     def _requirements(self):
         requirements = []
@@ -1,5 +1,7 @@
+from collections import defaultdict
+
 from django import forms
-from django.db.models import Q
+from django.db.models import Q, prefetch_related_objects
 from django.db.models.signals import post_save, pre_save
 from django.dispatch import receiver
 from django.utils.functional import cached_property
@@ -7,7 +9,9 @@ from django.utils.safestring import mark_safe
 from django.utils.translation import gettext_lazy as _
 from django.utils.translation import pgettext
 
-from ephios.core.models import AbstractParticipation, Shift
+from ephios.core.models import AbstractParticipation, LocalParticipation, Shift
+from ephios.core.services.participation import bulk_update_participations
+from ephios.core.signals import participation_states_changed
 from ephios.core.signup.flow.base import BaseSignupFlow
 from ephios.core.signup.flow.participant_validation import (
     ActionDisallowedError,
@@ -83,6 +87,15 @@ class CoupledSignupFlow(BaseSignupFlow):
             return None
 
 
+def get_coupled_shifts(leader_shift):
+    return [
+        shift
+        for shift in leader_shift.event.shifts.all()
+        if shift.signup_flow_slug == CoupledSignupFlow.slug
+        and shift.signup_flow.leader_shift == leader_shift
+    ]
+
+
 @receiver(pre_save, dispatch_uid="ephios_coupled_signup_update_coupled_shifts")
 def update_coupled_shifts(sender, instance, **kwargs):
     # make sure sender is a true subclass of AbstractParticipation
@@ -92,14 +105,7 @@ def update_coupled_shifts(sender, instance, **kwargs):
     if instance.state == AbstractParticipation.States.GETTING_DISPATCHED:
         return
 
-    coupled_shifts = [
-        shift
-        for shift in instance.shift.event.shifts.all()
-        if shift.signup_flow_slug == CoupledSignupFlow.slug
-        and shift.signup_flow.leader_shift == instance.shift
-    ]
-
-    for coupled_shift in coupled_shifts:
+    for coupled_shift in get_coupled_shifts(instance.shift):
         # make sure a type `instance` exists also for `coupled_shift`
         coupled_participation = coupled_shift.signup_flow.get_or_create_participation_for(
             instance.participant
@@ -108,6 +114,39 @@ def update_coupled_shifts(sender, instance, **kwargs):
         coupled_participation.save()
 
 
+@receiver(
+    participation_states_changed,
+    dispatch_uid="ephios_coupled_signup_update_coupled_shifts_in_bulk",
+)
+def update_coupled_shifts_in_bulk(sender, participations, **kwargs):
+    leader_participations = defaultdict(list)
+    for participation in participations:
+        if participation.state != AbstractParticipation.States.GETTING_DISPATCHED:
+            leader_participations[participation.shift].append(participation)
+
+    changed = []
+    for leader_shift, participations_of_shift in leader_participations.items():
+        for coupled_shift in get_coupled_shifts(leader_shift):
+            existing = list(coupled_shift.participations.all())
+            prefetch_related_objects(
+                [p for p in existing if isinstance(p, LocalParticipation)], "user"
+            )
+            coupled_participations = {p.participant: p for p in existing}
+            for participation in participations_of_shift:
+                coupled_participation = coupled_participations.get(participation.participant)
+                if coupled_participation is None:
+                    # new participations are saved one by one, which also updates them
+                    coupled_participation = participation.participant.new_participation(
+                        coupled_shift
+                    )
+                    coupled_participation.state = participation.state
+                    coupled_participation.save()
+                elif coupled_participation.state != participation.state:
+                    coupled_participation.state = participation.state
+                    changed.append(coupled_participation)
+    bulk_update_participations(changed, ["state"])
+
+
 @receiver(post_save, dispatch_uid="ephios_coupled_signup_fill_new_shift")
 def fill_new_shift(sender, instance, **kwargs):
     if not issubclass(sender, Shift) or instance.signup_flow_slug != CoupledSignupFlow.slug:
@@ -1,10 +1,18 @@
 import uuid
+from collections import defaultdict
+from functools import reduce
+from operator import or_
 
 from django.core.exceptions import ObjectDoesNotExist
+from django.db import connection
+from django.db.models import Q, prefetch_related_objects
 from rest_framework import serializers
 
+from ephios.api.caching import invalidate_cached_responses
 from ephios.core.models import Qualification
 from ephios.extra.graphs import DirectedGraph
+from ephios.modellogging.log import bulk_update_log, record_m2m_changes
+from ephios.modellogging.recorders import InstanceActionType
 from ephios.plugins.complexsignup.models import (
     BlockComposition,
     BlockQualificationRequirement,
@@ -13,6 +21,8 @@ from ephios.plugins.complexsignup.models import (
     Position,
 )
 
+BLOCK_FIELDS = ["uuid", "name", "block_type", "allow_more"]
+
 
 class NestedSlugRelatedField(serializers.SlugRelatedField):
     """
@@ -36,60 +46,115 @@ class NestedSlugRelatedField(serializers.SlugRelatedField):
         return super().to_internal_value(data)
 
 
-class BulkUpdateListSerializer(serializers.ListSerializer):
-    identification_field = "id"
+def _pk(obj):
+    return getattr(obj, "pk", obj)
 
-    def update(self, instance, validated_data):
-        # Maps for id->instance and id->data item.
-        object_mapping = {getattr(object, self.identification_field): object for object in instance}
-        create_ids = iter(range(-1, -len(validated_data) - 1, -1))
-        data_mapping = {
-            item[self.identification_field] or next(create_ids): item for item in validated_data
-        }
-
-        # Perform creations and updates.
-        ret = []
-        for object_id, data in data_mapping.items():
-            obj = object_mapping.get(object_id, None)
-            if obj is None:
-                obj = self.child.create(data.copy())
-            else:
-                obj = self.child.update(obj, data.copy())
-            object_mapping[object_id] = obj  # update mapping for use in deletion later
-            ret.append(obj)
-
-        for obj in ret:
-            if hasattr(obj, "save_m2m"):
-                # you can defer validating/saving relationships on the serializer
-                # by putting into this optional method
-                obj.save_m2m()
-
-        # Perform deletions.
-        for object_id, obj in object_mapping.items():
-            if self.should_delete(object_id, data_mapping):
-                obj.delete()
-        return ret
-
-    def should_delete(self, object_id, data_mapping):
-        raise NotImplementedError()
-
-
-class DeleteFlagBulkUpdateListSerializer(BulkUpdateListSerializer):
-    def should_delete(self, object_id, data_mapping):
-        return object_id in data_mapping and data_mapping[object_id].get("deleted", False)
-
-
-class DeleteAbsentBulkUpdateListSerializer(BulkUpdateListSerializer):
-    def should_delete(self, object_id, data_mapping):
-        return object_id not in data_mapping
-
-
-class DeletedFlagModelSerializer(serializers.ModelSerializer):
-    deleted = serializers.BooleanField(default=False, write_only=True)
 
-    def create(self, validated_data):
-        validated_data.pop("deleted")
-        return super().create(validated_data)
+def _get_through_fields(model, m2m_field_name):
+    """
+    Return the through model of an m2m field and the attnames of its fields
+    referencing the source and the target model.
+    """
+    field = model._meta.get_field(m2m_field_name)  # pylint: disable=protected-access
+    through = field.remote_field.through
+    through_opts = through._meta  # pylint: disable=protected-access
+    return (
+        through,
+        through_opts.get_field(field.m2m_field_name()).attname,
+        through_opts.get_field(field.m2m_reverse_field_name()).attname,
+    )
+
+
+class _BulkWriter:
+    """
+    Collects created and changed instances of a logged model and their m2m relations
+    to write them with bulk queries. As bulk queries don't send the signals used for logging,
+    the instances are logged explicitly afterwards with ``log``.
+    Instances are only created in bulk if the database returns the primary keys of inserted rows,
+    because they are needed to relate other objects to them. Otherwise, they are saved one by one.
+    """
+
+    def __init__(self, model, m2m_field_name=None):
+        self.model = model
+        self.m2m_field_name = m2m_field_name
+        self.created = []
+        self.changed = []
+        self.changed_fields = set()
+        self.m2m = []
+        self.m2m_changed = []
+
+    @property
+    def create_in_bulk(self):
+        return connection.features.can_return_rows_from_bulk_insert
+
+    def save(self, instance, attrs, related=None):
+        """Set ``attrs`` on the instance and ``related`` as the objects of the m2m field."""
+        created = instance.pk is None
+        opts = self.model._meta  # pylint: disable=protected-access
+        changed_fields = [
+            name
+            for name, value in attrs.items()
+            if getattr(instance, opts.get_field(name).attname) != _pk(value)
+        ]
+        for name, value in attrs.items():
+            setattr(instance, name, value)
+        if created:
+            self.created.append(instance)
+        elif changed_fields:
+            self.changed.append(instance)
+            self.changed_fields.update(changed_fields)
+        if related is not None:
+            self.m2m.append((instance, {_pk(obj): obj for obj in related}, created))
+        return instance
+
+    def write(self):
+        if self.create_in_bulk:
+            self.model.objects.bulk_create(self.created)
+        else:
+            for instance in self.created:
+                instance.save()
+        if self.changed:
+            self.model.objects.bulk_update(self.changed, sorted(self.changed_fields))
+        if self.m2m_field_name:
+            self._write_m2m()
+
+    def _write_m2m(self):
+        through, source, target = _get_through_fields(self.model, self.m2m_field_name)
+        rows, removed, changes = [], [], []
+        for instance, related, created in self.m2m:
+            manager = getattr(instance, self.m2m_field_name)
+            if created and not self.create_in_bulk:
+                manager.set(related.keys())  # logged by the m2m_changed signal
+                continue
+            current = {} if created else {obj.pk: obj for obj in manager.all()}
+            added_pks = related.keys() - current.keys()
+            removed_pks = current.keys() - related.keys()
+            rows += [through(**{source: instance.pk, target: pk}) for pk in added_pks]
+            if removed_pks:
+                removed.append(Q(**{source: instance.pk, f"{target}__in": removed_pks}))
+            if not created and (added_pks or removed_pks):
+                changes.append((
+                    instance,
+                    [related[pk] for pk in added_pks],
+                    [current[pk] for pk in removed_pks],
+                ))
+        through.objects.bulk_create(rows)
+        if removed:
+            through.objects.filter(reduce(or_, removed)).delete()
+        for instance, added, removed in changes:
+            record_m2m_changes(instance, through, added, removed)
+            # drop the outdated prefetched objects
+            instance.refresh_from_db(fields=[self.m2m_field_name])
+            self.m2m_changed.append(instance)
+
+    def log(self):
+        created = self.created if self.create_in_bulk else []
+        m2m_fields = self.model._meta.many_to_many  # pylint: disable=protected-access
+        prefetch_related_objects(created + self.m2m_changed, *(field.name for field in m2m_fields))
+        bulk_update_log(created, InstanceActionType.CREATE)
+        bulk_update_log(
+            list(dict.fromkeys(self.changed + self.m2m_changed)), InstanceActionType.CHANGE
+        )
 
 
 class NestedQualificationsObjectSerializer(serializers.ModelSerializer):
@@ -100,10 +165,6 @@ class NestedQualificationsObjectSerializer(serializers.ModelSerializer):
         many=True,
     )
 
-    def create(self, validated_data):
-        validated_data["block"] = self.context["block"]
-        return super().create(validated_data)
-
 
 class PositionSerializer(NestedQualificationsObjectSerializer):
     class Meta:
@@ -114,7 +175,6 @@ class PositionSerializer(NestedQualificationsObjectSerializer):
             "optional",
             "qualifications",
         ]
-        list_serializer_class = DeleteAbsentBulkUpdateListSerializer
 
 
 class BlockQualificationRequirementSerializer(NestedQualificationsObjectSerializer):
@@ -126,7 +186,6 @@ class BlockQualificationRequirementSerializer(NestedQualificationsObjectSerializ
             "everyone",
             "at_least",
         ]
-        list_serializer_class = DeleteAbsentBulkUpdateListSerializer
 
 
 class BlockCompositionSerializer(serializers.ModelSerializer):
@@ -143,15 +202,125 @@ class BlockCompositionSerializer(serializers.ModelSerializer):
             "optional",
             "sub_block",
         ]
-        list_serializer_class = DeleteAbsentBulkUpdateListSerializer
 
-    def create(self, validated_data):
-        validated_data["composite_block"] = self.context["block"]
-        return super().create(validated_data)
 
+class BuildingBlockListSerializer(serializers.ListSerializer):
+    """
+    Saves the whole tree of building blocks submitted in the block editor. The submitted data is
+    diffed against the stored blocks and written with bulk queries. Blocks are identified by
+    their uuid and deleted if flagged as deleted. Positions, qualification requirements and
+    sub compositions are identified by their id and deleted if they are absent.
+    """
+
+    def create(self, validated_data):
+        return self.update(BuildingBlock.objects.none(), validated_data)
 
-class BuildingBlockListSerializer(DeleteFlagBulkUpdateListSerializer):
-    identification_field = "uuid"
+    def update(self, instance, validated_data):
+        blocks, blocks_by_uuid, saved, deleted_blocks = self._save_blocks(instance, validated_data)
+        children, absent_pks = self._save_block_children(saved, blocks_by_uuid)
+        for model, pks in absent_pks.items():
+            model.objects.filter(pk__in=pks).delete()
+        BuildingBlock.objects.filter(pk__in=[block.pk for block in deleted_blocks]).delete()
+
+        for writer in (*children, blocks):
+            writer.log()
+        # signup stats of shifts with a complex structure are derived from the block tree
+        invalidate_cached_responses()
+        return [block for block, __, __ in saved]
+
+    def _save_blocks(self, instance, validated_data):
+        """
+        Write created and changed blocks. Return their writer, all blocks by uuid,
+        tuples of saved blocks, their data and whether they were created, and the blocks to delete.
+        """
+        existing_blocks = list(instance)
+        prefetch_related_objects(
+            existing_blocks,
+            "positions__qualifications",
+            "qualification_requirements__qualifications",
+            "sub_compositions__sub_block",
+        )
+        blocks_by_uuid = {str(block.uuid): block for block in existing_blocks}
+
+        blocks = _BulkWriter(BuildingBlock)
+        deleted_blocks = []
+        saved = []
+        for data in validated_data:
+            block = blocks_by_uuid.get(str(data["uuid"]))
+            if data.get("deleted", False):
+                if block is not None:
+                    deleted_blocks.append(block)
+                continue
+            if block is None:
+                block = blocks_by_uuid[str(data["uuid"])] = BuildingBlock()
+            saved.append((block, data, block.pk is None))
+            blocks.save(block, {name: data[name] for name in BLOCK_FIELDS if name in data})
+        blocks.write()
+        return blocks, blocks_by_uuid, saved, deleted_blocks
+
+    def _save_block_children(self, saved, blocks_by_uuid):
+        """
+        Write the positions, qualification requirements and sub compositions of the saved blocks.
+        Return their writers and the primary keys of absent children to delete by model.
+        """
+        positions = _BulkWriter(Position, "qualifications")
+        requirements = _BulkWriter(BlockQualificationRequirement, "qualifications")
+        compositions = _BulkWriter(BlockComposition)
+        absent_pks = defaultdict(list)
+        for block, data, created in saved:
+            self._save_children(
+                positions,
+                [] if created else block.positions.all(),
+                data.get("positions", []),
+                {"block": block},
+                absent_pks,
+            )
+            self._save_children(
+                requirements,
+                [] if created else block.qualification_requirements.all(),
+                data.get("qualification_requirements", []),
+                {"block": block},
+                absent_pks,
+            )
+            for composition in data.get("sub_compositions", []):
+                sub_block = composition["sub_block"]
+                try:
+                    composition["sub_block"] = blocks_by_uuid[
+                        str(getattr(sub_block, "uuid", sub_block))
+                    ]
+                except KeyError as e:
+                    raise serializers.ValidationError(
+                        f"Sub block {sub_block} does not exist.", code="invalid"
+                    ) from e
+            self._save_children(
+                compositions,
+                [] if created else block.sub_compositions.all(),
+                data.get("sub_compositions", []),
+                {"composite_block": block},
+                absent_pks,
+            )
+        writers = (positions, requirements, compositions)
+        for writer in writers:
+            writer.write()
+        return writers, absent_pks
+
+    def _save_children(self, writer, existing, items, attrs, absent_pks):
+        children_by_pk = {child.pk: child for child in existing}
+        for item in items:
+            child = children_by_pk.pop(item["id"], None) or writer.model()
+            writer.save(
+                child,
+                {
+                    **{
+                        name: value
+                        for name, value in item.items()
+                        if name not in ("id", "qualifications")
+                    },
+                    **attrs,
+                },
+                related=item.get("qualifications"),
+            )
+        absent_pks[writer.model] += children_by_pk.keys()
 
     def validate(self, attrs):
         # validate that there are no circles
@@ -168,63 +337,15 @@ class BuildingBlockListSerializer(DeleteFlagBulkUpdateListSerializer):
         return attrs
 
 
-class BuildingBlockSerializer(DeletedFlagModelSerializer):
+class BuildingBlockSerializer(serializers.ModelSerializer):
     id = serializers.IntegerField(required=False, read_only=True)
+    deleted = serializers.BooleanField(default=False, write_only=True)
     uuid = serializers.UUIDField(required=False, default=uuid.uuid4)
     positions = PositionSerializer(many=True, required=False)
     qualification_requirements = BlockQualificationRequirementSerializer(many=True, required=False)
     sub_compositions = BlockCompositionSerializer(many=True, required=False)
     name = serializers.CharField(required=True, allow_blank=True)
 
-    def create_update_with_context(self, validated_data, instance_getter):
-        positions_data = validated_data.pop("positions")
-        qualification_requirements_data = validated_data.pop("qualification_requirements")
-        sub_compositions_data = validated_data.pop("sub_compositions")
-
-        instance = instance_getter()
-        positions = PositionSerializer(
-            instance=instance.positions.all(),
-            data=positions_data,
-            many=True,
-            context={"block": instance},
-        )
-        positions.is_valid(raise_exception=True)
-        positions.save()
-        qualification_requirements = BlockQualificationRequirementSerializer(
-            instance=instance.qualification_requirements.all(),
-            data=qualification_requirements_data,
-            many=True,
-            context={"block": instance},
-        )
-        qualification_requirements.is_valid(raise_exception=True)
-        qualification_requirements.save()
-
-        sub_compositions = BlockCompositionSerializer(
-            instance=instance.sub_compositions.all(),
-            data=sub_compositions_data,
-            many=True,
-            context={"block": instance},
-        )
-
-        def save_m2m():
-            # because we would error if the sub_block doesn't exist in the database yet
-            # we defer saving the sub compositions to after the whole list was saved
-            sub_compositions.is_valid(raise_exception=True)
-            sub_compositions.save()
-
-        instance.save_m2m = save_m2m
-        return instance
-
-    def create(self, validated_data):
-        create = super().create
-        return self.create_update_with_context(validated_data, lambda: create(validated_data))
-
-    def update(self, instance, validated_data):
-        update = super().update
-        return self.create_update_with_context(
-            validated_data, lambda: update(instance, validated_data)
-        )
-
     def validate(self, attrs):
         if attrs.get("block_type") == BuildingBlockType.COMPOSITE.value and attrs.get("positions"):
             raise serializers.ValidationError(
@@ -94,7 +94,7 @@ class ComplexDispositionParticipationForm(BaseDispositionParticipationForm):
 
     def save(self, commit=True):
         self.instance.structure_data["dispatched_unit_path"] = self.cleaned_data["unit_path"]
-        super().save(commit)
+        return super().save(commit)
 
 
 class StartingBlockForm(forms.Form):
@@ -309,6 +309,14 @@ class ComplexShiftStructure(
             )
         ]
 
+    def get_capacity_checkers(self):
+        # whether there is a free place depends on the matching, so we need to match again
+        if self.shift.signup_flow.uses_requested_state:
+            return super().get_capacity_checkers()
+        return super().get_capacity_checkers() + [
+            partial(self.check_qualifications, strict_mode=True)
+        ]
+
     def get_list_export_data(self):
         self._assume_cache()
         export_data = []
@@ -1,8 +1,10 @@
 from django.dispatch import receiver
 
-from ephios.core.signals import event_forms, participation_finished
+from ephios.core.signals import event_copy, event_forms, participation_finished
+from ephios.extra.database import bulk_create_with_pks, copy_instance
 from ephios.plugins.eventautoqualification.consequences import create_qualification_consequence
 from ephios.plugins.eventautoqualification.forms import EventAutoQualificationForm
+from ephios.plugins.eventautoqualification.models import EventAutoQualificationConfiguration
 
 
 @receiver(
@@ -19,6 +21,18 @@ def configuration_form(sender, event, request, **kwargs):
     ]
 
 
+@receiver(event_copy, dispatch_uid="ephios.plugins.eventautoqualification.signals.event_copy")
+def copy_configuration(sender, event, copies, **kwargs):
+    try:
+        config = event.auto_qualification_config
+    except EventAutoQualificationConfiguration.DoesNotExist:
+        return
+    bulk_create_with_pks(
+        EventAutoQualificationConfiguration,
+        [copy_instance(config, event=new_event) for new_event in copies],
+    )
+
+
 participation_finished.connect(
     create_qualification_consequence,
     dispatch_uid="ephios.plugins.eventautoqualification.signals.create_qualification_consequence",
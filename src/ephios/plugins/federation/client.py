@@ -0,0 +1,124 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from urllib.parse import urljoin
+
+import requests
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from requests import HTTPError, RequestException
+
+SHARED_EVENTS_CACHE_KEY = "ephios.plugins.federation.client.shared_events.{host}"
+SHARED_EVENTS_REVALIDATE_LOCK_KEY = "ephios.plugins.federation.client.revalidate.{host}"
+# cached events are shown for this long if a host can not be reached
+SHARED_EVENTS_CACHE_TIMEOUT = 60 * 60
+# cached events older than this are shown while they are refreshed in the background
+SHARED_EVENTS_MAX_AGE = timedelta(minutes=5)
+SHARED_EVENTS_PAST_DAYS = 14
+REQUEST_TIMEOUT = 5
+MAX_CONCURRENT_REQUESTS = 8
+
+_executor = ThreadPoolExecutor(
+    max_workers=MAX_CONCURRENT_REQUESTS, thread_name_prefix="ephios-federation"
+)
+_local = threading.local()
+
+
+def get_session():
+    """Return a session of the current thread, which keeps connections to hosts alive."""
+    if (session := getattr(_local, "session", None)) is None:
+        session = _local.session = requests.Session()
+    return session
+
+
+def _shared_events_request(host):
+    """Return the arguments to fetch the shared events of a host without accessing the database."""
+    return (
+        urljoin(host.url, reverse("federation:shared_event_list_view")),
+        host.access_token,
+    )
+
+
+def _fetch_shared_events(url, access_token):
+    response = get_session().get(
+        url,
+        headers={"Authorization": f"Bearer {access_token}"},
+        params={
+            "end_time_after": (timezone.now() - timedelta(days=SHARED_EVENTS_PAST_DAYS)).isoformat()
+        },
+        timeout=REQUEST_TIMEOUT,
+    )
+    response.raise_for_status()
+    return response.json()["results"]
+
+
+def _cache_entry(events):
+    return {"fetched_at": timezone.now(), "events": events}
+
+
+def fetch_shared_events(hosts):
+    """
+    Fetch the events shared by the given hosts concurrently and update the cache.
+    Hosts that do not accept our token anymore are deleted, as the share needs to be set up again.
+    Returns a dict mapping hosts to their events, leaving out hosts that could not be reached.
+    """
+    futures = {
+        host: _executor.submit(_fetch_shared_events, *_shared_events_request(host))
+        for host in hosts
+    }
+    shared_events = {}
+    for host, future in futures.items():
+        try:
+            shared_events[host] = future.result()
+        except HTTPError as exc:
+            if exc.response.status_code == 403:
+                host.oauth_application.delete()
+                host.delete()
+        except (RequestException, ValueError, KeyError):
+            continue
+    cache.set_many(
+        {
+            SHARED_EVENTS_CACHE_KEY.format(host=host.pk): _cache_entry(events)
+            for host, events in shared_events.items()
+        },
+        SHARED_EVENTS_CACHE_TIMEOUT,
+    )
+    return shared_events
+
+
+def _revalidate_shared_events(host_pk, url, access_token):
+    try:
+        events = _fetch_shared_events(url, access_token)
+    except (RequestException, ValueError, KeyError):
+        # keep serving the cached events, errors are handled by the next periodic refresh
+        return
+    finally:
+        cache.delete(SHARED_EVENTS_REVALIDATE_LOCK_KEY.format(host=host_pk))
+    cache.set(
+        SHARED_EVENTS_CACHE_KEY.format(host=host_pk),
+        _cache_entry(events),
+        SHARED_EVENTS_CACHE_TIMEOUT,
+    )
+
+
+def get_shared_events(hosts):
+    """
+    Return a dict mapping hosts to the events they share with us.
+    Events are served from the cache. Hosts without cached events are fetched concurrently
+    and cached events older than ``SHARED_EVENTS_MAX_AGE`` are refreshed in the background.
+    """
+    hosts = list(hosts)
+    cached = cache.get_many([SHARED_EVENTS_CACHE_KEY.format(host=host.pk) for host in hosts])
+    shared_events, missing = {}, []
+    for host in hosts:
+        if (entry := cached.get(SHARED_EVENTS_CACHE_KEY.format(host=host.pk))) is None:
+            missing.append(host)
+            continue
+        shared_events[host] = entry["events"]
+        if entry["fetched_at"] < timezone.now() - SHARED_EVENTS_MAX_AGE and cache.add(
+            SHARED_EVENTS_REVALIDATE_LOCK_KEY.format(host=host.pk), True, REQUEST_TIMEOUT * 2
+        ):
+            _executor.submit(_revalidate_shared_events, host.pk, *_shared_events_request(host))
+    shared_events.update(fetch_shared_events(missing))
+    return shared_events
@@ -76,3 +76,10 @@ def delete_expired_invites(sender, **kwargs):
     for invite in InviteCode.objects.all():
         if invite.is_expired:
             invite.delete()
+
+
+@receiver(periodic_signal, dispatch_uid="ephios.plugins.federation.signals.refresh_shared_events")
+def refresh_shared_events(sender, **kwargs):
+    from ephios.plugins.federation.client import fetch_shared_events
+
+    fetch_shared_events(FederatedHost.objects.all())
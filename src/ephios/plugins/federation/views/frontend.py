@@ -1,4 +1,4 @@
-from datetime import datetime, timedelta
+from datetime import datetime
 from urllib.parse import urljoin
 
 import requests
@@ -8,7 +8,6 @@ from django.db import transaction
 from django.db.models import Prefetch
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse, reverse_lazy
-from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.views.generic import CreateView, DeleteView, DetailView, FormView, TemplateView
 from dynamic_preferences.registries import global_preferences_registry
@@ -21,6 +20,7 @@ from ephios.core.models import AbstractParticipation, Event
 from ephios.core.views.signup import BaseShiftActionView
 from ephios.extra.auth import access_exempt
 from ephios.extra.mixins import StaffRequiredMixin
+from ephios.plugins.federation.client import get_shared_events
 from ephios.plugins.federation.forms import InviteCodeForm, RedeemInviteCodeForm
 from ephios.plugins.federation.models import (
     FederatedEventShare,
@@ -42,29 +42,17 @@ class ExternalEventListView(LoginRequiredMixin, TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         events = []
-        for host in FederatedHost.objects.all():
-            try:
-                r = requests.get(
-                    urljoin(host.url, reverse("federation:shared_event_list_view")),
-                    headers={"Authorization": f"Bearer {host.access_token}"},
-                    params={"end_time_after": (timezone.now() - timedelta(days=14)).isoformat()},
-                    timeout=5,
-                )
-                r.raise_for_status()
-                results = r.json()["results"]
-                for event in results:
-                    event["type"] = event["type"]["title"]
-                    event["start_time"] = datetime.fromisoformat(event["start_time"])
-                    event["end_time"] = datetime.fromisoformat(event["end_time"])
-                    event["host"] = host.name
-                events += results
-            except HTTPError as exc:
-                if exc.response.status_code == 403:
-                    # the host does not accept our token anymore, so the share needs to be set up again
-                    host.oauth_application.delete()
-                    host.delete()
-            except (JSONDecodeError, ReadTimeout):
-                continue
+        for host, shared_events in get_shared_events(FederatedHost.objects.all()).items():
+            events += [
+                {
+                    **event,
+                    "type": event["type"]["title"],
+                    "start_time": datetime.fromisoformat(event["start_time"]),
+                    "end_time": datetime.fromisoformat(event["end_time"]),
+                    "host": host.name,
+                }
+                for event in shared_events
+            ]
         events.sort(key=lambda e: e["start_time"])
         context["events"] = events
         return context
@@ -6,6 +6,7 @@ from django.utils.translation import gettext_lazy as _
 from django_select2.forms import Select2MultipleWidget
 
 from ephios.core.forms.events import BasePluginFormMixin
+from ephios.core.services.files import untrack_stored_file
 from ephios.plugins.files.models import Document
 
 
@@ -34,6 +35,7 @@ class DocumentForm(ModelForm):
         result = super().save(commit)
         # deleting the old file before commiting the new one results in no file being stored
         if "file" in self.changed_data and "file" in self.initial:
+            untrack_stored_file(self.initial["file"].name)
             self.initial["file"].delete(save=False)
         return result
 
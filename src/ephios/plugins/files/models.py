@@ -5,6 +5,7 @@ from django.dispatch import receiver
 from django.utils.translation import gettext_lazy as _
 
 from ephios.core.models import Event, UserProfile
+from ephios.core.services.files import track_stored_file, untrack_stored_file
 from ephios.modellogging.log import ModelFieldsLogConfig, register_model_for_logging
 
 
@@ -27,9 +28,16 @@ class Document(models.Model):
         verbose_name_plural = _("Documents")
 
 
+@receiver(models.signals.post_save, sender=Document)
+def track_document_file(sender, instance, **kwargs):
+    if instance.file:
+        track_stored_file(instance.file)
+
+
 @receiver(models.signals.post_delete, sender=Document)
 def delete_stale_file(sender, instance, using, **kwargs):
     def run_on_commit():
+        untrack_stored_file(instance.file.name)
         instance.file.delete(save=False)
 
     on_commit(run_on_commit, using)
@@ -15,7 +15,7 @@ class DocumentView(LoginRequiredMixin, DetailView):
     model = Document
 
     def get(self, request, *args, **kwargs):
-        return redirect_to_file_download(self.get_object().file)
+        return redirect_to_file_download(request, self.get_object().file)
 
 
 class DocumentListView(CustomPermissionRequiredMixin, ListView):
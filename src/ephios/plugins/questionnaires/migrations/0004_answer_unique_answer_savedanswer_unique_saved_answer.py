@@ -0,0 +1,42 @@
+from django.db import migrations, models
+
+
+def delete_duplicate_answers(apps, schema_editor):
+    """
+    Keep only the latest answer of a participation to a question and the latest saved answer
+    of a user to a question, so that unique constraints can be added.
+    """
+    for model_name, owner in [("Answer", "participation"), ("SavedAnswer", "user")]:
+        model = apps.get_model("questionnaires", model_name)
+        duplicates = (
+            model.objects
+            .values(owner, "question")
+            .annotate(count=models.Count("id"), latest=models.Max("id"))
+            .filter(count__gt=1)
+        )
+        for duplicate in duplicates:
+            model.objects.filter(
+                **{owner: duplicate[owner]}, question=duplicate["question"]
+            ).exclude(id=duplicate["latest"]).delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("questionnaires", "0003_alter_question_use_saved_answers"),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicate_answers, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="answer",
+            constraint=models.UniqueConstraint(
+                fields=("participation", "question"), name="unique_answer"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="savedanswer",
+            constraint=models.UniqueConstraint(
+                fields=("user", "question"), name="unique_saved_answer"
+            ),
+        ),
+    ]
@@ -241,6 +241,9 @@ class Answer(models.Model):
     class Meta:
         verbose_name = _("Answer")
         verbose_name_plural = _("Answers")
+        constraints = [
+            models.UniqueConstraint(fields=["participation", "question"], name="unique_answer")
+        ]
 
     def __str__(self):
         return f'{self.question}: "{self.answer}" ({self.participation})'
@@ -259,6 +262,9 @@ class SavedAnswer(models.Model):
     class Meta:
         verbose_name = _("Saved answer")
         verbose_name_plural = _("Saved answers")
+        constraints = [
+            models.UniqueConstraint(fields=["user", "question"], name="unique_saved_answer")
+        ]
 
     def __str__(self):
         return f'{self.question}: "{self.answer}" ({self.user})'
@@ -1,4 +1,5 @@
 from django import forms
+from django.db import connection
 from django.dispatch import receiver
 from django.template.loader import render_to_string
 from django.urls import reverse_lazy
@@ -8,6 +9,7 @@ from rest_framework import serializers
 from ephios.core.models.events import AbstractParticipation, Shift
 from ephios.core.signals import (
     HTML_DISPOSITION_PARTICIPATION,
+    event_copy,
     insert_html,
     nav_link,
     register_group_permission_fields,
@@ -21,7 +23,10 @@ from ephios.core.signals import (
 from ephios.core.signup.forms import SignupForm
 from ephios.core.signup.participants import AbstractParticipant, LocalUserParticipant
 from ephios.core.views.settings import SETTINGS_PERSONAL_SECTION_KEY
+from ephios.extra.database import bulk_create_with_pks
 from ephios.extra.permissions import PermissionField
+from ephios.modellogging.log import bulk_update_log
+from ephios.modellogging.recorders import InstanceActionType
 from ephios.plugins.questionnaires.forms import QuestionnaireForm
 from ephios.plugins.questionnaires.models import Answer, Question, Questionnaire, SavedAnswer
 
@@ -79,14 +84,36 @@ def group_permission_fields(sender, **kwargs):
     ]
 
 
+def copy_questionnaires(shift_copies: dict[Shift, list[Shift]]):
+    copies_by_shift_id = {shift.pk: copies for shift, copies in shift_copies.items()}
+    questionnaires = Questionnaire.objects.filter(shift__in=shift_copies).prefetch_related(
+        "questions"
+    )
+    copied_questionnaires = []
+    copied_questions = []
+    for questionnaire in questionnaires:
+        questions = list(questionnaire.questions.all())
+        for copy in copies_by_shift_id[questionnaire.shift_id]:
+            copied_questionnaire = Questionnaire(shift=copy)
+            copied_questionnaires.append(copied_questionnaire)
+            copied_questions.append((copied_questionnaire, questions))
+    # logging the copies would take a query per copy for their questions
+    bulk_create_with_pks(Questionnaire, copied_questionnaires, log=False)
+    Questionnaire.questions.through.objects.bulk_create(
+        Questionnaire.questions.through(questionnaire=questionnaire, question=question)
+        for questionnaire, questions in copied_questions
+        for question in questions
+    )
+
+
 @receiver(shift_copy, dispatch_uid="ephios.plugins.questionnaires.signals.shift_copy")
 def copy_shift_questionnaire(sender, shift: Shift, copies: list[Shift], **kwargs):
-    if hasattr(shift, "questionnaire") and shift.questionnaire:
-        questions = shift.questionnaire.questions.all()
+    copy_questionnaires({shift: copies})
+
 
-        for copy in copies:
-            questionnaire = Questionnaire.objects.create(shift=copy)
-            questionnaire.questions.set(questions)
+@receiver(event_copy, dispatch_uid="ephios.plugins.questionnaires.signals.event_copy")
+def copy_event_questionnaires(sender, shift_copies: dict[Shift, list[Shift]], **kwargs):
+    copy_questionnaires(shift_copies)
 
 
 @receiver(shift_forms, dispatch_uid="ephios.plugins.questionnaires.signals.shift_forms")
@@ -152,33 +179,94 @@ def save_signup(
         else False
     )
 
-    for name, value in cleaned_data.items():
-        if name == "questionnaires_save_answers" or not name.startswith("questionnaires_"):
-            continue
-        question = Question.objects.get(pk=Question.get_pk_from_slug(name))
+    values = {
+        Question.get_pk_from_slug(name): value
+        for name, value in cleaned_data.items()
+        if name != "questionnaires_save_answers" and name.startswith("questionnaires_")
+    }
+    if not values:
+        return
+    questions = Question.objects.in_bulk(values.keys())
+    created_answers, changed_answers, deleted_answers = _diff_answers(
+        participation, questions, values
+    )
+    _upsert(Answer, created_answers + changed_answers, ["participation", "question"])
+    if created_answers and created_answers[0].pk is None:
+        # not all databases return primary keys of upserted rows, but we need them for logging
+        _fetch_answer_pks(participation, created_answers)
+    bulk_update_log(created_answers, InstanceActionType.CREATE)
+    bulk_update_log(changed_answers, InstanceActionType.CHANGE)
+    if deleted_answers:
+        Answer.objects.filter(pk__in=deleted_answers).delete()
+
+    if save_answers:
+        _save_saved_answers(participant.user, questions, values)
+
 
-        if value:
-            Answer.objects.update_or_create(
-                participation=participation,
-                question=question,
-                defaults={"answer": value},
+def _diff_answers(participation, questions, values):
+    """
+    Compare the answer values by question pk with the existing answers of the participation.
+    Return the answers to create, the changed answers and the pks of answers to delete.
+    """
+    existing_answers = {
+        answer.question_id: answer
+        for answer in participation.answer_set.filter(question__in=questions)
+    }
+    created_answers, changed_answers, deleted_answers = [], [], []
+    for question in questions.values():
+        value = values[question.pk]
+        answer = existing_answers.get(question.pk)
+        if not value:
+            if answer is not None:
+                deleted_answers.append(answer.pk)
+        elif answer is None:
+            created_answers.append(
+                Answer(participation=participation, question=question, answer=value)
             )
+        elif answer.answer != value:
+            answer.question = question
+            answer.answer = value
+            changed_answers.append(answer)
+    return created_answers, changed_answers, deleted_answers
 
-            if save_answers and question.use_saved_answers:
-                SavedAnswer.objects.update_or_create(
-                    user=participant.user,
-                    question_id=Question.get_pk_from_slug(name),
-                    defaults={"answer": value},
-                )
+
+def _fetch_answer_pks(participation, answers):
+    pks = dict(
+        Answer.objects.filter(
+            participation=participation,
+            question__in=[answer.question_id for answer in answers],
+        ).values_list("question_id", "pk")
+    )
+    for answer in answers:
+        answer.pk = pks[answer.question_id]
+
+
+def _save_saved_answers(user, questions, values):
+    saved_answers, deleted_saved_answers = [], []
+    for question in questions.values():
+        if not question.use_saved_answers:
+            continue
+        if value := values[question.pk]:
+            saved_answers.append(SavedAnswer(user=user, question=question, answer=value))
         else:
-            Answer.objects.filter(
-                participation=participation, question_id=Question.get_pk_from_slug(name)
-            ).delete()
-
-            if save_answers and question.use_saved_answers:
-                SavedAnswer.objects.filter(
-                    user=participant.user, question_id=Question.get_pk_from_slug(name)
-                ).delete()
+            deleted_saved_answers.append(question.pk)
+    _upsert(SavedAnswer, saved_answers, ["user", "question"])
+    if deleted_saved_answers:
+        SavedAnswer.objects.filter(user=user, question__in=deleted_saved_answers).delete()
+
+
+def _upsert(model, instances, unique_fields):
+    if not instances:
+        return
+    model.objects.bulk_create(
+        instances,
+        update_conflicts=True,
+        # MySQL upserts on any unique constraint and does not support specifying it
+        unique_fields=(
+            unique_fields if connection.features.supports_update_conflicts_with_target else None
+        ),
+        update_fields=["answer"],
+    )
 
 
 @receiver(
@@ -5,11 +5,13 @@ from django.utils.translation import gettext_lazy as _
 
 from ephios.core.signals import (
     HTML_SHIFT_INFO,
+    event_copy,
     insert_html,
     nav_link,
     register_group_permission_fields,
     shift_forms,
 )
+from ephios.extra.database import bulk_create_with_pks
 from ephios.extra.permissions import PermissionField
 from ephios.plugins.simpleresource.forms import ResourceAllocationForm
 from ephios.plugins.simpleresource.models import ResourceAllocation
@@ -32,6 +34,28 @@ def display_shift_resources(shift, request, **kwargs):
     return ""
 
 
+@receiver(event_copy, dispatch_uid="ephios.plugins.simpleresource.signals.event_copy")
+def copy_resource_allocations(sender, shift_copies, **kwargs):
+    copies_by_shift_id = {shift.pk: copies for shift, copies in shift_copies.items()}
+    allocations = ResourceAllocation.objects.filter(shift__in=shift_copies).prefetch_related(
+        "resources"
+    )
+    copied_allocations = []
+    for allocation in allocations:
+        resources = list(allocation.resources.all())
+        for copy in copies_by_shift_id[allocation.shift_id]:
+            copied_allocations.append((ResourceAllocation(shift=copy), resources))
+    # logging the copies would take a query per copy for their resources
+    bulk_create_with_pks(
+        ResourceAllocation, (allocation for allocation, _ in copied_allocations), log=False
+    )
+    ResourceAllocation.resources.through.objects.bulk_create(
+        ResourceAllocation.resources.through(resourceallocation=allocation, resource=resource)
+        for allocation, resources in copied_allocations
+        for resource in resources
+    )
+
+
 @receiver(nav_link, dispatch_uid="ephios.plugins.simpleresource.signals.nav_link")
 def add_nav_link(sender, request, **kwargs):
     return (
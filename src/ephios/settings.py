@@ -89,7 +89,6 @@ INSTALLED_APPS = [
     "django_select2",
     "djangoformsetjs",
     "compressor",
-    "recurrence",
     "statici18n",
     "dynamic_preferences.users.apps.UserPreferencesConfig",
     "crispy_forms",
@@ -129,6 +128,7 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "ephios.extra.middleware.EphiosInstrumentationMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.locale.LocaleMiddleware",
     "ephios.extra.middleware.EphiosLocaleMiddleware",
@@ -181,6 +181,11 @@ CACHES = {
         **env.cache_url(default="locmemcache://"),
     }
 }
+# Object permissions and API responses are only cached if all processes share the cache,
+# as invalidations would not reach the process-local caches of other processes.
+SHARED_CACHE = env.bool(
+    "SHARED_CACHE", default=not CACHES["default"]["BACKEND"].endswith(".LocMemCache")
+)
 SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
 DJANGO_REDIS_IGNORE_EXCEPTIONS = True
 DJANGO_REDIS_LOG_IGNORED_EXCEPTIONS = True
@@ -306,10 +311,28 @@ LOGGING = {
     "root": {"handlers": ["mail_admins", "console", "file"], "level": "INFO"},
 }
 
+# Request instrumentation
+# requests taking longer than this many seconds are logged and reported by the health check
+SLOW_REQUEST_THRESHOLD = env.float("SLOW_REQUEST_THRESHOLD", default=2.0)
+# timing templates and signals patches django process-wide, so it is opt-in
+INSTRUMENT_TEMPLATES_AND_SIGNALS = env.bool("INSTRUMENT_TEMPLATES_AND_SIGNALS", default=DEBUG)
+# maximum number of database queries per url name, see ephios.extra.middleware
+# budgets must not depend on the amount of data shown, so they catch N+1 queries
+QUERY_BUDGETS = {
+    "api:event-detail": 25,
+    "api:participations-list": 30,
+    "api:participations-me-list": 30,
+    "api:userprofile-list": 20,
+    "core:user_event_feed": 15,
+}
+QUERY_BUDGETS_RAISE = DEBUG
+
 
 def GET_USERCONTENT_QUOTA():
     """Returns a tuple (used, free) of the user content quota in bytes"""
-    used = sum(p.stat().st_size for p in Path(MEDIA_ROOT).rglob("*"))
+    from ephios.core.services.files import get_usercontent_used
+
+    used = get_usercontent_used()
     quota = env.int("MEDIA_FILES_DISK_QUOTA", default=0)
     disk_free = shutil.disk_usage(MEDIA_ROOT).free
     free = min(disk_free, quota * 1024 * 1024 - used) if quota else disk_free
@@ -388,6 +411,10 @@ if os.path.exists(VAPID_PRIVATE_KEY_PATH):
 # interval for calls to the run_periodic_tasks management command over which the cronjob is considered to be broken
 RUN_PERIODIC_MAX_INTERVAL = 60 * 5 + 30  # 5 minutes + 30 seconds
 
+# Calendar feeds
+# number of past days included in personal calendar feeds, 0 includes all past shifts
+CALENDAR_FEED_PAST_DAYS = env.int("CALENDAR_FEED_PAST_DAYS", default=0)
+
 
 # django-rest-framework
 DEFAULT_LISTVIEW_PAGINATION = 100
@@ -1,6 +1,8 @@
 from django.urls import reverse
 from guardian.shortcuts import remove_perm
 
+from ephios.core.models import Event
+
 
 def test_api_event_list_rejects_anonymous_get(django_app, event):
     response = django_app.get(reverse("api:event-list"), status=403)
@@ -47,3 +49,36 @@ def test_api_event_list_cant_be_posted(csrf_exempt_django_app, manager):
             reverse("api:event-list"), {"title": "New event"}, status=403, user=manager
         ).body
     )
+
+
+def test_api_event_list_etag(django_app, event, planner):
+    response = django_app.get(reverse("api:event-list"), user=planner, status=200)
+    etag = response.headers["ETag"]
+    django_app.get(
+        reverse("api:event-list"), user=planner, headers={"If-None-Match": etag}, status=304
+    )
+
+    shift = event.shifts.first()
+    shift.label = "changed label"
+    shift.save()
+    response = django_app.get(
+        reverse("api:event-list"), user=planner, headers={"If-None-Match": etag}, status=200
+    )
+    assert response.headers["ETag"] != etag
+    assert "changed label" in response
+
+
+def test_api_event_list_cache_respects_permissions(django_app, event, groups, planner, volunteer):
+    assert event.title in django_app.get(reverse("api:event-list"), user=volunteer, status=200)
+    _, _, volunteers = groups
+    remove_perm("view_event", volunteers, event)
+    assert event.title not in django_app.get(reverse("api:event-list"), user=volunteer)
+    assert event.title in django_app.get(reverse("api:event-list"), user=planner)
+
+
+def test_api_event_list_without_shared_cache(django_app, settings, event, planner):
+    settings.SHARED_CACHE = False
+    django_app.get(reverse("api:event-list"), user=planner, status=200)
+    # queryset updates don't send the signals used to invalidate cached responses
+    Event.objects.filter(pk=event.pk).update(title="changed title")
+    assert "changed title" in django_app.get(reverse("api:event-list"), user=planner, status=200)
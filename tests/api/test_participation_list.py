@@ -171,3 +171,105 @@ def test_participations_me(
         status=200,
     )
     assert event.title not in response
+
+
+def test_participation_list_cursor_pagination(django_app, event, volunteer, manager, groups):
+    shift = event.shifts.first()
+    participations = [
+        LocalParticipation.objects.create(
+            user=user, shift=shift, state=AbstractParticipation.States.CONFIRMED
+        )
+        for user in (volunteer, manager)
+    ]
+    response = django_app.get(
+        reverse("api:userinfo-participations-list"),
+        {"pagination": "cursor", "limit": 1},
+        user=manager,
+    )
+    assert "count" not in response.json
+    assert [p["id"] for p in response.json["results"]] == [participations[0].pk]
+    assert "cursor=" in response.json["next"]
+
+    response = django_app.get(response.json["next"], user=manager)
+    assert [p["id"] for p in response.json["results"]] == [participations[1].pk]
+    assert response.json["next"] is None
+
+
+def test_participation_list_modified_since(django_app, event, volunteer, manager, groups):
+    shift = event.shifts.first()
+    old = LocalParticipation.objects.create(
+        user=volunteer, shift=shift, state=AbstractParticipation.States.CONFIRMED
+    )
+    new = LocalParticipation.objects.create(
+        user=manager, shift=shift, state=AbstractParticipation.States.CONFIRMED
+    )
+    modified_since = old.updated_at.isoformat()
+    response = django_app.get(
+        reverse("api:userinfo-participations-list"),
+        {"modified_since": modified_since},
+        user=manager,
+    )
+    assert [p["id"] for p in response.json["results"]] == [new.pk]
+
+    old.state = AbstractParticipation.States.REQUESTED
+    old.save()
+    response = django_app.get(
+        reverse("api:userinfo-participations-list"),
+        {"modified_since": modified_since},
+        user=manager,
+    )
+    assert [p["id"] for p in response.json["results"]] == [new.pk, old.pk]
+
+
+def test_participation_list_deleted(django_app, event, volunteer, manager, groups):
+    participation = LocalParticipation.objects.create(
+        user=volunteer, shift=event.shifts.first(), state=AbstractParticipation.States.CONFIRMED
+    )
+    modified_since = participation.updated_at.isoformat()
+    participation_id = participation.pk
+    participation.delete()
+    response = django_app.get(
+        reverse("api:userinfo-participations-deleted"),
+        {"modified_since": modified_since},
+        user=manager,
+    )
+    assert [p["id"] for p in response.json["results"]] == [participation_id]
+    django_app.get(reverse("api:userinfo-participations-deleted"), user=manager, status=400)
+
+
+def test_participation_list_deleted_is_filtered(
+    django_app, event, volunteer, planner, qualified_volunteer, hr_group
+):
+    shift = event.shifts.first()
+    own = LocalParticipation.objects.create(
+        user=volunteer, shift=shift, state=AbstractParticipation.States.CONFIRMED
+    )
+    other = LocalParticipation.objects.create(
+        user=planner, shift=shift, state=AbstractParticipation.States.CONFIRMED
+    )
+    modified_since = own.updated_at.isoformat()
+    own_id, other_id = own.pk, other.pk
+    own.delete()
+    other.delete()
+
+    for url in ["api:participations-deleted", "api:userinfo-participations-deleted"]:
+        response = django_app.get(reverse(url), {"modified_since": modified_since}, user=volunteer)
+        assert [p["id"] for p in response.json["results"]] == [own_id, other_id]
+
+    event.type.show_participant_data = EventType.ShowParticipantDataChoices.RESPONSIBLES
+    event.type.save()
+    response = django_app.get(
+        reverse("api:participations-deleted"),
+        {"modified_since": modified_since},
+        user=qualified_volunteer,
+    )
+    assert response.json["results"] == []
+
+    event.active = False
+    event.save()
+    response = django_app.get(
+        reverse("api:userinfo-participations-deleted"),
+        {"modified_since": modified_since},
+        user=volunteer,
+    )
+    assert response.json["results"] == []
@@ -0,0 +1,94 @@
+import uuid
+from copy import copy
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ephios.core.models import (
+    AbstractParticipation,
+    LocalParticipation,
+    QualificationGrant,
+    UserProfile,
+)
+
+
+def add_participants(shift, qualifications, count):
+    users = UserProfile.objects.bulk_create(
+        UserProfile(
+            email=f"participant-{uuid.uuid4().hex}@localhost",
+            display_name=f"Participant {i}",
+            date_of_birth="1990-01-01",
+        )
+        for i in range(count)
+    )
+    QualificationGrant.objects.bulk_create(
+        QualificationGrant(user=user, qualification=qualification)
+        for user in users
+        for qualification in (qualifications.nfs, qualifications.c)
+    )
+    for user in users:
+        LocalParticipation.objects.create(
+            user=user, shift=shift, state=AbstractParticipation.States.CONFIRMED
+        )
+
+
+def count_queries(django_app, url, user):
+    django_app.get(url, user=user)  # warm up session and caches
+    with CaptureQueriesContext(connection) as context:
+        django_app.get(url, user=user)
+    return len(context)
+
+
+def add_own_participations(event, user, count):
+    template = event.shifts.first()
+    for __ in range(count):
+        shift = copy(template)
+        shift.pk = None
+        shift.save()
+        LocalParticipation.objects.create(
+            user=user, shift=shift, state=AbstractParticipation.States.CONFIRMED
+        )
+
+
+@pytest.mark.parametrize(
+    "url_name,budget",
+    [
+        ("api:participations-list", 8),
+        ("api:userinfo-participations-list", 9),
+        ("api:userprofile-list", 6),
+    ],
+)
+def test_list_query_budget(django_app, manager, groups, event, qualifications, url_name, budget):
+    url = reverse(url_name)
+    add_participants(event.shifts.first(), qualifications, 2)
+    few = count_queries(django_app, url, manager)
+    add_participants(event.shifts.first(), qualifications, 20)
+    many = count_queries(django_app, url, manager)
+    assert many == few
+    assert many <= budget
+
+
+@pytest.mark.parametrize(
+    "url_name,budget",
+    [
+        ("api:participations-me-list", 9),
+        ("api:user-participations-list", 8),
+    ],
+)
+def test_user_participations_query_budget(
+    django_app, manager, groups, event, qualifications, url_name, budget
+):
+    QualificationGrant.objects.create(user=manager, qualification=qualifications.nfs)
+    url = (
+        reverse(url_name, kwargs={"user": manager.pk})
+        if url_name == "api:user-participations-list"
+        else reverse(url_name)
+    )
+    add_own_participations(event, manager, 2)
+    few = count_queries(django_app, url, manager)
+    add_own_participations(event, manager, 20)
+    many = count_queries(django_app, url, manager)
+    assert many == few
+    assert many <= budget
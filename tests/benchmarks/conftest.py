@@ -0,0 +1,43 @@
+import pytest
+from django.db import transaction
+
+from ephios.core.management.commands.generate_loaddata import LoadDataGenerator, LoadDataSizes
+from ephios.core.models import AbstractParticipation, Shift, UserProfile
+
+pytest.importorskip("pytest_benchmark")
+
+
+@pytest.fixture(scope="module")
+def loaddata(django_db_setup, django_db_blocker):
+    # generating data takes a while, so it is shared by all benchmarks of a module
+    # and rolled back afterwards
+    with django_db_blocker.unblock(), transaction.atomic():
+        LoadDataGenerator(
+            LoadDataSizes(
+                users=100,
+                groups=4,
+                qualifications=12,
+                qualification_depth=4,
+                years=1,
+                events_per_week=1,
+                future_weeks=8,
+            ),
+            seed=0,
+        ).generate()
+        yield
+        transaction.set_rollback(True)
+
+
+@pytest.fixture
+def admin(loaddata):
+    return UserProfile.objects.get(email="admin@example.com")
+
+
+@pytest.fixture
+def busy_shift(loaddata):
+    return (
+        Shift.objects
+        .filter(participations__state=AbstractParticipation.States.CONFIRMED)
+        .order_by("-start_time", "pk")
+        .first()
+    )
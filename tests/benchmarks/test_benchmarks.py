@@ -0,0 +1,126 @@
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from ephios.core.models import AbstractParticipation
+
+# maximum number of queries of a warm request or run with the generated data,
+# so query regressions fail the test run and not only show up in the benchmark data
+QUERY_BUDGETS = {
+    "test_event_list": 87,
+    "test_event_calendar": 21,
+    "test_event_detail": 55,
+    "test_shift_disposition": 67,
+    "test_api_event_list": 1,
+    "test_api_participation_list": 6,
+    "test_user_event_feed": 2,
+    "test_participation_visibility": 4,
+    # databases that do not return primary keys of bulk inserts need some more
+    "test_run_periodic": 30,
+}
+
+
+def record_queries(benchmark, context):
+    benchmark.extra_info["queries"] = len(context)
+    assert len(context) <= QUERY_BUDGETS[benchmark.name]
+
+
+def benchmark_get(benchmark, client, url, **kwargs):
+    """
+    Benchmark a GET request of ``url`` and check the number of queries of a warm request.
+    """
+
+    def get():
+        response = client.get(url, **kwargs)
+        assert response.status_code == 200
+        if response.streaming:
+            b"".join(response.streaming_content)
+        return response
+
+    get()  # warm up session and caches
+    with CaptureQueriesContext(connection) as context:
+        get()
+    record_queries(benchmark, context)
+    benchmark.pedantic(get, rounds=5, iterations=1)
+
+
+def test_event_list(benchmark, client, admin):
+    client.force_login(admin)
+    # generated events are placed relative to the current week, so starting the list
+    # next week shows the same events on any day
+    today = timezone.localdate()
+    next_week = today + timedelta(days=7 - today.weekday())
+    benchmark_get(
+        benchmark,
+        client,
+        reverse("core:event_list"),
+        data={"mode": "list", "direction": "from", "date": next_week.isoformat()},
+    )
+
+
+def test_event_calendar(benchmark, client, admin):
+    client.force_login(admin)
+    benchmark_get(benchmark, client, reverse("core:event_list"), data={"mode": "calendar"})
+
+
+def test_event_detail(benchmark, client, admin, busy_shift):
+    client.force_login(admin)
+    benchmark_get(benchmark, client, busy_shift.event.get_absolute_url())
+
+
+def test_shift_disposition(benchmark, client, admin, busy_shift):
+    client.force_login(admin)
+    benchmark_get(
+        benchmark, client, reverse("core:shift_disposition", kwargs={"pk": busy_shift.pk})
+    )
+
+
+def test_api_event_list(benchmark, client, admin):
+    client.force_login(admin)
+    benchmark_get(benchmark, client, reverse("api:event-list"), data={"limit": 100})
+
+
+def test_api_participation_list(benchmark, client, admin):
+    client.force_login(admin)
+    benchmark_get(benchmark, client, reverse("api:participations-list"), data={"limit": 100})
+
+
+def test_user_event_feed(benchmark, client, busy_shift):
+    user = busy_shift.participations.first().localparticipation.user
+    benchmark_get(
+        benchmark,
+        client,
+        reverse("core:user_event_feed", kwargs={"calendar_token": user.calendar_token}),
+    )
+
+
+def test_participation_visibility(benchmark, busy_shift):
+    user = busy_shift.participations.first().localparticipation.user
+
+    def viewable():
+        return AbstractParticipation.objects.all().viewable_by(user.as_participant())
+
+    benchmark.extra_info["plan"] = viewable().explain()
+
+    def evaluate():
+        return list(viewable().values_list("pk", flat=True))
+
+    with CaptureQueriesContext(connection) as context:
+        evaluate()
+    record_queries(benchmark, context)
+    benchmark.pedantic(evaluate, rounds=5, iterations=1)
+
+
+def test_run_periodic(benchmark, loaddata):
+    def run_periodic():
+        call_command("run_periodic")
+
+    run_periodic()  # the first run works off the backlog of the generated data
+    with CaptureQueriesContext(connection) as context:
+        run_periodic()
+    record_queries(benchmark, context)
+    benchmark.pedantic(run_periodic, rounds=3, iterations=1)
@@ -0,0 +1,36 @@
+from bleach import Linker
+from bleach.linkifier import DEFAULT_CALLBACKS
+
+from ephios.extra.templatetags.rich_text import (
+    _render_rich_text,
+    markdown_compile,
+    rich_text,
+    safelink_callback,
+)
+
+DESCRIPTION = """
+# Concert at the town hall
+
+Meeting point is **the back entrance**, see https://example.com/map for directions.
+Your contact is Lisa Example, reachable at lisa@example.com or +49 123456789.
+
+1. Bring your own vest
+2. Report to the *operations lead*
+3. Have fun
+
+> Please sign up until friday.
+""".strip()
+
+
+def render_uncached(text):
+    linker = Linker(parse_email=True, callbacks=DEFAULT_CALLBACKS + [safelink_callback])
+    return linker.linkify(markdown_compile(text))
+
+
+def test_rich_text_uncached(benchmark):
+    assert benchmark(render_uncached, DESCRIPTION) == rich_text(DESCRIPTION)
+
+
+def test_rich_text_cached(benchmark):
+    _render_rich_text.cache_clear()
+    assert benchmark(rich_text, DESCRIPTION) == render_uncached(DESCRIPTION)
@@ -27,6 +27,7 @@ from ephios.core.models import (
     WorkingHours,
 )
 from ephios.core.models.users import IdentityProvider
+from ephios.core.services.preferences import PreferenceSnapshot
 from ephios.plugins.baseshiftstructures.structure.uniform import UniformShiftStructure
 from ephios.plugins.basesignupflows.flow.participant import RequestConfirmSignupFlow
 
@@ -44,6 +45,7 @@ def clear_cache():
     # because e.g. dynamic preferences uses the cache
     yield
     cache.clear()
+    PreferenceSnapshot.clear()
 
 
 @pytest.fixture
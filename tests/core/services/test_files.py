@@ -0,0 +1,119 @@
+from importlib import import_module
+from urllib.parse import urlsplit
+
+import pytest
+from django.apps import apps
+from django.conf import settings as django_settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.urls import resolve, reverse
+
+from ephios.core.models import StoredFile
+from ephios.core.services.files import get_usercontent_used, reconcile_stored_files
+from ephios.plugins.files.models import Document
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    return tmp_path
+
+
+def test_document_files_are_tracked(media_root, superuser, django_capture_on_commit_callbacks):
+    document = Document(title="Manual", uploader=superuser)
+    document.file.save("manual.pdf", ContentFile(b"%PDF" * 100))
+    assert StoredFile.objects.get(path=document.file.name).size == 400
+    assert get_usercontent_used() == 400
+    assert django_settings.GET_USERCONTENT_QUOTA()[0] == 400
+
+    with django_capture_on_commit_callbacks(execute=True):
+        document.delete()
+    assert not StoredFile.objects.exists()
+    assert get_usercontent_used() == 0
+
+
+def test_reconcile_stored_files(media_root, django_assert_max_num_queries):
+    (media_root / "documents").mkdir()
+    (media_root / "documents" / "untracked.pdf").write_bytes(b"x" * 100)
+    StoredFile.objects.create(path="documents/deleted.pdf", size=50)
+    StoredFile.objects.create(path="documents/untracked.pdf", size=10)
+    assert get_usercontent_used() == 60
+
+    reconcile_stored_files()
+    assert dict(StoredFile.objects.values_list("path", "size")) == {"documents/untracked.pdf": 100}
+    assert get_usercontent_used() == 100
+    with django_assert_max_num_queries(0):
+        get_usercontent_used()
+
+
+def test_migration_fills_stored_files(media_root):
+    fill_stored_files = import_module(
+        "ephios.core.migrations.0046_fill_storedfile"
+    ).fill_stored_files
+    (media_root / "documents").mkdir()
+    (media_root / "documents" / "existing.pdf").write_bytes(b"x" * 100)
+    fill_stored_files(apps, None)
+    assert get_usercontent_used() == 100
+
+
+@pytest.fixture
+def document(media_root, superuser):
+    document = Document(title="Manual", uploader=superuser)
+    document.file.save("manual.pdf", ContentFile(bytes(range(100))))
+    return document
+
+
+@pytest.fixture
+def document_url(document, settings):
+    settings.FALLBACK_MEDIA_SERVING = True
+    return reverse("files:document_detail", kwargs={"pk": document.pk})
+
+
+def test_media_file_response(client, superuser, document_url):
+    client.force_login(superuser)
+    response = client.get(document_url)
+    assert response.status_code == 200
+    assert b"".join(response.streaming_content) == bytes(range(100))
+    assert response["Content-Length"] == "100"
+    assert response["Accept-Ranges"] == "bytes"
+    assert "private" in response["Cache-Control"]
+
+    response = client.get(document_url, headers={"If-None-Match": response["ETag"]})
+    assert response.status_code == 304
+
+
+def test_media_file_range_response(client, superuser, document_url):
+    client.force_login(superuser)
+    etag = client.get(document_url)["ETag"]
+
+    response = client.get(document_url, headers={"Range": "bytes=10-19"})
+    assert response.status_code == 206
+    assert b"".join(response.streaming_content) == bytes(range(10, 20))
+    assert response["Content-Range"] == "bytes 10-19/100"
+    assert response["Content-Length"] == "10"
+
+    response = client.get(document_url, headers={"Range": "bytes=-5", "If-Range": etag})
+    assert b"".join(response.streaming_content) == bytes(range(95, 100))
+
+    response = client.get(document_url, headers={"Range": "bytes=-5", "If-Range": '"outdated"'})
+    assert response.status_code == 200
+
+    response = client.get(document_url, headers={"Range": "bytes=100-"})
+    assert response.status_code == 416
+    assert response["Content-Range"] == "bytes */100"
+
+
+def test_file_ticket_stores_path(client, superuser, document, document_url, settings):
+    settings.DEFAULT_USERCONTENT_URL = "http://usercontent.localhost/media/"
+    client.force_login(superuser)
+    response = client.get(document_url)
+    assert response.status_code == 302
+    ticket_url = urlsplit(response["Location"])
+    ticket = resolve(ticket_url.path).kwargs["ticket"]
+    assert cache.get(ticket) == document.file.name
+
+    response = client.get(
+        ticket_url.path, headers={"Range": "bytes=0-9"}, HTTP_HOST=ticket_url.netloc
+    )
+    assert response.status_code == 206
+    assert b"".join(response.streaming_content) == bytes(range(10))
@@ -0,0 +1,62 @@
+from django.core.cache import cache
+from django.core.signals import request_started
+from dynamic_preferences.registries import global_preferences_registry
+
+from ephios.core.services.preferences import (
+    LOCAL_SNAPSHOT_TIMEOUT,
+    PREFERENCE_VERSION_CACHE_KEY,
+    PreferenceSnapshot,
+)
+
+
+def test_snapshot_reads_global_preferences_without_queries(django_assert_num_queries):
+    global_preferences_registry.manager()["general__organization_name"] = "Sample Org"
+    PreferenceSnapshot.get_global("general__organization_name")
+    with django_assert_num_queries(0):
+        assert PreferenceSnapshot.get_global("general__organization_name") == "Sample Org"
+        assert "ephios.plugins.guests" in PreferenceSnapshot.get_global("general__enabled_plugins")
+
+
+def test_snapshot_is_cleared_on_preference_update():
+    preferences = global_preferences_registry.manager()
+    preferences["general__organization_name"] = "Before"
+    assert PreferenceSnapshot.get_global("general__organization_name") == "Before"
+    preferences["general__organization_name"] = "After"
+    assert PreferenceSnapshot.get_global("general__organization_name") == "After"
+
+
+def test_snapshot_reloads_after_version_change_in_next_request(django_assert_num_queries):
+    global_preferences_registry.manager()["general__organization_name"] = "Sample Org"
+    PreferenceSnapshot.get_global("general__organization_name")
+    cache.set(PREFERENCE_VERSION_CACHE_KEY, "changed in another process")
+    with django_assert_num_queries(0):
+        PreferenceSnapshot.get_global("general__organization_name")
+    request_started.send(sender=None)
+    with django_assert_num_queries(2):
+        PreferenceSnapshot.get_global("general__organization_name")
+    assert PreferenceSnapshot.current().version == "changed in another process"
+
+
+def test_snapshot_expires_without_shared_cache(django_assert_num_queries, settings, monkeypatch):
+    global_preferences_registry.manager()["general__organization_name"] = "Sample Org"
+    snapshot = PreferenceSnapshot.current()
+    request_started.send(sender=None)
+    assert PreferenceSnapshot.current() is snapshot
+    settings.SHARED_CACHE = False
+    monkeypatch.setattr(snapshot, "loaded_at", snapshot.loaded_at - LOCAL_SNAPSHOT_TIMEOUT - 1)
+    assert PreferenceSnapshot.current() is snapshot  # kept for the rest of the request
+    request_started.send(sender=None)
+    with django_assert_num_queries(2):
+        assert PreferenceSnapshot.current() is not snapshot
+
+
+def test_snapshot_reads_event_type_preferences_in_bulk(
+    django_assert_num_queries, event, service_event_type, qualifications
+):
+    service_event_type.preferences["general_required_qualifications"] = [qualifications.nfs]
+    service_event_type.preferences["visible_for"] = []
+    PreferenceSnapshot.get_event_type(service_event_type, "visible_for")
+    with django_assert_num_queries(1):
+        assert list(
+            PreferenceSnapshot.get_event_type(service_event_type, "general_required_qualifications")
+        ) == [qualifications.nfs]
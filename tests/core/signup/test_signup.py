@@ -8,15 +8,21 @@ from django.utils.timezone import get_current_timezone
 from ephios.core.models import (
     AbstractParticipation,
     LocalParticipation,
+    Notification,
     Qualification,
     QualificationGrant,
     Shift,
 )
+from ephios.core.services.notifications.types import (
+    ResponsibleParticipationAwaitsDispositionNotification,
+)
 from ephios.core.signup.flow.participant_validation import (
     ParticipantUnfitError,
     get_conflicting_participations,
 )
 from ephios.core.signup.stats import SignupStats
+from ephios.core.signup.structure.abstract import AbstractShiftStructure
+from ephios.core.signup.views import SignupView
 from ephios.plugins.baseshiftstructures.structure.uniform import UniformShiftStructure
 from ephios.plugins.basesignupflows.flow.participant import InstantConfirmSignupFlow
 
@@ -29,6 +35,13 @@ def test_signup_stats_addition():
     assert b + c == SignupStats(8, 4, 3, 7, 5, 11)
 
 
+def test_structure_without_capacity_has_no_capacity_checkers(event):
+    class NoCapacityStructure(AbstractShiftStructure):
+        slug = "no_capacity"
+
+    assert NoCapacityStructure(event.shifts.first()).get_capacity_checkers() == []
+
+
 def test_signup_stats_full_count():
     # default case
     a = SignupStats(
@@ -284,3 +297,47 @@ def test_general_required_qualifications(django_app, event, volunteer, qualifica
     QualificationGrant.objects.create(qualification=qualifications.b, user=volunteer)
     volunteer.refresh_from_db()
     assert event.shifts.first().signup_flow.get_validator(volunteer.as_participant()).can_sign_up()
+
+
+def test_signup_is_validated_again_while_locked(
+    django_app, event, volunteer, qualified_volunteer, monkeypatch
+):
+    shift = event.shifts.first()
+    shift.signup_flow_slug = InstantConfirmSignupFlow.slug
+    shift.save()
+    get_validator = SignupView._get_validator
+
+    def get_validator_and_sign_up_concurrently(view):
+        validator = get_validator(view)
+        LocalParticipation.objects.create(
+            shift=shift, user=qualified_volunteer, state=AbstractParticipation.States.CONFIRMED
+        )
+        return validator
+
+    monkeypatch.setattr(SignupView, "_get_validator", get_validator_and_sign_up_concurrently)
+    response = (
+        django_app
+        .get(event.get_absolute_url(), user=volunteer)
+        .form.submit(name="signup_choice", value="sign_up")
+        .follow()
+    )
+    assert "The maximum number of participants is reached." in response
+    assert not LocalParticipation.objects.filter(shift=shift, user=volunteer).exists()
+
+
+def test_signup_notifications_are_sent_on_commit(
+    django_app, event, volunteer, django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks() as callbacks:
+        django_app.get(event.get_absolute_url(), user=volunteer).form.submit(
+            name="signup_choice", value="sign_up"
+        )
+    assert LocalParticipation.objects.get(user=volunteer).state == (
+        AbstractParticipation.States.REQUESTED
+    )
+    assert not Notification.objects.exists()
+    for callback in callbacks:
+        callback()
+    assert Notification.objects.filter(
+        slug=ResponsibleParticipationAwaitsDispositionNotification.slug
+    ).exists()
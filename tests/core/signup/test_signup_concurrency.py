@@ -0,0 +1,75 @@
+import threading
+from datetime import date
+
+import pytest
+from django.db import connection, connections
+from django.test import Client
+from django.urls import reverse
+
+from ephios.core.models import AbstractParticipation, LocalParticipation, Notification, UserProfile
+from ephios.core.services.notifications.types import (
+    ResponsibleParticipationStateChangeNotification,
+)
+from ephios.plugins.basesignupflows.flow.participant import InstantConfirmSignupFlow
+
+SIGNUP_COUNT = 12
+MAXIMUM_NUMBER_OF_PARTICIPANTS = 3
+
+pytestmark = [
+    pytest.mark.django_db(transaction=True),
+    pytest.mark.skipif(
+        not connection.features.has_select_for_update,
+        reason="concurrent signups are only serialized on databases with row locks",
+    ),
+]
+
+
+def test_concurrent_signups_do_not_exceed_maximum(event, groups):
+    __, __, volunteers = groups
+    shift = event.shifts.first()
+    shift.signup_flow_slug = InstantConfirmSignupFlow.slug
+    shift.structure_configuration["maximum_number_of_participants"] = MAXIMUM_NUMBER_OF_PARTICIPANTS
+    shift.save()
+    users = [
+        UserProfile.objects.create(
+            display_name=f"Volunteer {i}",
+            email=f"volunteer-{i}@localhost",
+            date_of_birth=date(1990, 1, 1),
+        )
+        for i in range(SIGNUP_COUNT)
+    ]
+    volunteers.user_set.add(*users)
+
+    barrier = threading.Barrier(SIGNUP_COUNT, timeout=30)
+    responses = []
+
+    def sign_up(user):
+        try:
+            client = Client()
+            client.force_login(user)
+            barrier.wait()
+            responses.append(
+                client.post(
+                    reverse("core:signup_action", kwargs={"pk": shift.pk}),
+                    {"signup_choice": "sign_up", "quick_action": "1"},
+                )
+            )
+        finally:
+            connections.close_all()
+
+    threads = [threading.Thread(target=sign_up, args=(user,)) for user in users]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [response.status_code for response in responses] == [302] * SIGNUP_COUNT
+    confirmed = LocalParticipation.objects.filter(
+        shift=shift, state=AbstractParticipation.States.CONFIRMED
+    )
+    assert confirmed.count() == MAXIMUM_NUMBER_OF_PARTICIPANTS
+    assert set(
+        Notification.objects.filter(
+            slug=ResponsibleParticipationStateChangeNotification.slug
+        ).values_list("data__participation_id", flat=True)
+    ) == set(confirmed.values_list("pk", flat=True))
@@ -1,6 +1,10 @@
+import zipfile
+
 from django.urls import reverse
+from guardian.shortcuts import remove_perm
 
-from ephios.core.models import Event
+from ephios.core.models import Event, EventExportJob
+from ephios.core.pdf import generate_pending_event_exports, get_event_file_name, get_event_pdf
 
 
 class TestEventBulkDelete:
@@ -24,3 +28,70 @@ class TestEventBulkDelete:
         # assert confirm_page.html.find_all(string=[event.title, multi_shift_event])
         confirm_page.form.submit()
         assert Event.objects.count() == event_count - 2
+
+
+class TestEventBulkExport:
+    def test_export_multiple_events_as_zip(
+        self, django_app, planner, event, multi_shift_event, groups, settings, tmp_path
+    ):
+        settings.MEDIA_ROOT = tmp_path
+        form = django_app.get(reverse("core:event_list"), user=planner).forms["bulk_action_form"]
+        form.action = reverse(
+            "core:event_bulk_export"
+        )  # webtest cannot read the formaction from button
+        form["bulk_action"] = [event.pk, multi_shift_event.pk]
+        confirm_page = form.submit(name="export")
+        confirm_page.form["format"] = EventExportJob.Formats.ZIP
+        response = confirm_page.form.submit().follow()
+        assert "is being generated" in response
+        job = EventExportJob.objects.get(user=planner)
+
+        generate_pending_event_exports()
+        job.refresh_from_db()
+        assert job.is_finished
+        with zipfile.ZipFile(job.file.open()) as archive:
+            assert len(archive.namelist()) == 2
+            assert archive.read(get_event_file_name(event)) == get_event_pdf(event)
+        response = django_app.get(
+            reverse("core:event_export_job", kwargs={"pk": job.pk}), user=planner
+        )
+        assert "attachment" in response.headers["Content-Disposition"]
+
+    def test_export_only_viewable_events(
+        self, csrf_exempt_django_app, volunteer, event, multi_shift_event, groups
+    ):
+        managers, planners, volunteers = groups
+        remove_perm("core.view_event", volunteers, multi_shift_event)
+        csrf_exempt_django_app.post(
+            reverse("core:event_bulk_export"),
+            {"bulk_action": [event.pk, multi_shift_event.pk], "confirm": "1"},
+            user=volunteer,
+        )
+        assert list(EventExportJob.objects.get(user=volunteer).events.all()) == [event]
+
+    def test_failing_export_is_given_up(self, django_app, monkeypatch, caplog, planner, event):
+        job = EventExportJob.objects.create(user=planner)
+        job.events.set([event])
+
+        def fail(job):
+            raise ValueError("Broken PDF")
+
+        monkeypatch.setattr("ephios.core.pdf.generate_event_export", fail)
+        for __ in range(EventExportJob.MAX_ATTEMPTS + 1):
+            generate_pending_event_exports()
+        caplog.clear()  # the failures are logged as errors
+        job.refresh_from_db()
+        assert job.attempts == EventExportJob.MAX_ATTEMPTS
+        assert job.has_failed
+        response = django_app.get(
+            reverse("core:event_export_job", kwargs={"pk": job.pk}), user=planner
+        )
+        assert "could not be generated" in response
+        assert "Broken PDF" in response
+
+    def test_export_job_is_private(self, django_app, planner, volunteer, event):
+        job = EventExportJob.objects.create(user=planner)
+        job.events.set([event])
+        django_app.get(
+            reverse("core:event_export_job", kwargs={"pk": job.pk}), user=volunteer, status=404
+        )
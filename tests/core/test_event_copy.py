@@ -2,12 +2,22 @@ from datetime import datetime, time, timedelta
 from zoneinfo import ZoneInfo
 
 import recurrence
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 from guardian.shortcuts import assign_perm
 
+from ephios.api.caching import get_response_data_version
 from ephios.core.models import Event, Shift
+from ephios.core.services.event_copy import EventCopier
 from ephios.extra.permissions import get_groups_with_perms
+from ephios.modellogging.models import LogEntry
+from ephios.modellogging.recorders import InstanceActionType
+from ephios.plugins.eventautoqualification.models import EventAutoQualificationConfiguration
+from ephios.plugins.questionnaires.models import Question, Questionnaire
+from ephios.plugins.simpleresource.models import Resource, ResourceAllocation, ResourceCategory
 
 
 class TestEventCopy:
@@ -190,3 +200,81 @@ class TestEventCopy:
         form.submit()
         assert event.shifts.get(start_time__date=target_date)
         assert event.shifts.count() == shift_count + 1
+
+    def test_event_copy_query_count_does_not_depend_on_copies(
+        self, planner, multi_shift_event, volunteer
+    ):
+        assign_perm("change_event", volunteer, multi_shift_event)
+        start = timezone.now() + timedelta(days=7)
+
+        def count_queries(copies):
+            dates = [start + timedelta(days=7 * i) for i in range(copies)]
+            with CaptureQueriesContext(connection) as context:
+                EventCopier(multi_shift_event, planner).copy_to(dates)
+            return len(context)
+
+        count_queries(1)  # warm up content type and preference caches
+        assert count_queries(1) == count_queries(20)
+        copies = Event.objects.exclude(pk=multi_shift_event.pk)
+        assert copies.count() == 22
+        for copied_event in copies:
+            assert copied_event.shifts.count() == multi_shift_event.shifts.count()
+            assert volunteer.has_perm("core.change_event", copied_event)
+            assert planner.has_perm("core.view_event", copied_event)
+
+    def test_event_copy_copies_plugin_data(self, planner, event, qualifications):
+        shift = event.shifts.first()
+        question = Question.objects.create(
+            name="Diet", question_text="Diet?", type="text", required=False
+        )
+        Questionnaire.objects.create(shift=shift).questions.add(question)
+        resource = Resource.objects.create(
+            title="RTW", category=ResourceCategory.objects.create(name="Vehicles")
+        )
+        ResourceAllocation.objects.create(shift=shift).resources.add(resource)
+        EventAutoQualificationConfiguration.objects.create(
+            event=event, qualification=qualifications.nfs
+        )
+        start = timezone.now() + timedelta(days=7)
+
+        copies = EventCopier(event, planner).copy_to([start, start + timedelta(days=7)])
+
+        for copied_event in copies:
+            copied_shift = copied_event.shifts.get()
+            assert list(Questionnaire.objects.get(shift=copied_shift).questions.all()) == [question]
+            assert list(ResourceAllocation.objects.get(shift=copied_shift).resources.all()) == [
+                resource
+            ]
+            assert copied_event.auto_qualification_config.qualification == qualifications.nfs
+
+    def test_event_copy_is_logged(self, planner, multi_shift_event):
+        data_version = get_response_data_version()
+        start = timezone.now() + timedelta(days=7)
+        copies = EventCopier(multi_shift_event, planner).copy_to([start, start + timedelta(days=7)])
+        for copied_event in copies:
+            assert LogEntry.objects.filter(
+                content_type=ContentType.objects.get_for_model(Event),
+                content_object_id=copied_event.pk,
+                action_type=InstanceActionType.CREATE,
+            ).exists()
+            assert set(
+                LogEntry.objects.filter(
+                    content_type=ContentType.objects.get_for_model(Shift),
+                    action_type=InstanceActionType.CREATE,
+                    attached_to_object_id=copied_event.pk,
+                ).values_list("content_object_id", flat=True)
+            ) == set(copied_event.shifts.values_list("pk", flat=True))
+        assert get_response_data_version() != data_version
+
+    def test_event_copy_without_bulk_insert_pks(self, planner, event, monkeypatch):
+        monkeypatch.setattr(type(connection.features), "can_return_rows_from_bulk_insert", False)
+        question = Question.objects.create(
+            name="Diet", question_text="Diet?", type="text", required=False
+        )
+        Questionnaire.objects.create(shift=event.shifts.first()).questions.add(question)
+        start = timezone.now() + timedelta(days=7)
+        copies = EventCopier(event, planner).copy_to([start, start + timedelta(days=7)])
+        for copied_event in copies:
+            copied_shift = copied_event.shifts.get()
+            assert list(Questionnaire.objects.get(shift=copied_shift).questions.all()) == [question]
+            assert planner.has_perm("core.change_event", copied_event)
@@ -2,7 +2,8 @@ from datetime import timedelta
 
 from django.urls import reverse
 
-from ephios.core.models import LocalParticipation
+from ephios.core.models import AbstractParticipation, LocalParticipation
+from ephios.core.templatetags.event_extras import event_list_signup_state_counts
 
 
 def test_event_list_200(django_app, planner, event):
@@ -155,3 +156,48 @@ def test_day_mode_filter(django_app, volunteer, event, conflicting_event):
     response = filter_form.submit()
     assert set(response.context["event_list"]) == {event}
     assert event.title in response and conflicting_event.title not in response
+
+
+def test_calendar_days_are_cached_until_shifts_change(django_app, volunteer, event):
+    url = f"{reverse('core:event_list')}?mode=calendar&date={event.get_start_time():%Y-%m-%d}"
+    response = django_app.get(url, user=volunteer)
+    assert event.title in response
+    assert "core/fragments/calendar_day.html" in [t.name for t in response.templates]
+
+    response = django_app.get(url, user=volunteer)
+    assert event.title in response
+    assert "core/fragments/calendar_day.html" not in [t.name for t in response.templates]
+
+    event.title = "Fusion Festival"
+    event.save()
+    response = django_app.get(url, user=volunteer)
+    assert "Fusion Festival" in response
+
+
+def test_event_list_participation_counts(django_app, planner, volunteer, event, conflicting_event):
+    LocalParticipation.objects.create(
+        shift=event.shifts.first(), user=volunteer, state=AbstractParticipation.States.REQUESTED
+    )
+    LocalParticipation.objects.create(
+        shift=event.shifts.first(), user=planner, state=AbstractParticipation.States.REQUESTED
+    )
+    url = f"{reverse('core:event_list')}?date={event.get_start_time():%Y-%m-%d}"
+
+    events = {e.pk: e for e in django_app.get(url, user=volunteer).context["event_list"]}
+    assert events.keys() == {event.pk, conflicting_event.pk}
+    assert event_list_signup_state_counts(events[event.pk]) == {
+        AbstractParticipation.States.REQUESTED: 1
+    }
+    assert event_list_signup_state_counts(events[conflicting_event.pk]) == {
+        AbstractParticipation.States.CONFIRMED: 1
+    }
+    # volunteers can not change the events, so they don't see pending dispositions
+    assert events[event.pk].pending_disposition_count == 0
+
+    events = {e.pk: e for e in django_app.get(url, user=planner).context["event_list"]}
+    assert events[event.pk].pending_disposition_count == 2
+    assert events[conflicting_event.pk].pending_disposition_count == 0
+    assert event_list_signup_state_counts(events[event.pk]) == {
+        AbstractParticipation.States.REQUESTED: 1
+    }
+    assert event_list_signup_state_counts(events[conflicting_event.pk]) == {}
@@ -1,8 +1,15 @@
 from datetime import timedelta
 
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+from guardian.shortcuts import assign_perm, get_users_with_perms
 
-from ephios.core.models import AbstractParticipation
+from ephios.core.ical import UserEventFeed
+from ephios.core.models import AbstractParticipation, Event, LocalParticipation, Shift
 
 
 def test_user_event_feed(django_app, qualified_volunteer, event):
@@ -48,3 +55,120 @@ def test_user_event_feed(django_app, qualified_volunteer, event):
     )
     assert "TENTATIVE" not in response
     assert individual_start_time.strftime("%M") in response
+
+
+def test_user_event_feed_conditional_get(django_app, volunteer, event):
+    participation = LocalParticipation.objects.create(
+        shift=event.shifts.first(), user=volunteer, state=AbstractParticipation.States.CONFIRMED
+    )
+    url = reverse("core:user_event_feed", kwargs=dict(calendar_token=volunteer.calendar_token))
+    response = django_app.get(url)
+    assert event.title in response
+    etag = response.headers["ETag"]
+    assert "Last-Modified" not in response.headers
+    cached_response = django_app.get(url)
+    assert cached_response.body == response.body
+    assert cached_response.headers["Content-Disposition"] == response.headers["Content-Disposition"]
+
+    assert django_app.get(url, headers={"If-None-Match": etag}, status=304).headers["ETag"] == etag
+
+    # changes to the event change the version
+    event.title = "Fission Festival Reloaded"
+    event.save()
+    response = django_app.get(url, headers={"If-None-Match": etag}, status=200)
+    assert "Fission Festival Reloaded" in response
+    assert response.headers["ETag"] != etag
+
+    # participations leaving the feed change the version as well
+    etag = response.headers["ETag"]
+    participation.delete()
+    response = django_app.get(url, headers={"If-None-Match": etag}, status=200)
+    assert "Fission Festival" not in response
+
+
+def test_user_event_feed_is_streamed_and_cached(client, volunteer, event):
+    LocalParticipation.objects.create(
+        shift=event.shifts.first(), user=volunteer, state=AbstractParticipation.States.CONFIRMED
+    )
+    url = reverse("core:user_event_feed", kwargs=dict(calendar_token=volunteer.calendar_token))
+    response = client.get(url)
+    assert response.streaming
+    content = b"".join(response.streaming_content)
+    assert event.title.encode() in content
+
+    cached_response = client.get(url)
+    assert not cached_response.streaming
+    assert cached_response.content == content
+
+
+def test_user_event_feed_ignores_if_modified_since(django_app, volunteer, multi_shift_event):
+    older, newer = (
+        LocalParticipation.objects.create(
+            shift=shift, user=volunteer, state=AbstractParticipation.States.CONFIRMED
+        )
+        for shift in multi_shift_event.shifts.all()[:2]
+    )
+    url = reverse("core:user_event_feed", kwargs=dict(calendar_token=volunteer.calendar_token))
+    django_app.get(url)
+    date = http_date()
+    newer.state = AbstractParticipation.States.USER_DECLINED
+    newer.save()
+    # the latest participation left the feed, which must not be answered with not modified
+    response = django_app.get(url, headers={"If-Modified-Since": date}, status=200)
+    assert response.body.count(b"BEGIN:VEVENT") == 1
+
+
+def test_user_event_feed_past_days(django_app, settings, volunteer, event):
+    shift = event.shifts.first()
+    shift.start_time = timezone.now() - timedelta(days=30)
+    shift.meeting_time = shift.start_time
+    shift.end_time = shift.start_time + timedelta(hours=4)
+    shift.save()
+    LocalParticipation.objects.create(
+        shift=shift, user=volunteer, state=AbstractParticipation.States.CONFIRMED
+    )
+    url = reverse("core:user_event_feed", kwargs=dict(calendar_token=volunteer.calendar_token))
+
+    settings.CALENDAR_FEED_PAST_DAYS = 90
+    assert event.title in django_app.get(url)
+    settings.CALENDAR_FEED_PAST_DAYS = 7
+    assert event.title not in django_app.get(url)
+
+
+def test_user_event_feed_without_per_item_queries(event, volunteer, groups):
+    managers, planners, volunteers = groups
+    assign_perm("change_event", volunteer, event)
+    shift = event.shifts.first()
+    LocalParticipation.objects.create(
+        shift=shift, user=volunteer, state=AbstractParticipation.States.CONFIRMED
+    )
+    for i in range(5):
+        other_event = Event.objects.create(
+            title=f"Event {i}", location="Somewhere", type=event.type, active=True
+        )
+        assign_perm("change_event", planners, other_event)
+        shift.pk = None
+        shift.event = other_event
+        shift.save()
+        LocalParticipation.objects.create(
+            shift=shift, user=volunteer, state=AbstractParticipation.States.CONFIRMED
+        )
+    request = RequestFactory().get("/")
+
+    def render():
+        with CaptureQueriesContext(connection) as context:
+            content = UserEventFeed(volunteer).render(request).decode()
+        return content, len(context)
+
+    content, num_queries = render()
+    assert content.startswith("BEGIN:VCALENDAR") and content.endswith("END:VCALENDAR\r\n")
+    assert content.count("BEGIN:VEVENT") == 6
+    for vevent in content.split("BEGIN:VEVENT")[1:]:
+        shift = Shift.objects.get(pk=vevent.split("UID:")[1].split("@")[0])
+        organizer = get_users_with_perms(shift.event, only_with_perms_in=["change_event"]).first()
+        assert f"ORGANIZER:MAILTO:{organizer.email}" in vevent
+
+    Shift.objects.filter(event__title="Event 0").delete()
+    content, fewer_items_num_queries = render()
+    assert content.count("BEGIN:VEVENT") == 5
+    assert num_queries == fewer_items_num_queries
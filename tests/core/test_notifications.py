@@ -65,7 +65,7 @@ def test_participation_notification_sending(event, qualified_volunteer):
 
 
 def test_responsible_confirmed_participation_customized_notification(
-    django_app, event, planner, qualified_volunteer
+    django_app, event, planner, qualified_volunteer, django_capture_on_commit_callbacks
 ):
     participation = LocalParticipation.objects.create(
         shift=event.shifts.first(),
@@ -78,7 +78,8 @@ def test_responsible_confirmed_participation_customized_notification(
         user=qualified_volunteer,
     ).form
     form["individual_start_time_1"] = "07:42"
-    form.submit(name="signup_choice", value="customize").follow()
+    with django_capture_on_commit_callbacks(execute=True):
+        form.submit(name="signup_choice", value="customize").follow()
 
     # assert only notification of the correct type exist
     assert set(Notification.objects.all().values_list("slug", flat=True)) == {
@@ -0,0 +1,116 @@
+from datetime import datetime, timedelta
+from itertools import cycle
+
+import pytest
+from guardian.shortcuts import assign_perm
+
+from ephios.core.models import (
+    AbstractParticipation,
+    Event,
+    EventType,
+    LocalParticipation,
+    Shift,
+    UserProfile,
+)
+from ephios.core.models.events import PlaceholderParticipation
+from ephios.plugins.baseshiftstructures.structure.uniform import UniformShiftStructure
+from ephios.plugins.basesignupflows.flow.participant import RequestConfirmSignupFlow
+
+
+@pytest.fixture
+def participation_volume(groups, tz):
+    """
+    Events of all participant data visibility modes with many participations of many users.
+    """
+    managers, planners, volunteers = groups
+    event_types = [
+        EventType.objects.create(title=str(choice.label), show_participant_data=choice)
+        for choice in EventType.ShowParticipantDataChoices
+    ]
+    users = UserProfile.objects.bulk_create(
+        UserProfile(
+            email=f"user{i}@localhost", display_name=f"User {i}", password="dummy", is_active=True
+        )
+        for i in range(10)
+    )
+    volunteers.user_set.add(*users)
+    states = cycle(AbstractParticipation.States)
+    start = datetime(2099, 1, 1, 8, tzinfo=tz)
+    for i in range(20):
+        event = Event.objects.create(
+            title=f"Event {i}",
+            location="Somewhere",
+            type=event_types[i % len(event_types)],
+            active=i % 10 != 0,
+        )
+        if i % 3:
+            assign_perm("core.view_event", volunteers, event)
+        if i % 4 == 0:
+            assign_perm("core.change_event", planners, event)
+        shift = Shift.objects.create(
+            event=event,
+            meeting_time=start + timedelta(days=i),
+            start_time=start + timedelta(days=i),
+            end_time=start + timedelta(days=i, hours=8),
+            signup_flow_slug=RequestConfirmSignupFlow.slug,
+            structure_slug=UniformShiftStructure.slug,
+        )
+        for user in users[i % 5 :: 5]:
+            LocalParticipation.objects.create(shift=shift, user=user, state=next(states))
+        PlaceholderParticipation.objects.create(shift=shift, display_name="Placeholder")
+    return users
+
+
+def reference_viewable(user):
+    """Straightforward python implementation of participation visibility rules."""
+    Choices = EventType.ShowParticipantDataChoices
+    confirmed_event_ids = set(
+        LocalParticipation.objects.filter(
+            user=user, state=AbstractParticipation.States.CONFIRMED
+        ).values_list("shift__event_id", flat=True)
+    )
+    viewable = set()
+    for participation in AbstractParticipation.objects.select_related("shift__event__type"):
+        event = participation.shift.event
+        if not event.active or not user.has_perm("core.view_event", event):
+            continue
+        participant_user = getattr(participation, "user", None)
+        if (
+            event.type.show_participant_data in {Choices.INSTANCE_USERS, Choices.PUBLIC}
+            or (
+                event.type.show_participant_data == Choices.CONFIRMED
+                and event.pk in confirmed_event_ids
+            )
+            or user.has_perm("core.change_event", event)
+            or participant_user == user
+            or (participant_user is not None and user.has_perm("core.view_userprofile"))
+        ):
+            viewable.add(participation.pk)
+    return viewable
+
+
+def test_participation_visibility_matches_rules(participation_volume, volunteer, planner, manager):
+    for user in [participation_volume[0], participation_volume[-1], volunteer, planner, manager]:
+        user = UserProfile.objects.get(pk=user.pk)
+        viewable = set(
+            AbstractParticipation.objects
+            .all()
+            .viewable_by(user.as_participant())
+            .values_list("pk", flat=True)
+        )
+        assert viewable == reference_viewable(user)
+        annotated = AbstractParticipation.objects.all().with_show_participant_data_to(
+            user.as_participant()
+        )
+        assert {p.pk for p in annotated if p.show_participant_data} == viewable
+
+
+def test_participation_visibility_query_is_flat(
+    participation_volume, django_assert_max_num_queries
+):
+    user = UserProfile.objects.get(pk=participation_volume[0].pk)
+    with django_assert_max_num_queries(10):
+        # permissions, event types and confirmed events are resolved once before the actual query
+        qs = AbstractParticipation.objects.all().viewable_by(user.as_participant())
+        list(qs.values_list("pk", flat=True))
+    assert "DISTINCT" not in str(qs.query)
@@ -1,6 +1,9 @@
+from unittest.mock import patch
+
 from django.urls import reverse
 
 from ephios.core.models import AbstractParticipation, LocalParticipation
+from ephios.core.pdf import get_event_exporter, get_event_pdf
 
 
 def test_single_shift_pdf(django_app, planner, event, volunteer):
@@ -40,3 +43,15 @@ def test_multi_shift_pdf(django_app, planner, multi_shift_event, volunteer):
         user=planner,
     )
     assert response and response != response_no_participations
+
+
+def test_event_pdf_is_cached_until_event_changes(planner, event, volunteer):
+    with patch("ephios.core.pdf.get_event_exporter", wraps=get_event_exporter) as exporter:
+        pdf = get_event_pdf(event)
+        assert get_event_pdf(event) == pdf
+        assert exporter.call_count == 1
+        LocalParticipation.objects.create(
+            shift=event.shifts.first(), user=volunteer, state=AbstractParticipation.States.CONFIRMED
+        )
+        assert get_event_pdf(event) != pdf
+        assert exporter.call_count == 2
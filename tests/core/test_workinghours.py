@@ -1,11 +1,17 @@
+import csv
 import datetime
+import io
 import re
+import zipfile
+from decimal import Decimal
 
+from django.core.management import call_command
 from django.template.defaultfilters import floatformat
 from django.urls import reverse
 from django.utils import timezone
 
-from ephios.core.models import LocalParticipation, WorkingHours
+from ephios.core.models import LocalParticipation, WorkingHours, WorkingHoursRollup
+from ephios.core.services.export import XLSXExportFormat
 
 
 class TestWorkingHours:
@@ -120,3 +126,106 @@ class TestWorkingHours:
             f"{reverse('core:workinghours_list')}?type={service_event_type.pk}", user=manager
         )
         assert response.html.find(string=floatformat(participation.hours_value, arg=2))
+
+    def test_workinghours_export_csv(self, django_app, manager, groups, volunteer, workinghours):
+        response = django_app.get(reverse("core:workinghours_export"), user=manager)
+        assert response.content_type == "text/csv"
+        assert 'filename="workinghours.csv"' in response.headers["Content-Disposition"]
+        rows = list(csv.reader(io.StringIO(response.body.decode("utf-8-sig"))))
+        assert rows[0][0] == "Name"
+        assert rows[1][0] == volunteer.display_name
+        assert Decimal(rows[1][-1]) == workinghours[1].hours
+
+    def test_workinghours_detail_export_xlsx(self, django_app, volunteer, workinghours):
+        response = django_app.get(
+            reverse("core:workinghours_detail_export", kwargs={"pk": volunteer.pk}),
+            {"format": "xlsx"},
+            user=volunteer,
+        )
+        assert response.content_type == XLSXExportFormat.content_type
+        with zipfile.ZipFile(io.BytesIO(response.body)) as archive:
+            assert archive.testzip() is None
+            sheet = archive.read("xl/worksheets/sheet1.xml").decode()
+        assert sheet.count("<row>") == 3
+        assert workinghours[0].reason in sheet
+
+    def test_workinghours_export_unknown_format(self, django_app, manager, groups):
+        django_app.get(
+            reverse("core:workinghours_export"), {"format": "unknown"}, user=manager, status=404
+        )
+
+
+class TestWorkingHoursRollup:
+    @staticmethod
+    def _rollup(user):
+        return {
+            (row.date, row.event_type_id): row.duration
+            for row in WorkingHoursRollup.objects.filter(user=user)
+        }
+
+    def test_rollup_follows_participations(self, volunteer, event, training_event_type):
+        shift = event.shifts.first()
+        participation = LocalParticipation.objects.create(
+            shift=shift, user=volunteer, state=LocalParticipation.States.CONFIRMED
+        )
+        date = timezone.localdate(shift.start_time)
+        assert self._rollup(volunteer) == {(date, event.type_id): shift.end_time - shift.start_time}
+
+        shift.start_time -= datetime.timedelta(days=1)
+        shift.end_time -= datetime.timedelta(days=1)
+        shift.save()
+        assert self._rollup(volunteer) == {
+            (date - datetime.timedelta(days=1), event.type_id): shift.end_time - shift.start_time
+        }
+
+        event.type = training_event_type
+        event.save()
+        assert self._rollup(volunteer) == {
+            (date - datetime.timedelta(days=1), training_event_type.pk): shift.end_time
+            - shift.start_time
+        }
+
+        participation.state = LocalParticipation.States.USER_DECLINED
+        participation.save()
+        assert not self._rollup(volunteer)
+
+    def test_rollup_follows_workinghours(self, volunteer, workinghours):
+        assert self._rollup(volunteer) == {
+            (workinghours[0].date, None): datetime.timedelta(hours=21),
+            (workinghours[1].date, None): datetime.timedelta(hours=21),
+        }
+        workinghours[0].date = workinghours[1].date
+        workinghours[0].save()
+        assert self._rollup(volunteer) == {
+            (workinghours[1].date, None): datetime.timedelta(hours=42),
+        }
+        workinghours[1].delete()
+        assert self._rollup(volunteer) == {
+            (workinghours[1].date, None): datetime.timedelta(hours=21),
+        }
+
+    def test_rebuild_command(self, volunteer, event, workinghours):
+        LocalParticipation.objects.create(
+            shift=event.shifts.first(), user=volunteer, state=LocalParticipation.States.CONFIRMED
+        )
+        rollup = self._rollup(volunteer)
+        WorkingHoursRollup.objects.all().delete()
+        call_command("rebuild_working_hours_rollup")
+        assert self._rollup(volunteer) == rollup
+
+    def test_workhour_items_match_rollup(self, volunteer, event, workinghours):
+        shift = event.shifts.first()
+        shift.end_time = shift.start_time + datetime.timedelta(days=1)
+        shift.save()
+        LocalParticipation.objects.create(
+            shift=shift, user=volunteer, state=LocalParticipation.States.CONFIRMED
+        )
+        start = timezone.localdate(shift.start_time)
+        hour_sum, items = volunteer.get_workhour_items(start=start, end=start)
+        assert hour_sum == self._rollup(volunteer)[(start, event.type_id)]
+        assert [item["reason"] for item in items] == [event.title]
+        assert hour_sum == items[0]["duration"] == datetime.timedelta(days=1)
+
+        hour_sum, items = volunteer.get_workhour_items(end=workinghours[1].date)
+        assert hour_sum == datetime.timedelta(hours=42)
+        assert {item["reason"] for item in items} == {wh.reason for wh in workinghours}
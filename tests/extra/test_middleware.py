@@ -0,0 +1,66 @@
+import logging
+import re
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from ephios.core.services.health.healthchecks import HealthCheckStatus, SlowRequestsHealthCheck
+from ephios.extra.middleware import QueryBudgetExceeded, get_slow_requests
+
+
+def get_timing(response, name):
+    return re.search(
+        rf'{name};(dur=(?P<dur>[\d.]+))?(;?desc="(?P<desc>[^"]*)")?',
+        response.headers["Server-Timing"],
+    )
+
+
+def test_server_timing_header(django_app, volunteer, event):
+    response = django_app.get(reverse("core:event_list"), user=volunteer)
+    queries = int(get_timing(response, "db").group("desc").split()[0])
+    assert queries > 0
+    assert float(get_timing(response, "total").group("dur")) > 0
+    assert float(get_timing(response, "tpl").group("dur")) > 0
+    assert get_timing(response, "cache").group("desc").endswith("misses")
+
+
+def test_query_budget_exceeded(django_app, volunteer, event, settings):
+    settings.QUERY_BUDGETS = {"core:event_list": 1}
+    with pytest.raises(QueryBudgetExceeded):
+        django_app.get(reverse("core:event_list"), user=volunteer)
+
+
+def test_query_budget_kept(django_app, volunteer, event, settings):
+    settings.QUERY_BUDGETS = {"core:event_list": 1000}
+    django_app.get(reverse("core:event_list"), user=volunteer)
+
+
+def test_slow_requests_are_reported(django_app, volunteer, event, settings):
+    assert SlowRequestsHealthCheck().check()[0] == HealthCheckStatus.OK
+    settings.SLOW_REQUEST_THRESHOLD = 0
+    django_app.get(reverse("core:event_list"), user=volunteer)
+    status, message = SlowRequestsHealthCheck().check()
+    assert status == HealthCheckStatus.WARNING
+    assert "core:event_list" in message
+
+
+def test_slow_requests_are_counted_per_view(django_app, volunteer, event, settings):
+    settings.SLOW_REQUEST_THRESHOLD = 0
+    django_app.get(reverse("core:event_list"), user=volunteer)
+    django_app.get(reverse("core:event_list"), user=volunteer)
+    django_app.get(event.get_absolute_url(), user=volunteer)
+    slow_requests = get_slow_requests(since=timezone.now() - timedelta(hours=1))
+    assert slow_requests["core:event_list"][0] == 2
+    assert slow_requests["core:event_detail"][0] == 1
+
+
+def test_request_log_omits_path(django_app, volunteer, caplog):
+    with caplog.at_level(logging.DEBUG, logger="ephios.extra.middleware"):
+        django_app.get(
+            reverse("core:user_event_feed", kwargs={"calendar_token": volunteer.calendar_token})
+        )
+    assert "core:user_event_feed" in caplog.text
+    assert volunteer.calendar_token not in caplog.text
+    caplog.clear()  # the request log is expected here
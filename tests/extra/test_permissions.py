@@ -1,7 +1,15 @@
 import pytest
+from django.contrib.auth.models import AnonymousUser
+from guardian.shortcuts import assign_perm, remove_perm
 
 from ephios.core.forms.users import MANAGEMENT_PERMISSIONS
-from ephios.extra.permissions import get_groups_with_perms
+from ephios.core.models import Event, UserProfile
+from ephios.extra.permissions import (
+    clear_permission_resolvers,
+    get_groups_with_perms,
+    get_permission_resolver,
+    invalidate_object_permissions,
+)
 
 
 def test_querying_get_groups_with_perms(groups, event):
@@ -36,3 +44,113 @@ def test_querying_get_groups_with_perms(groups, event):
         get_groups_with_perms(
             only_with_perms_in=["view_event"],
         )
+
+
+def test_permission_resolver_object_permissions(groups, event, volunteer, planner):
+    resolver = get_permission_resolver(volunteer, Event)
+    assert resolver.has_perm("core.view_event", event)
+    assert not resolver.has_perm("core.change_event", event)
+    assert resolver.get_object_pks("view_event") == {event.pk}
+    assert resolver.get_object_pks("change_event") == set()
+    assert get_permission_resolver(volunteer, event) is resolver
+
+    planner_resolver = get_permission_resolver(planner, Event)
+    assert planner_resolver.has_perm("change_event", event)
+    assert set(planner_resolver.filter_queryset(Event.objects.all(), "core.change_event")) == {
+        event
+    }
+
+
+def test_permission_resolver_filters_large_sets_with_subqueries(
+    monkeypatch, groups, event, conflicting_event, volunteer
+):
+    monkeypatch.setattr("ephios.extra.permissions.OBJECT_PKS_LITERAL_LIMIT", 0)
+    assign_perm("core.change_event", volunteer, conflicting_event)
+    clear_permission_resolvers(volunteer)
+    resolver = get_permission_resolver(volunteer, Event)
+    # view_event through the group, change_event directly
+    assert set(resolver.filter_queryset(Event.objects.all(), "core.view_event")) == {
+        event,
+        conflicting_event,
+    }
+    assert set(resolver.filter_queryset(Event.objects.all(), "core.change_event")) == {
+        conflicting_event
+    }
+    queryset = Event.objects.filter(resolver.object_pks_filter("core.view_event", field="id"))
+    assert "SELECT" in str(queryset.query).split("WHERE", 1)[1]
+
+
+def test_permission_resolver_global_permissions(groups, event, manager, superuser):
+    managers, planners, volunteers = groups
+    resolver = get_permission_resolver(manager, Event)
+    assert resolver.has_global_perm("core.change_event")
+    assert resolver.has_perm("core.change_event", event)
+    assert not resolver.has_perm("core.change_event", event, accept_global_perms=False)
+    assert resolver.get_object_pks("core.change_event") == set()
+
+    superuser_resolver = get_permission_resolver(superuser, Event)
+    assert superuser_resolver.has_perm("core.delete_event", event)
+    assert superuser_resolver.filter_queryset(Event.objects.all(), "core.delete_event").count() == 1
+
+
+def test_permission_resolver_queries_once(django_assert_num_queries, groups, event, volunteer):
+    volunteer = UserProfile.objects.get(pk=volunteer.pk)
+    resolver = get_permission_resolver(volunteer, Event)
+    with django_assert_num_queries(4):
+        # global user and group permissions, user and group object permissions
+        for __ in range(3):
+            assert resolver.has_perm("core.view_event", event)
+            assert not resolver.has_perm("core.change_event", event)
+
+
+def test_permission_resolver_after_assigning(groups, event, volunteer):
+    assert not get_permission_resolver(volunteer, Event).has_perm("core.change_event", event)
+    assign_perm("core.change_event", volunteer, event)
+    clear_permission_resolvers(volunteer)
+    assert get_permission_resolver(volunteer, Event).has_perm("core.change_event", event)
+    assert not get_permission_resolver(AnonymousUser(), Event).has_perm("core.view_event", event)
+
+
+def test_permission_resolver_uses_shared_cache(django_assert_num_queries, groups, event, volunteer):
+    assert get_permission_resolver(volunteer, Event).has_perm("core.view_event", event)
+    volunteer = UserProfile.objects.get(pk=volunteer.pk)
+    with django_assert_num_queries(0):
+        assert get_permission_resolver(volunteer, Event).get_object_pks("view_event") == {event.pk}
+
+
+def test_permission_resolver_without_shared_cache(
+    django_assert_num_queries, settings, groups, event, volunteer
+):
+    settings.SHARED_CACHE = False
+    assert get_permission_resolver(volunteer, Event).has_perm("core.view_event", event)
+    volunteer = UserProfile.objects.get(pk=volunteer.pk)
+    with django_assert_num_queries(2):
+        # user and group object permissions
+        assert get_permission_resolver(volunteer, Event).get_object_pks("view_event") == {event.pk}
+
+
+def test_materialized_permissions_invalidated_on_changes(groups, event, volunteer, manager):
+    managers, planners, volunteers = groups
+
+    def fresh_pks(user, perm):
+        return get_permission_resolver(UserProfile.objects.get(pk=user.pk), Event).get_object_pks(
+            perm
+        )
+
+    assert fresh_pks(volunteer, "view_event") == {event.pk}
+    volunteers.user_set.remove(volunteer)
+    assert fresh_pks(volunteer, "view_event") == set()
+    volunteer.groups.add(volunteers)
+    assert fresh_pks(volunteer, "view_event") == {event.pk}
+
+    assign_perm("core.change_event", volunteer, event)
+    assert fresh_pks(volunteer, "change_event") == {event.pk}
+    remove_perm("core.change_event", volunteers, event)
+    assign_perm("core.change_event", volunteers, event)
+    assert fresh_pks(manager, "change_event") == set()
+    assert fresh_pks(volunteer, "change_event") == {event.pk}
+
+    # guardian uses bulk_create without signals for multiple targets
+    assign_perm("core.change_event", [managers, planners], event)
+    invalidate_object_permissions(model=Event)
+    assert fresh_pks(manager, "change_event") == {event.pk}
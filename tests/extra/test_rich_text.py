@@ -1,4 +1,6 @@
-from ephios.extra.templatetags.rich_text import rich_text
+from unittest.mock import patch
+
+from ephios.extra.templatetags.rich_text import _render_rich_text, rich_text
 
 
 def test_rich_text():
@@ -6,3 +8,31 @@ def test_rich_text():
         rich_text("https://xkcd.com")
         == '<p><a href="https://xkcd.com" rel="noopener" target="_blank">https://xkcd.com</a></p>'
     )
+
+
+def test_rich_text_excluded_tags():
+    assert rich_text("# Title") == "<h1>Title</h1>"
+    assert rich_text("# Title", "h1") == "&lt;h1&gt;Title&lt;/h1&gt;"
+
+
+def test_rich_text_is_cached_by_content():
+    _render_rich_text.cache_clear()
+    assert rich_text("**bold**") == "<p><strong>bold</strong></p>"
+    assert _render_rich_text.cache_info().hits == 0
+    assert rich_text("**bold**") == "<p><strong>bold</strong></p>"
+    assert _render_rich_text.cache_info().hits == 1
+
+    # other processes find the rendered text in the shared cache
+    _render_rich_text.cache_clear()
+    with patch("ephios.extra.templatetags.rich_text.markdown_compile") as markdown_compile:
+        assert rich_text("**bold**") == "<p><strong>bold</strong></p>"
+    markdown_compile.assert_not_called()
+
+
+def test_rich_text_link_target_depends_on_site_url(settings):
+    _render_rich_text.cache_clear()
+    settings.DEFAULT_SITE_URL = "https://xkcd.com"
+    assert (
+        rich_text("https://xkcd.com")
+        == '<p><a href="https://xkcd.com" rel="nofollow">https://xkcd.com</a></p>'
+    )
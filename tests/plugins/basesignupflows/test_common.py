@@ -1,6 +1,19 @@
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
-from ephios.core.models import AbstractParticipation, LocalParticipation
+from ephios.core.models import (
+    AbstractParticipation,
+    LocalParticipation,
+    Notification,
+    UserProfile,
+    WorkingHoursRollup,
+)
+from ephios.core.services.notifications.types import ParticipationStateChangeNotification
+from ephios.core.services.participation import bulk_update_participations
+from ephios.modellogging.models import LogEntry
+from ephios.modellogging.recorders import InstanceActionType
 from ephios.plugins.basesignupflows.flow.participant import InstantConfirmSignupFlow
 
 
@@ -97,3 +110,102 @@ def test_comment_is_only_visible_to_responsibles(
     assert comment_text in response
     assert comment_text in django_app.get(event.get_absolute_url(), user=planner)
     assert comment_text not in django_app.get(event.get_absolute_url(), user=qualified_volunteer)
+
+
+def test_disposition_saves_changed_participations_in_bulk(
+    django_app, volunteer, qualified_volunteer, planner, event
+):
+    shift = event.shifts.first()
+    for user in (volunteer, qualified_volunteer):
+        participation = shift.signup_flow.get_or_create_participation_for(user.as_participant())
+        participation.state = AbstractParticipation.States.REQUESTED
+        participation.save()
+
+    volunteer_pk = LocalParticipation.objects.get(user=volunteer, shift=shift).pk
+
+    form = django_app.get(
+        reverse("core:shift_disposition", kwargs=dict(pk=shift.pk)),
+        user=planner,
+    ).forms["participations-form"]
+    for i in range(2):
+        if int(form[f"participations-{i}-id"].value) == volunteer_pk:
+            form[f"participations-{i}-state"] = AbstractParticipation.States.CONFIRMED.value
+    form.submit()
+
+    volunteer_participation = LocalParticipation.objects.get(user=volunteer, shift=shift)
+    assert volunteer_participation.state == AbstractParticipation.States.CONFIRMED
+    assert (
+        LocalParticipation.objects.get(user=qualified_volunteer, shift=shift).state
+        == AbstractParticipation.States.REQUESTED
+    )
+    assert list(
+        Notification.objects.filter(slug=ParticipationStateChangeNotification.slug).values_list(
+            "user", flat=True
+        )
+    ) == [volunteer.pk]
+    assert WorkingHoursRollup.objects.filter(
+        user=volunteer, date=volunteer_participation.start_time.date()
+    ).exists()
+    assert not WorkingHoursRollup.objects.filter(user=qualified_volunteer).exists()
+    assert (
+        LogEntry.objects.filter(
+            content_type=ContentType.objects.get_for_model(LocalParticipation),
+            content_object_id=volunteer_participation.pk,
+            action_type=InstanceActionType.CHANGE,
+        ).count()
+        == 1
+    )
+
+
+def test_bulk_state_changes_with_constant_queries(event):
+    def confirm_all(count):
+        shift = event.shifts.first()
+        shift.pk = None
+        shift.save()
+        users = UserProfile.objects.bulk_create(
+            UserProfile(
+                email=f"user{count}-{i}@localhost", display_name=f"User {i}", password="dummy"
+            )
+            for i in range(count)
+        )
+        for user in users:
+            # users without groups can't view the event before they are dispatched
+            LocalParticipation.objects.create(
+                shift=shift, user=user, state=AbstractParticipation.States.GETTING_DISPATCHED
+            )
+        participations = list(shift.participations.all().select_related("shift__event__type"))
+        for participation in participations:
+            participation.state = AbstractParticipation.States.CONFIRMED
+        with CaptureQueriesContext(connection) as context:
+            bulk_update_participations(participations, ["state"])
+        for user in users:
+            assert user.has_perm("core.view_event", event)
+        assert WorkingHoursRollup.objects.filter(user__in=users).count() == count
+        assert (
+            LogEntry.objects.filter(
+                content_type=ContentType.objects.get_for_model(LocalParticipation),
+                content_object_id__in=[participation.pk for participation in participations],
+                action_type=InstanceActionType.CHANGE,
+            ).count()
+            == count
+        )
+        return len(context)
+
+    confirm_all(1)  # warm up caches, e.g. of content types
+    assert confirm_all(2) == confirm_all(6)
+
+
+def test_unchanged_disposition_is_not_saved(django_app, volunteer, planner, event):
+    shift = event.shifts.first()
+    participation = shift.signup_flow.get_or_create_participation_for(volunteer.as_participant())
+    participation.state = AbstractParticipation.States.CONFIRMED
+    participation.save()
+    updated_at = LocalParticipation.objects.get(pk=participation.pk).updated_at
+
+    django_app.get(
+        reverse("core:shift_disposition", kwargs=dict(pk=shift.pk)),
+        user=planner,
+    ).forms["participations-form"].submit()
+
+    assert LocalParticipation.objects.get(pk=participation.pk).updated_at == updated_at
+    assert not Notification.objects.exists()
@@ -67,6 +67,46 @@ def test_correct_states_get_copied(django_app, event, volunteer, create_coupled_
         assert not LocalParticipation.objects.filter(user=volunteer, shift=coupled_shift).exists()
 
 
+def test_disposition_of_leader_shift_updates_coupled_shift(
+    django_app, planner, volunteer, event, create_coupled_shift
+):
+    coupled_shift = create_coupled_shift()
+    leader_shift = event.shifts.exclude(id=coupled_shift.id).get()
+    LocalParticipation.objects.create(
+        user=volunteer, shift=leader_shift, state=AbstractParticipation.States.REQUESTED
+    )
+    form = django_app.get(
+        reverse("core:shift_disposition", kwargs=dict(pk=leader_shift.pk)), user=planner
+    ).forms["participations-form"]
+    form["participations-0-state"] = AbstractParticipation.States.CONFIRMED.value
+    form.submit()
+    assert LocalParticipation.objects.filter(
+        user=volunteer, shift=coupled_shift, state=AbstractParticipation.States.CONFIRMED
+    ).exists()
+
+
+def test_disposition_of_leader_shift_updates_existing_coupled_participations(
+    django_app, planner, volunteer, qualified_volunteer, event, create_coupled_shift
+):
+    coupled_shift = create_coupled_shift()
+    leader_shift = event.shifts.exclude(id=coupled_shift.id).get()
+    for user in (volunteer, qualified_volunteer):
+        # saving the leader participation creates the coupled participation
+        LocalParticipation.objects.create(
+            user=user, shift=leader_shift, state=AbstractParticipation.States.REQUESTED
+        )
+    form = django_app.get(
+        reverse("core:shift_disposition", kwargs=dict(pk=leader_shift.pk)), user=planner
+    ).forms["participations-form"]
+    for i in range(2):
+        form[f"participations-{i}-state"] = AbstractParticipation.States.CONFIRMED.value
+    form.submit()
+    assert set(coupled_shift.participations.values_list("localparticipation__user", "state")) == {
+        (volunteer.pk, AbstractParticipation.States.CONFIRMED),
+        (qualified_volunteer.pk, AbstractParticipation.States.CONFIRMED),
+    }
+
+
 def test_event_detail_with_missing_leader_shift(django_app, volunteer, event, create_coupled_shift):
     event.shifts.all().delete()
     create_coupled_shift()
@@ -1,8 +1,16 @@
 import json
+import uuid
 
+import pytest
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
-from ephios.plugins.complexsignup.models import BuildingBlock
+from ephios.modellogging.models import LogEntry
+from ephios.modellogging.recorders import InstanceActionType
+from ephios.plugins.complexsignup.models import BlockComposition, BuildingBlock, Position
+from ephios.plugins.complexsignup.serializers import BuildingBlockSerializer
 
 NEW_ATOMIC_BLOCK_DATA = {
     "id": None,
@@ -110,3 +118,110 @@ def test_no_cycle_in_composite_blocks(django_app, superuser):
     response = response.form.submit()
     assert BuildingBlock.objects.count() == 0
     assert response.context["form"].errors
+
+
+def save_blocks(data):
+    serializer = BuildingBlockSerializer(
+        instance=BuildingBlock.objects.all(), many=True, data=json.loads(json.dumps(data))
+    )
+    serializer.is_valid(raise_exception=True)
+    with CaptureQueriesContext(connection) as context:
+        serializer.save()
+    return len(context.captured_queries)
+
+
+def atomic_block_data(name, qualifications, block_uuid=None):
+    return {
+        **NEW_ATOMIC_BLOCK_DATA,
+        "uuid": str(block_uuid or uuid.uuid4()),
+        "name": name,
+        "positions": [
+            {
+                "id": None,
+                "label": "Lead",
+                "optional": False,
+                "qualifications": [qualifications.nfs.id],
+            },
+            {"id": None, "label": "", "optional": True, "qualifications": [qualifications.rs.id]},
+        ],
+        "qualification_requirements": [
+            {
+                "id": None,
+                "qualifications": [qualifications.b.id],
+                "everyone": False,
+                "at_least": 1,
+            }
+        ],
+    }
+
+
+def test_editor_saves_block_tree(qualifications):
+    atomic = atomic_block_data("Ambulance", qualifications)
+    composite = {
+        **NEW_ATOMIC_BLOCK_DATA,
+        "uuid": str(uuid.uuid4()),
+        "name": "Station",
+        "block_type": "composite",
+        "sub_compositions": [
+            {"id": None, "label": "", "optional": False, "sub_block": atomic["uuid"]}
+        ],
+    }
+    save_blocks([composite, atomic])
+    block = BuildingBlock.objects.get(uuid=atomic["uuid"])
+    assert BlockComposition.objects.get().sub_block == block
+    lead, second = block.positions.order_by("label").reverse()
+    assert list(lead.qualifications.all()) == [qualifications.nfs]
+    assert list(block.qualification_requirements.get().qualifications.all()) == [qualifications.b]
+
+    atomic["name"] = "RTW"
+    atomic["positions"] = [
+        {
+            "id": lead.id,
+            "label": "Lead",
+            "optional": False,
+            "qualifications": [qualifications.na.id],
+        },
+        {"id": None, "label": "Driver", "optional": False, "qualifications": []},
+    ]
+    save_blocks([atomic])
+    block.refresh_from_db()
+    assert block.name == "RTW"
+    assert set(block.positions.values_list("label", flat=True)) == {"Lead", "Driver"}
+    assert not Position.objects.filter(pk=second.pk).exists()
+    assert list(lead.qualifications.all()) == [qualifications.na]
+    assert Position.qualifications.through.objects.count() == 1
+    assert BlockComposition.objects.exists()
+
+    change = LogEntry.objects.get(
+        content_type=ContentType.objects.get_for_model(Position),
+        content_object_id=lead.pk,
+        action_type=InstanceActionType.CHANGE,
+    )
+    assert change.data["m2m-qualifications"]["data"]["added"] == [qualifications.na]
+    assert change.data["m2m-qualifications"]["data"]["removed"] == [qualifications.nfs]
+
+    save_blocks([{**atomic, "deleted": True}])
+    assert list(BuildingBlock.objects.values_list("name", flat=True)) == ["Station"]
+    assert not BlockComposition.objects.exists()
+
+
+@pytest.mark.skipif(
+    not connection.features.can_return_rows_from_bulk_insert,
+    reason="blocks are only created in bulk if the database returns primary keys",
+)
+def test_editor_query_count_does_not_grow_with_blocks(qualifications):
+    save_blocks([atomic_block_data("Existing", qualifications)])
+    single = [atomic_block_data("Single", qualifications)]
+    many = [atomic_block_data(f"Block {i}", qualifications) for i in range(10)]
+    assert save_blocks(single) == save_blocks(many)
+
+    for data in single + many:
+        block = BuildingBlock.objects.get(uuid=data["uuid"])
+        data["name"] += " changed"
+        for position_data, position in zip(data["positions"], block.positions.order_by("id")):
+            position_data["id"] = position.id
+            position_data["qualifications"] = [qualifications.na.id]
+        data["qualification_requirements"][0].update(
+            id=block.qualification_requirements.get().id, at_least=2
+        )
+    assert save_blocks(single) == save_blocks(many)
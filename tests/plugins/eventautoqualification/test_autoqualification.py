@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 
 import pytest
 from django.urls import reverse
@@ -12,6 +12,7 @@ from ephios.core.models import (
     LocalParticipation,
     QualificationGrant,
 )
+from ephios.core.services.event_copy import EventCopier
 from ephios.core.signals import periodic_signal
 from ephios.plugins.eventautoqualification.models import EventAutoQualificationConfiguration
 
@@ -190,3 +191,20 @@ def test_consequence_gets_created(
         consequence = Consequence.objects.get()
         assert consequence.data["qualification_id"] == qualifications.na.id
         assert consequence.user == volunteer
+
+
+def test_configuration_is_copied_with_event(multi_shift_event, planner, groups, qualifications):
+    EventAutoQualificationConfiguration.objects.create(
+        event=multi_shift_event,
+        qualification=qualifications.na,
+        mode=EventAutoQualificationConfiguration.Modes.EVERY_SHIFT,
+    )
+    start = multi_shift_event.get_start_time() + timedelta(days=7)
+    copies = EventCopier(multi_shift_event, planner).copy_to([start, start + timedelta(days=7)])
+    configs = EventAutoQualificationConfiguration.objects.filter(event__in=copies)
+    assert {config.event_id for config in configs} == {copy.pk for copy in copies}
+    assert all(
+        config.qualification_id == qualifications.na.pk
+        and config.mode == EventAutoQualificationConfiguration.Modes.EVERY_SHIFT
+        for config in configs
+    )
@@ -1,5 +1,9 @@
+import json
 import secrets
+import threading
+import time
 from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 import pytest
 from django.urls import reverse
@@ -64,3 +68,35 @@ def federated_event(event, federation):
     share = FederatedEventShare.objects.create(event=event)
     share.shared_with.add(guest)
     return event
+
+
+class StubHostHandler(BaseHTTPRequestHandler):
+    """Answers every request with the status and results configured on the server."""
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        time.sleep(self.server.delay)
+        body = json.dumps({"results": self.server.results}).encode()
+        self.send_response(self.server.status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_host_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHostHandler)
+    server.requests = []
+    server.results = []
+    server.status = 200
+    server.delay = 0
+    server.url = f"http://127.0.0.1:{server.server_port}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
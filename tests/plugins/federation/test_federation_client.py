@@ -0,0 +1,74 @@
+import time
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from ephios.api.models import Application
+from ephios.plugins.federation.client import (
+    SHARED_EVENTS_CACHE_KEY,
+    fetch_shared_events,
+    get_shared_events,
+)
+from ephios.plugins.federation.models import FederatedHost
+
+
+def create_host(name, url):
+    return FederatedHost.objects.create(
+        name=name,
+        url=url,
+        access_token=f"token-{name}",
+        oauth_application=Application.objects.create(
+            client_type=Application.CLIENT_CONFIDENTIAL,
+            authorization_grant_type=Application.GRANT_AUTHORIZATION_CODE,
+        ),
+    )
+
+
+def test_hosts_are_fetched_concurrently(stub_host_server):
+    stub_host_server.delay = 0.5
+    stub_host_server.results = [{"title": "Shared event"}]
+    hosts = [create_host(f"Host {i}", stub_host_server.url) for i in range(4)]
+    start = time.monotonic()
+    shared_events = get_shared_events(hosts)
+    assert time.monotonic() - start < 1.5
+    assert shared_events == {host: [{"title": "Shared event"}] for host in hosts}
+
+
+def test_shared_events_are_served_from_cache(stub_host_server):
+    stub_host_server.results = [{"title": "Shared event"}]
+    host = create_host("Host", stub_host_server.url)
+    get_shared_events([host])
+    assert len(stub_host_server.requests) == 1
+    assert get_shared_events([host]) == {host: [{"title": "Shared event"}]}
+    assert len(stub_host_server.requests) == 1
+
+
+def test_stale_shared_events_are_revalidated(stub_host_server):
+    host = create_host("Host", stub_host_server.url)
+    cache.set(
+        SHARED_EVENTS_CACHE_KEY.format(host=host.pk),
+        {"fetched_at": timezone.now() - timedelta(hours=1), "events": [{"title": "Old"}]},
+    )
+    stub_host_server.results = [{"title": "New"}]
+    assert get_shared_events([host]) == {host: [{"title": "Old"}]}
+    deadline = time.monotonic() + 5
+    while get_shared_events([host]) != {host: [{"title": "New"}]}:
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+    assert len(stub_host_server.requests) == 1
+
+
+def test_unreachable_host_is_skipped(stub_host_server):
+    reachable = create_host("Reachable", stub_host_server.url)
+    unreachable = create_host("Unreachable", "http://127.0.0.1:1")
+    stub_host_server.results = [{"title": "Shared event"}]
+    assert fetch_shared_events([reachable, unreachable]) == {reachable: [{"title": "Shared event"}]}
+    assert FederatedHost.objects.filter(pk=unreachable.pk).exists()
+
+
+def test_host_rejecting_token_is_deleted(stub_host_server):
+    host = create_host("Host", stub_host_server.url)
+    stub_host_server.status = 403
+    assert fetch_shared_events([host]) == {}
+    assert not FederatedHost.objects.filter(pk=host.pk).exists()
@@ -1,5 +1,4 @@
 from importlib import import_module
-from unittest.mock import patch
 
 from django.urls import reverse
 
@@ -17,14 +16,15 @@ def test_federation_get_shared_events(django_app, volunteer, federation, federat
     assert federated_event.title in response.text
 
 
-@patch("ephios.plugins.federation.views.frontend.requests")
 def test_federation_shared_event_list(
-    mock_requests, django_app, volunteer, federation, federated_event, settings
+    django_app, volunteer, federation, federated_event, settings, stub_host_server
 ):
     host, guest = federation
-    mock_requests.get.return_value.json.return_value = {
-        "results": [SharedEventSerializer(federated_event, context={"federated_guest": guest}).data]
-    }
+    host.url = stub_host_server.url
+    host.save()
+    stub_host_server.results = [
+        SharedEventSerializer(federated_event, context={"federated_guest": guest}).data
+    ]
 
     response = django_app.get(reverse("federation:external_event_list"), user=volunteer)
     assert response.status_code == 200
@@ -1,8 +1,14 @@
 import pytest
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
-from ephios.core.models.events import AbstractParticipation
-from ephios.plugins.questionnaires.models import Answer
+from ephios.core.models.events import AbstractParticipation, Shift
+from ephios.core.signup.forms import SignupForm
+from ephios.modellogging.models import LogEntry
+from ephios.plugins.questionnaires.models import Answer, Question, SavedAnswer
+from ephios.plugins.questionnaires.signals import save_signup
 
 
 @pytest.fixture
@@ -209,3 +215,95 @@ def test_user_specific_answer(
     assert qualified_collapse
     assert qualified_optional_answer.answer in qualified_collapse.text
     assert qualified_required_answer.answer in qualified_collapse.text
+
+
+def create_text_questions(count):
+    return [
+        Question.objects.create(
+            name=f"Question {i}",
+            question_text=f"Question {i}?",
+            required=False,
+            type=Question.Type.TEXT,
+            use_saved_answers=True,
+        )
+        for i in range(count)
+    ]
+
+
+def save_answers(shift, participation, answers, save_answers=True):
+    save_signup(
+        sender=None,
+        shift=shift,
+        participant=participation.participant,
+        participation=participation,
+        signup_choice=SignupForm.SignupChoices.SIGNUP,
+        cleaned_data={
+            "questionnaires_save_answers": save_answers,
+            **{question.get_form_slug(): answer for question, answer in answers.items()},
+        },
+    )
+
+
+def test_save_signup_answers(volunteer, plain_shift):
+    first, second, third = create_text_questions(3)
+    participation = volunteer.as_participant().new_participation(plain_shift)
+    participation.save()
+
+    save_answers(plain_shift, participation, {first: "A", second: "B", third: ""})
+    assert dict(participation.answer_set.values_list("question", "answer")) == {
+        first.pk: "A",
+        second.pk: "B",
+    }
+    assert dict(SavedAnswer.objects.filter(user=volunteer).values_list("question", "answer")) == {
+        first.pk: "A",
+        second.pk: "B",
+    }
+
+    save_answers(plain_shift, participation, {first: "D", second: "", third: "C"})
+    assert dict(participation.answer_set.values_list("question", "answer")) == {
+        first.pk: "D",
+        third.pk: "C",
+    }
+    assert dict(SavedAnswer.objects.filter(user=volunteer).values_list("question", "answer")) == {
+        first.pk: "D",
+        third.pk: "C",
+    }
+    logged_answers = LogEntry.objects.filter(
+        content_type=ContentType.objects.get_for_model(Answer),
+        attached_to_object_id=participation.pk,
+    )
+    assert sorted(logged_answers.values_list("action_type", flat=True)) == [
+        "change",
+        "create",
+        "create",
+        "create",
+        "delete",
+    ]
+
+
+def test_save_signup_answers_query_count(volunteer, plain_shift, event):
+    def count_queries(shift, questions, answer):
+        participation = volunteer.as_participant().new_participation(shift)
+        participation.save()
+        with CaptureQueriesContext(connection) as context:
+            save_answers(shift, participation, dict.fromkeys(questions, answer))
+            save_answers(shift, participation, dict.fromkeys(questions, f"Other {answer}"))
+        assert set(participation.answer_set.values_list("answer", flat=True)) == {f"Other {answer}"}
+        return len(context)
+
+    def copy_shift():
+        return Shift.objects.create(
+            event=event,
+            meeting_time=plain_shift.meeting_time,
+            start_time=plain_shift.start_time,
+            end_time=plain_shift.end_time,
+            signup_flow_slug=plain_shift.signup_flow_slug,
+            structure_slug=plain_shift.structure_slug,
+        )
+
+    questions = create_text_questions(15)
+    # warm up caches like the content type cache, which other tests might have filled already
+    count_queries(copy_shift(), questions[:1], "Warm-up")
+    assert count_queries(plain_shift, questions[:1], "A") == count_queries(
+        copy_shift(), questions, "B"
+    )
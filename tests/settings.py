@@ -6,3 +6,9 @@ LANGUAGE_CODE = "en"
 os.environ["OAUTHLIB_INSECURE_TRANSPORT"] = "1"
 
 DEFAULT_SITE_URL = "http://localhost:8000"
+
+QUERY_BUDGETS_RAISE = True
+INSTRUMENT_TEMPLATES_AND_SIGNALS = True
+
+# tests run in a single process, so the local memory cache is shared
+SHARED_CACHE = True